@@ -28,6 +28,7 @@
 
 import os
 import time
+from base64 import b64encode
 from datetime import datetime, timedelta, timezone
 from threading import RLock, Thread
 from typing import Tuple, List, Optional
@@ -38,30 +39,67 @@ from ovos_utils import create_daemon
 from ovos_utils.file_utils import resolve_resource_file
 from ovos_utils.process_utils import RuntimeRequirements
 from ovos_utils.log import LOG, log_deprecation
-from ovos_utils.sound import play_audio
-from lingua_franca.format import nice_duration, nice_time, nice_date_time
-from lingua_franca.parse import extract_duration, extract_datetime
+from lingua_franca.format import nice_duration, nice_time, \
+    nice_date_time, join_list
 from lingua_franca.time import default_timezone
 from ovos_bus_client.message import Message
 from neon_utils.message_utils import request_from_mobile, dig_for_message
 from neon_utils.skills.neon_skill import NeonSkill
-from neon_utils.user_utils import get_user_prefs, get_message_user
+from neon_utils.user_utils import get_message_user
 from ovos_workshop.decorators import intent_handler
 from ovos_workshop.intents import IntentBuilder
 
 from skill_alerts.util import Weekdays, AlertState, MatchLevel, AlertPriority, WEEKDAYS, WEEKENDS, EVERYDAY
 from skill_alerts.util.alert import Alert, AlertType
-from skill_alerts.util.alert_manager import AlertManager, get_alert_id
+from skill_alerts.util.alert_manager import AlertManager, get_alert_id, \
+    get_alert_user
+from skill_alerts.util.playback import LoopingPlayer, SoundCache
+from skill_alerts.util.user_prefs import user_prefs
 from skill_alerts.util.parse_utils import build_alert_from_intent, spoken_time_remaining, \
     parse_alert_name_from_message, tokenize_utterance, \
-    parse_alert_time_from_message
-from skill_alerts.util.ui_models import build_timer_data, build_alarm_data
+    parse_alert_time_from_message, ALERT_CONTEXT_KEYS
+
+# Remote client expirations are batched over this many seconds
+_REMOTE_EXPIRATION_BATCH_SECONDS = 1
+# Number of timers displayed on one page of the timer GUI
+_TIMER_GUI_PAGE_SIZE = 10
+# Interval in seconds between writes of `metrics_file`
+_METRICS_WRITE_SECONDS = 60
+# Interval in seconds between volume increases while an alert is playing
+_VOLUME_ESCALATION_SECONDS = 5
+# Spoken notifications are rendered ahead of time for alerts expiring within
+# this horizon, checked at this interval in seconds
+_PRERENDER_HORIZON = timedelta(minutes=10)
+_PRERENDER_SWEEP_SECONDS = 300
 
 
 class AlertSkill(NeonSkill):
     def __init__(self, **kwargs):
         self._alert_manager = None
         self._gui_timer_lock = RLock()
+        self._timer_gui_offset = 0
+        # Alarms shown in the alarms overview, by ID in display order
+        self._gui_alarms = dict()
+        self._gui_alarms_lock = RLock()
+        self._remote_expirations_lock = RLock()
+        self._remote_expirations = dict()
+        # Last known volume, the volume to restore once no alerts are
+        # escalating, and the message of each alert escalating the volume
+        self._volume = None
+        self._restore_volume = None
+        self._escalating_alerts = dict()
+        self._escalation_lock = RLock()
+        # Looping players for alerts currently playing
+        self._alert_players = dict()
+        # Resolved sound file paths by setting value and decoded sounds
+        self._sound_files = dict()
+        self._sound_cache = SoundCache()
+        # Rendered notification audio by alert ID (None if rendering failed)
+        self._prerendered = dict()
+        self._prerender_lock = RLock()
+        # Expired alerts notified together, by user
+        self._expired_groups = dict()
+        self._expired_groups_lock = RLock()
         NeonSkill.__init__(self, **kwargs)
 
     @classproperty
@@ -85,6 +123,17 @@ class AlertSkill(NeonSkill):
             raise RuntimeError("Requested AlertManager before initialize")
         return self._alert_manager
 
+    def _get_bool_setting(self, name: str, default: bool) -> bool:
+        """
+        Get a checkbox setting. Defaults from settingsmeta are strings, so
+        only `true` (in any case) or a True value enable the setting.
+        :param name: setting name
+        :param default: value to use if the setting is not defined
+        :returns: bool setting value
+        """
+        value = self.preference_skill().get(name, default)
+        return str(value).lower() == "true"
+
     @property
     def speak_alarm(self) -> bool:
         """
@@ -104,40 +153,25 @@ class AlertSkill(NeonSkill):
         """
         Return the path to a valid alarm sound resource file
         """
-        filename = self.preference_skill().get('sound_alarm') or \
-            'default-alarm.wav'
-        if os.path.isfile(filename):
-            return filename
-        file = resolve_resource_file(filename,
-                                     os.path.join(self.root_dir, "res"),
-                                     self.config_core)
-        if not file:
-            LOG.warning(f'Could not resolve requested file: {filename}')
-            file = os.path.join(self.root_dir, 'res', 'snd',
-                                'default-alarm.wav')
-        if not file:
-            raise FileNotFoundError(f"Could not resolve sound: {filename}")
-        return file
+        return self._resolve_sound_file(
+            self.preference_skill().get('sound_alarm') or
+            'default-alarm.wav', 'default-alarm.wav')
 
     @property
     def timer_sound_file(self) -> str:
         """
         Return the path to a valid timer sound resource file
         """
-        filename = self.preference_skill().get('sound_timer') or \
-            'default-timer.wav'
-        if os.path.isfile(filename):
-            return filename
-        file = resolve_resource_file(filename,
-                                     os.path.join(self.root_dir, "res"),
-                                     self.config_core)
-        if not file:
-            LOG.warning(f'Could not resolve requested file: {filename}')
-            file = os.path.join(self.root_dir, 'res', 'snd',
-                                'default-timer.wav')
-        if not file:
-            raise FileNotFoundError(f"Could not resolve sound: {filename}")
-        return file
+        return self._resolve_sound_file(
+            self.preference_skill().get('sound_timer') or
+            'default-timer.wav', 'default-timer.wav')
+
+    @property
+    def gapless_playback(self) -> bool:
+        """
+        If true, loop alert sounds continuously through a single player
+        """
+        return self._get_bool_setting("gapless_playback", True)
 
     @property
     def escalate_volume(self) -> bool:
@@ -146,6 +180,30 @@ class AlertSkill(NeonSkill):
         """
         return self.preference_skill().get("escalate_volume", True)
 
+    @property
+    def metrics_file(self) -> Optional[str]:
+        """
+        Path to periodically write metrics to in the Prometheus text format
+        """
+        return self.preference_skill().get("metrics_file") or None
+
+    @property
+    def delivery_lag_budget(self) -> Optional[float]:
+        """
+        Maximum seconds from an alert's expiration to notifying the user.
+        Deliveries exceeding this are logged and counted in metrics.
+        """
+        budget = self.preference_skill().get("delivery_lag_budget")
+        return float(budget) if budget else None
+
+    @property
+    def batch_remote_expirations(self) -> bool:
+        """
+        If true, expirations for remote clients are emitted in batches as
+        `neon.alert_expired.batch` instead of individual `neon.alert_expired`
+        """
+        return self._get_bool_setting("batch_remote_expirations", False)
+
     @property
     def quiet_hours(self) -> bool:
         """
@@ -179,9 +237,58 @@ class AlertSkill(NeonSkill):
             timeout_minutes = 1
         return 60 * timeout_minutes
 
+    @property
+    def schedule_horizon(self) -> Optional[timedelta]:
+        """
+        Return how far ahead pending alerts are scheduled. Alerts expiring
+        later are scheduled once they enter the horizon. None schedules all
+        alerts immediately.
+        """
+        horizon_hours = self.preference_skill().get('schedule_horizon_hours',
+                                                    24)
+        if not isinstance(horizon_hours, (int, float)):
+            LOG.error(f'Invalid `schedule_horizon_hours` in settings. '
+                      f'Expected a number but got: {horizon_hours}')
+            horizon_hours = 24
+        return timedelta(hours=horizon_hours) if horizon_hours > 0 else None
+
+    @property
+    def cache_encoding(self) -> str:
+        """
+        Return the encoding used to persist alerts (`json` or `msgpack`).
+        `msgpack` falls back to `json` if msgpack is not installed.
+        """
+        encoding = self.preference_skill().get('cache_encoding') or 'json'
+        if encoding not in ('json', 'msgpack'):
+            LOG.error(f'Invalid `cache_encoding` in settings. '
+                      f'Expected json or msgpack but got: {encoding}')
+            encoding = 'json'
+        if encoding == 'msgpack':
+            try:
+                import msgpack
+            except ImportError:
+                LOG.error('`cache_encoding` is msgpack but msgpack is not '
+                          'installed; using json')
+                encoding = 'json'
+        return encoding
+
+    @property
+    def alert_context_keys(self) -> Optional[tuple]:
+        """
+        Return the message context keys to keep in new alerts. Keys listed in
+        the `alert_context_keys` setting are kept in addition to the defaults;
+        `*` keeps the full message context.
+        """
+        extra_keys = self.preference_skill().get('alert_context_keys') or []
+        if isinstance(extra_keys, str):
+            extra_keys = [key.strip() for key in extra_keys.split(',')]
+        if "*" in extra_keys:
+            return None
+        return (*ALERT_CONTEXT_KEYS, *extra_keys)
+
     @property
     def use_24hour(self) -> bool:
-        return get_user_prefs()["units"]["time"] == 24
+        return user_prefs.use_24hour(dig_for_message())
 
     # TODO: Move to __init__ after stable ovos-workshop
     def initialize(self):
@@ -189,7 +296,12 @@ class AlertSkill(NeonSkill):
         self._alert_manager = AlertManager(os.path.join(self.file_system.path,
                                                         "alerts.json"),
                                            self.event_scheduler,
-                                           self._alert_expired)
+                                           self._alert_expired,
+                                           schedule_horizon=self.schedule_horizon,
+                                           cache_encoding=self.cache_encoding,
+                                           change_callback=self._alert_changed,
+                                           remote_callback=self._remote_alert_expired,
+                                           context_keys=self.alert_context_keys)
 
         # Update Homescreen UI models
         self.add_event("mycroft.ready", self.on_ready)
@@ -200,14 +312,37 @@ class AlertSkill(NeonSkill):
                        self._gui_dismiss_notification)
         self.add_event("ovos.gui.show.active.timers", self._on_display_gui)
         self.add_event("ovos.gui.show.active.alarms", self._on_display_gui)
+        self.add_event("neon.profile_update", self._on_profile_update)
+        self.add_event("configuration.updated", self._on_profile_update)
+        self.add_event("neon.alerts.get_metrics", self._get_metrics)
+        self.add_event("mycroft.volume.get.response", self._on_volume_changed)
+        self.add_event("mycroft.volume.set", self._on_volume_changed)
+        self.add_event("mycroft.volume.increase", self._on_volume_adjusted)
+        self.add_event("mycroft.volume.decrease", self._on_volume_adjusted)
+        self.add_event("neon.alerts.get_delivery_traces",
+                       self._get_delivery_traces)
 
         self.gui.register_handler("timerskill.gui.stop.timer",
                                   self._gui_cancel_timer)
+        self.gui.register_handler("timerskill.gui.page.timers",
+                                  self._gui_page_timers)
         self.gui.register_handler("ovos.alarm.skill.cancel",
                                   self._gui_cancel_alarm)
         self.gui.register_handler("ovos.alarm.skill.snooze",
                                   self._gui_snooze_alarm)
 
+        # Get the current volume so it is known before any alert plays
+        self.bus.emit(Message("mycroft.volume.get"))
+        # Decode alert sounds so they are ready before any alert plays
+        self.settings_change_callback = self._on_settings_changed
+        create_daemon(self._preload_sounds)
+
+        self.schedule_repeating_event(self._prerender_upcoming, None,
+                                      _PRERENDER_SWEEP_SECONDS,
+                                      name="prerender_alerts")
+
+        self._schedule_metrics_writes()
+
     def on_ready(self, _: Message):
         """
         On ready, update the Home screen elements
@@ -235,7 +370,8 @@ class AlertSkill(NeonSkill):
                                         self._get_user_tz(message),
                                         self.use_24hour,
                                         self._get_spoken_alert_type,
-                                        self.find_resource)
+                                        self.find_resource,
+                                        self.alert_context_keys)
         if not alert:
             self.speak_dialog("error_no_time",
                               {"kind": self.translate("word_alarm")},
@@ -257,7 +393,8 @@ class AlertSkill(NeonSkill):
         alert = build_alert_from_intent(message, AlertType.TIMER, tz,
                                         self.use_24hour,
                                         self._get_spoken_alert_type,
-                                        self.find_resource)
+                                        self.find_resource,
+                                        self.alert_context_keys)
         if not alert:
             self.speak_dialog('error_no_duration', private=True)
             return  # TODO: Converse to get time
@@ -280,7 +417,8 @@ class AlertSkill(NeonSkill):
                                         self._get_user_tz(message),
                                         self.use_24hour,
                                         self._get_spoken_alert_type,
-                                        self.find_resource)
+                                        self.find_resource,
+                                        self.alert_context_keys)
         if not alert:
             self.speak_dialog("error_no_time",
                               {"kind": self.translate("word_reminder")},
@@ -382,10 +520,11 @@ class AlertSkill(NeonSkill):
             self._display_alarms(alerts_list)
         elif alert_type == AlertType.TIMER:
             self._display_timers(alerts_list)
+        use_24hour = self.use_24hour
         for alert in alerts_list:
             data = self._get_alert_dialog_data(alert,
                                                message.data.get("lang"),
-                                               self.use_24hour)
+                                               use_24hour)
             if alert.repeat_days or alert.repeat_frequency:
                 add_str = self.dialog_renderer.render("list_alert_repeating",
                                                       data)
@@ -439,14 +578,14 @@ class AlertSkill(NeonSkill):
         matched_timers_by_name = [timer for timer in user_timers
                                   if timer.alert_name in
                                   message.data.get("utterance", "")]
+        now_time = datetime.now(timezone.utc)
         # Only one timer to report
         if len(matched_timers_by_name) == 1 or len(user_timers) == 1:
             matched_timer: Alert = matched_timers_by_name[0] if \
                 matched_timers_by_name else user_timers[0]
             name = matched_timer.alert_name
-            expiration = matched_timer.next_expiration
             remaining_time = \
-                spoken_time_remaining(matched_timer.next_expiration,
+                spoken_time_remaining(matched_timer.next_expiration, now_time,
                                       lang=message.data.get("lang"))
             self._display_timer_gui(matched_timer)
             self.speak_dialog('timer_status',
@@ -457,7 +596,7 @@ class AlertSkill(NeonSkill):
             to_speak = ""
             for timer in user_timers:
                 remaining_time = \
-                    spoken_time_remaining(timer.next_expiration,
+                    spoken_time_remaining(timer.next_expiration, now_time,
                                           lang=message.data.get("lang"))
                 part = self.dialog_renderer.render(
                     'timer_status',
@@ -497,10 +636,11 @@ class AlertSkill(NeonSkill):
                                                            AlertState.MISSED)
         if missed_alerts:  # TODO: Unit test this DM
             self.speak_dialog("list_alert_missed_intro", private=True)
+            use_24hour = self.use_24hour
             for alert in missed_alerts:
                 data = self._get_alert_dialog_data(alert,
                                                    message.data.get("lang"),
-                                                   self.use_24hour)
+                                                   use_24hour)
                 if alert.repeat_days or alert.repeat_frequency:
                     self.speak_dialog("list_alert_repeating",
                                       data, private=True)
@@ -584,11 +724,12 @@ class AlertSkill(NeonSkill):
         spoken_duration = spoken_time_remaining(alert.next_expiration,
                                                 anchor_time -
                                                 timedelta(seconds=1))
+        use_24hour = user_prefs.use_24hour(message)
         # This is patching LF type annotation bug
         # noinspection PyTypeChecker
         spoken_alert_time = \
             nice_time(alert.next_expiration, message.data.get("lang", "en-us"),
-                      use_24hour=self.use_24hour)
+                      use_24hour=use_24hour)
 
         # Schedule alert expirations
         self.alert_manager.add_alert(alert)
@@ -605,7 +746,7 @@ class AlertSkill(NeonSkill):
             return
 
         if alert.alert_type == AlertType.ALARM:
-            self._display_alarm_gui(alert)
+            self._display_alarm_gui(alert, use_24hour)
 
         # Notify one-time Alert
         if not alert.repeat_days and not alert.repeat_frequency:
@@ -695,11 +836,12 @@ class AlertSkill(NeonSkill):
                     self.gui.release()
                     return True
         # Check for pending timer
-        elif self.alert_manager.active_gui_timers:
+        elif self.alert_manager.get_gui_timers_page(limit=0)[1]:
             for utterance in message.data.get("utterances"):
                 if self.voc_match(utterance, "dismiss"):
                     LOG.debug("Pending timer(s) found")
-                    timer = self.alert_manager.active_gui_timers[0]
+                    timer = self.alert_manager.get_gui_timers_page(
+                        limit=1)[0][0]
                     LOG.info(f"Dismissing: {timer.alert_name}")
                     self._dismiss_alert(get_alert_id(timer),
                                         AlertType.TIMER, True)
@@ -716,6 +858,7 @@ class AlertSkill(NeonSkill):
         :param alert: Alert to be snoozed
         :param utterance: Optional utterance matched requesting "snooze"
         """
+        from lingua_franca.parse import extract_duration, extract_datetime
         anchor_time = anchor_time or datetime.now(self._get_user_tz(message))
         utterance = utterance or message.data.get('utterances', [None])[0]
         alert_id = get_alert_id(alert)
@@ -744,13 +887,19 @@ class AlertSkill(NeonSkill):
                            "duration": nice_duration(snooze_duration)})
 
     # GUI methods
-    def _display_alarm_gui(self, alert: Alert):
+    def _display_alarm_gui(self, alert: Alert,
+                           use_24hour: Optional[bool] = None):
         """
         Display an alarm UI for created or active alarms.
         :param alert: Alarm Alert object to display
+        :param use_24hour: User preference to use 24-hour time scale (None to
+            look up the preference for the alert's user)
         """
+        from skill_alerts.util.ui_models import build_alarm_data
         self.gui.remove_page("AlarmsOverviewCard.qml")
-        for key, val in build_alarm_data(alert).items():
+        with self._gui_alarms_lock:
+            self._gui_alarms = dict()
+        for key, val in build_alarm_data(alert, use_24hour).items():
             self.gui[key] = val
         if alert.is_expired:
             # Display expiration until dismissed
@@ -768,10 +917,8 @@ class AlertSkill(NeonSkill):
         the new timer in the time-sorted list
         :param alert: Timer Alert object to display
         """
-        # If the user asks how much time, don't duplicate the timer
-        if not any((get_alert_id(alert) == get_alert_id(active) for active in
-                    self.alert_manager.active_gui_timers)):
-            self.alert_manager.add_timer_to_gui(alert)
+        # If the user asks how much time, the timer is not duplicated
+        self.alert_manager.add_timer_to_gui(alert)
         self.gui.show_page("Timer.qml", override_idle=True)
         self._update_homescreen(do_timers=True)
         # Start persistent GUI
@@ -782,11 +929,17 @@ class AlertSkill(NeonSkill):
         Create a GUI view with the passed list of alarms and show immediately
         :param alarms: List of alarm type Alerts to display
         """
-        alarms_view = list()
-        for alarm in alarms:
-            alarms_view.append(build_alarm_data(alarm))
-        self.gui['activeAlarmCount'] = len(alarms_view)
-        self.gui['activeAlarms'] = alarms_view
+        from skill_alerts.util.ui_models import build_alarm_data
+        # Alarms listed together belong to one user; resolve prefs once
+        use_24hour = user_prefs.use_24hour(
+            Message("neon.alert", alarms[0].data, alarms[0].context)) \
+            if alarms else None
+        with self._gui_alarms_lock:
+            self._gui_alarms = {get_alert_id(alarm):
+                                build_alarm_data(alarm, use_24hour)
+                                for alarm in alarms}
+            self.gui['activeAlarmCount'] = len(self._gui_alarms)
+            self.gui['activeAlarms'] = list(self._gui_alarms.values())
         self.gui.show_page("AlarmsOverviewCard.qml")
 
     def _display_timers(self, timers: List[Alert]):
@@ -805,7 +958,8 @@ class AlertSkill(NeonSkill):
         :param do_timers: Update timers
         """
         if do_timers:
-            widget_data = {"count": len(self.alert_manager.active_gui_timers),
+            timer_count = self.alert_manager.get_gui_timers_page(limit=0)[1]
+            widget_data = {"count": timer_count,
                            "action": "alerts.gui.show_timers"}
             message = Message("ovos.widgets.update",
                               {"type": "timer", "data": widget_data})
@@ -821,6 +975,20 @@ class AlertSkill(NeonSkill):
             LOG.debug(f"Updating GUI alarms with: {widget_data}")
             self.bus.emit(message)
 
+    def _on_profile_update(self, message: Message):
+        """
+        Handle updated user profiles or configuration by removing cached
+        preferences.
+        :param message: Message associated with the update
+        """
+        if message.msg_type == "neon.profile_update":
+            username = message.data.get("profile", {}).get("user",
+                                                           {}).get("username")
+        else:
+            username = None
+        LOG.debug(f"Invalidating cached preferences for: {username or 'all'}")
+        user_prefs.invalidate(username)
+
     def _on_display_gui(self, message: Message):
         """
         Handle Messages requesting display of GUI
@@ -846,23 +1014,52 @@ class AlertSkill(NeonSkill):
         """
         if not self._gui_timer_lock.acquire(True, 1):
             return
-        while self.alert_manager.active_gui_timers:
-            timers_to_display = self.alert_manager.active_gui_timers[:10]
-            if timers_to_display:
-                display_data = [build_timer_data(timer)
-                                for timer in timers_to_display]
-                self.gui['activeTimers'] = {'timers': display_data}
+        while self._update_timer_gui():
             time.sleep(1)
         self._gui_timer_lock.release()
         self.gui.release()
 
+    def _update_timer_gui(self) -> int:
+        """
+        Update the Timer UI with the currently displayed page of timers. Only
+        timers on the displayed page are rendered.
+        :returns: total number of GUI timers
+        """
+        from skill_alerts.util.ui_models import build_timers_data
+        timers, total, times = self.alert_manager.get_gui_timers_page(
+            self._timer_gui_offset, _TIMER_GUI_PAGE_SIZE)
+        if not timers and total:
+            # Timers on the displayed page were dismissed; show the last page
+            self._timer_gui_offset = \
+                (total - 1) // _TIMER_GUI_PAGE_SIZE * _TIMER_GUI_PAGE_SIZE
+            timers, total, times = self.alert_manager.get_gui_timers_page(
+                self._timer_gui_offset, _TIMER_GUI_PAGE_SIZE)
+        if timers:
+            self.gui['activeTimers'] = {
+                'timers': build_timers_data(timers, times=times)}
+            self.gui['activeTimerCount'] = len(timers)
+            self.gui['timerTotal'] = total
+            self.gui['timerOffset'] = self._timer_gui_offset
+            self.gui['timerPageSize'] = _TIMER_GUI_PAGE_SIZE
+        return total
+
+    def _gui_page_timers(self, message):
+        """
+        Handle a GUI request to display a different page of timers
+        """
+        total = self.alert_manager.get_gui_timers_page(limit=0)[1]
+        offset = int(message.data.get('offset') or 0)
+        offset = min(max(offset, 0), max(total - 1, 0))
+        self._timer_gui_offset = \
+            offset // _TIMER_GUI_PAGE_SIZE * _TIMER_GUI_PAGE_SIZE
+        self._update_timer_gui()
+
     def _gui_cancel_timer(self, message):
         """
         Handle a GUI timer dismissal
         """
         alert_id = message.data['timer']['alertId']
         self._dismiss_alert(alert_id, AlertType.TIMER, True)
-        LOG.debug(self.alert_manager.active_gui_timers)
 
     def _gui_cancel_alarm(self, message):
         """
@@ -871,17 +1068,17 @@ class AlertSkill(NeonSkill):
         alert_id = message.data.get('alarmIndex')
         LOG.info(f"GUI Cancel alert: {alert_id}")
         self._dismiss_alert(alert_id, AlertType.ALARM, True)
-        if self.gui.get('activeAlarms'):
-            # Multi Alarm view
-            for alarm in self.gui.get('activeAlarms'):
-                if alarm.get('alarmIndex') == alert_id:
-                    self.gui['activeAlarms'].remove(alarm)
-                    break
-            self.gui['activeAlarmCount'] = len(self.gui['activeAlarms'])
-            if self.gui['activeAlarmCount'] == 0:
-                self.gui.release()
-        else:
-            # Single alarm view
+        with self._gui_alarms_lock:
+            if self._gui_alarms:
+                # Multi Alarm view
+                self._gui_alarms.pop(alert_id, None)
+                self.gui['activeAlarms'] = list(self._gui_alarms.values())
+                self.gui['activeAlarmCount'] = len(self._gui_alarms)
+                release = not self._gui_alarms
+            else:
+                # Single alarm view
+                release = True
+        if release:
             self.gui.release()
 
     def _gui_snooze_alarm(self, message):
@@ -920,6 +1117,12 @@ class AlertSkill(NeonSkill):
             self._dismiss_alert(alert_id, alert.alert_type)
         else:
             LOG.error(f"Alert not active or missed! {alert_id}")
+        # Dismiss missed alerts listed in a combined notification
+        for grouped in message.data.get('alerts') or []:
+            grouped = Alert.from_dict(grouped)
+            grouped_id = get_alert_id(grouped)
+            if grouped_id in self.alert_manager.missed_alerts:
+                self._dismiss_alert(grouped_id, grouped.alert_type)
 
     def _gui_notify_expired(self, alert: Alert):
         """
@@ -934,7 +1137,7 @@ class AlertSkill(NeonSkill):
         elif alert.alert_type == AlertType.ALARM:
             self._display_alarm_gui(alert)
         elif alert.alert_type == AlertType.REMINDER:
-            self._create_notification(alert)
+            self._notify_expired_reminder(alert)
         else:
             self.gui.show_text(alert.alert_name,
                                self._get_spoken_alert_type(alert.alert_type))
@@ -946,12 +1149,16 @@ class AlertSkill(NeonSkill):
                          f"{alert_name}"
         return alert_name
 
-    def _create_notification(self, alert: Alert):
+    def _create_notification(self, alert: Alert,
+                             grouped: Optional[List[Alert]] = None) -> str:
         """
         Generate a notification for the specified alert
         :param alert: expired alert to generate a notification for
+        :param grouped: alerts to list in one combined notification
+        :returns: text of the created notification
         """
-        alert_name = self._notification_name_for_alert(alert)
+        alert_name = ", ".join(self._notification_name_for_alert(a)
+                               for a in grouped or [alert])
         # TODO: Implement ovos_utils.gui.GUIInterface in `NeonSkill`
         notification_data = {
             'sender': self.skill_id,
@@ -961,11 +1168,33 @@ class AlertSkill(NeonSkill):
             alert.priority > AlertPriority.AVERAGE else 'transient',
             'style': 'info',
             'callback_data': {'alert': alert.data,
+                              'alerts': [a.data for a in grouped or []],
                               'notification': alert_name}
         }
         LOG.info(f'showing notification: {notification_data}')
         self.bus.emit(Message("ovos.notification.api.set",
                               data=notification_data))
+        return alert_name
+
+    def _notify_expired_reminder(self, alert: Alert):
+        """
+        Generate a notification for an expired reminder. Reminders that expire
+        together share one notification listing each of them.
+        :param alert: expired reminder
+        """
+        group = self._get_expired_group(get_alert_id(alert))
+        if not group:
+            self._create_notification(alert)
+            return
+        with self._expired_groups_lock:
+            reminders = [a for a in group["alerts"].values()
+                         if a.alert_type == AlertType.REMINDER]
+            previous = group["notification"]
+            if previous:
+                self._dismiss_notification(
+                    Message("dismiss", {'notification': previous}))
+            group["notification"] = self._create_notification(
+                alert, reminders if len(reminders) > 1 else None)
 
     def _dismiss_notification(self, message):
         """
@@ -977,31 +1206,182 @@ class AlertSkill(NeonSkill):
             {"notification": {"sender": self.skill_id,
                               "text": message.data.get("notification")}}))
 
+    def _alert_changed(self, change: dict):
+        """
+        Callback for AlertManager changes to notify clients mirroring alerts
+        :param change: dict change recorded by AlertManager
+        """
+        self.bus.emit(Message("neon.alert_changed", change,
+                              {"user": change["user"]}))
+        if "active" not in change["dispositions"]:
+            # Stop playback as soon as an alert is no longer active
+            self._stop_looping_player(change["ident"])
+        if change["change"] in ("created", "rescheduled", "snoozed"):
+            alert = Alert.from_dict(change["alert"])
+            if alert.next_expiration and alert.time_to_expiration <= \
+                    _PRERENDER_HORIZON:
+                create_daemon(self._prerender_alert, (alert,))
+
     # Handlers for expired alerts
     def _alert_expired(self, alert: Alert):
         """
         Callback for AlertManager on Alert expiration
         :param alert: expired Alert object
         """
-        LOG.info(f'alert expired: {get_alert_id(alert)}')
-        alert_msg = Message("neon.alert_expired", alert.data, alert.context)
+        alert_id = get_alert_id(alert)
+        LOG.info(f'alert expired: {alert_id}')
+        tracer = self.alert_manager.tracer
+        tracer.budget = self.delivery_lag_budget
+        tracer.mark(alert_id, "alert_expired")
+        alert_msg = Message("neon.alert_expired", alert.data,
+                            {**alert.context,
+                             "delivery_trace": tracer.get_trace(alert_id)})
         self.bus.emit(alert_msg)
         if alert.context.get("mq"):
             LOG.info("Alert from remote client; do nothing locally")
+            self._finish_delivery_trace(alert_id, "remote")
             return
+        group = None if alert.script_filename else \
+            self._join_expired_group(alert)
         self.make_active()
+        tracer.mark(alert_id, "make_active")
         self._gui_notify_expired(alert)
+        tracer.mark(alert_id, "gui_notify")
 
         if alert.script_filename:
             self._run_notify_expired(alert, alert_msg)
-        elif alert.audio_file:
-            self._play_notify_expired(alert, alert_msg)
-        elif alert.alert_type == AlertType.ALARM and not self.speak_alarm:
-            self._play_notify_expired(alert, alert_msg)
-        elif alert.alert_type == AlertType.TIMER and not self.speak_timer:
-            self._play_notify_expired(alert, alert_msg)
-        else:
-            self._speak_notify_expired(alert, alert_msg)
+            return
+        if not group:
+            # The notification already playing for this user includes it
+            LOG.info(f"Notifying with other expired alerts: {alert_id}")
+            self._finish_delivery_trace(alert_id, "grouped")
+            return
+        user = get_alert_user(alert)
+        try:
+            if self._is_spoken_alert(alert):
+                self._speak_notify_expired(alert, alert_msg)
+            else:
+                self._play_notify_expired(alert, alert_msg)
+        finally:
+            with self._expired_groups_lock:
+                if self._expired_groups.get(user) is group:
+                    self._expired_groups.pop(user)
+
+    def _join_expired_group(self, alert: Alert) -> Optional[dict]:
+        """
+        Add an expired alert to the group of alerts notified together for its
+        user. The first alert to expire starts the group and notifies the
+        user of every alert that joins it until none are active.
+        :param alert: expired Alert
+        :returns: the started group, or None if the alert joined a group
+        """
+        user = get_alert_user(alert)
+        timeout = time.time() + self.alert_timeout_seconds
+        with self._expired_groups_lock:
+            group = self._expired_groups.get(user)
+            started = group is None
+            if started:
+                group = {"alerts": dict(), "notification": None}
+                self._expired_groups[user] = group
+            group["alerts"][get_alert_id(alert)] = alert
+            group["timeout"] = timeout
+        return group if started else None
+
+    def _get_expired_group(self, alert_id: str) -> Optional[dict]:
+        """
+        Get the group of alerts being notified together with an alert
+        :param alert_id: ID of an expired alert
+        :returns: dict group with `alerts` by ID, or None if not grouped
+        """
+        with self._expired_groups_lock:
+            return next((group for group in self._expired_groups.values()
+                         if alert_id in group["alerts"]), None)
+
+    def _get_notifying_alerts(self, alert: Alert,
+                              timeout: float) -> List[Alert]:
+        """
+        Get the active alerts to notify the user of along with `alert`. Once
+        none are active or the notification times out, the group is closed
+        and any alerts still active are marked missed.
+        :param alert: expired Alert being notified
+        :param timeout: time after which active alerts are missed
+        :returns: list of active alerts, empty once notification should stop
+        """
+        user = get_alert_user(alert)
+        with self._expired_groups_lock:
+            group = self._expired_groups.get(user)
+            if group and get_alert_id(alert) in group["alerts"]:
+                alerts = list(group["alerts"].values())
+                timeout = max(timeout, group["timeout"])
+            else:
+                group = None
+                alerts = [alert]
+            active = [a for a in alerts if self.alert_manager.get_alert_status(
+                get_alert_id(a)) == AlertState.ACTIVE]
+            if active and time.time() < timeout:
+                return active
+            if group:
+                self._expired_groups.pop(user)
+        for missed in active:
+            self._missed_alert(get_alert_id(missed))
+        return []
+
+    def _finish_delivery_trace(self, alert_id: str, stage: str):
+        """
+        Record that the user is being notified of an expired alert and record
+        the delivery lag.
+        :param alert_id: ID of the expired alert
+        :param stage: name of the notification stage
+        """
+        tracer = self.alert_manager.tracer
+        trace = tracer.finish(alert_id, stage)
+        if trace:
+            self.alert_manager.metrics.observe(
+                "neon_alerts_notification_latency_seconds",
+                max(trace["lag"], 0))
+            if tracer.budget is not None and trace["lag"] > tracer.budget:
+                self.alert_manager.metrics.increment(
+                    "neon_alerts_delivery_over_budget_total")
+
+    def _remote_alert_expired(self, alert: Alert):
+        """
+        Callback for AlertManager on expiration of an Alert from a remote
+        client. Remote clients handle notifications, so only an expiration
+        event is emitted.
+        :param alert: expired Alert object
+        """
+        LOG.info(f'remote alert expired: {get_alert_id(alert)}')
+        if not self.batch_remote_expirations:
+            self.bus.emit(Message("neon.alert_expired", alert.data,
+                                  alert.context))
+            return
+        from skill_alerts.util.encoding import to_compact
+        mq = alert.context.get("mq")
+        client = mq.get("routing_key") if isinstance(mq, dict) else None
+        client = client or str(mq)
+        with self._remote_expirations_lock:
+            schedule_flush = not self._remote_expirations
+            context, alerts = self._remote_expirations.setdefault(
+                client, ({key: alert.context[key] for key in
+                          ("mq", "user", "username", "source", "destination")
+                          if key in alert.context}, list()))
+            alerts.append(to_compact(alert, ()))
+        if schedule_flush:
+            self.schedule_event(self._flush_remote_expirations,
+                                _REMOTE_EXPIRATION_BATCH_SECONDS,
+                                name="flush_remote_expirations")
+
+    def _flush_remote_expirations(self, _=None):
+        """
+        Emit one `neon.alert_expired.batch` message per remote client with all
+        alerts that expired since the last flush.
+        """
+        with self._remote_expirations_lock:
+            batches = self._remote_expirations
+            self._remote_expirations = dict()
+        for context, alerts in batches.values():
+            self.bus.emit(Message("neon.alert_expired.batch",
+                                  {"alerts": alerts}, context))
 
     def _run_notify_expired(self, alert: Alert, message: Message):
         """
@@ -1012,6 +1392,7 @@ class AlertSkill(NeonSkill):
         message = message.forward("neon.run_alert_script",
                                   {"file_to_run": alert.script_filename})
         # emit a message telling CustomConversations to run a script
+        self._finish_delivery_trace(get_alert_id(alert), "run_script")
         self.bus.emit(message)
         LOG.info("The script has been executed with CC")
         self.alert_manager.dismiss_active_alert(get_alert_id(alert))
@@ -1021,6 +1402,7 @@ class AlertSkill(NeonSkill):
         Handle audio playback on alert expiration
         :param alert: Alert that has expired
         """
+        from ovos_utils.sound import play_audio
         if alert.audio_file:
             LOG.debug(alert.audio_file)
             self.speak_dialog("expired_audio_alert_intro", private=True)
@@ -1040,14 +1422,34 @@ class AlertSkill(NeonSkill):
 
         timeout = time.time() + self.alert_timeout_seconds
         alert_id = get_alert_id(alert)
-        volume_message = message.forward("mycroft.volume.get")
-        resp = self.bus.wait_for_response(volume_message)
-        if resp:
-            volume = resp.data.get('percent')
-        else:
-            volume = None
-        while self.alert_manager.get_alert_status(alert_id) == \
-                AlertState.ACTIVE and time.time() < timeout:
+        if self._volume is None:
+            # Playback doesn't wait; the response updates the cached volume
+            self.bus.emit(message.forward("mycroft.volume.get"))
+        if self.escalate_volume:
+            with self._escalation_lock:
+                if not self._escalating_alerts:
+                    # Record the volume before any alert escalates it
+                    self._restore_volume = self._volume
+                self._escalating_alerts[alert_id] = message
+            self.schedule_repeating_event(self._escalate_volume, None,
+                                          _VOLUME_ESCALATION_SECONDS,
+                                          {"alert_id": alert_id},
+                                          name=f"escalate_volume.{alert_id}")
+        player = self._start_looping_player(alert_id, to_play, message)
+        self._finish_delivery_trace(alert_id, "play_audio")
+        # Play until alerts are dismissed or an alert to speak is grouped in
+        alerts = self._get_notifying_alerts(alert, timeout)
+        if player:
+            while alerts and not any(map(self._is_spoken_alert, alerts)):
+                stopped = player.wait(0.5)
+                # Refresh after playback stops so a dismissal is not followed
+                # by fallback playback
+                alerts = self._get_notifying_alerts(alert, timeout)
+                if stopped:
+                    break
+            self._stop_looping_player(alert_id)
+        # Fall back to repeated playback if looping is unavailable or failed
+        while alerts and not any(map(self._is_spoken_alert, alerts)):
             if message.context.get("klat_data"):
                 log_deprecation("`klat.response` emit will be removed. Listen "
                                 "for `neon.alert_expired", "4.0.0")
@@ -1058,38 +1460,251 @@ class AlertSkill(NeonSkill):
                 # TODO: refactor to `self.play_audio`
                 LOG.debug(f"Playing file: {to_play}")
                 play_audio(to_play).wait(60)
-            time.sleep(1)  # TODO: Skip this and play continuously?
-            if self.escalate_volume:
-                self.bus.emit(message.forward("mycroft.volume.increase"))
-
-        if volume:
-            # Reset initial volume
-            self.bus.emit(message.forward("mycroft.volume.set",
-                                          {"percent": volume}))
-        if self.alert_manager.get_alert_status(alert_id) == AlertState.ACTIVE:
-            self._missed_alert(alert_id)
+            time.sleep(1)
+            alerts = self._get_notifying_alerts(alert, timeout)
+
+        if alert_id in self._escalating_alerts:
+            self.cancel_scheduled_event(f"escalate_volume.{alert_id}")
+            with self._escalation_lock:
+                self._escalating_alerts.pop(alert_id)
+                volume = None
+                if not self._escalating_alerts:
+                    volume = self._restore_volume
+                    self._restore_volume = None
+            if volume is not None:
+                # Reset initial volume after the last escalating alert
+                self.bus.emit(message.forward("mycroft.volume.set",
+                                              {"percent": volume}))
+        if alerts:
+            self._speak_notify_expired(alert, message)
+
+    def _resolve_sound_file(self, filename: str, default: str) -> str:
+        """
+        Resolve a sound setting to a file path. Resolved paths are cached until
+        settings change.
+        :param filename: configured sound file name or path
+        :param default: sound file in `res/snd` to use if `filename` is not
+            found
+        :returns: path to a sound file
+        """
+        if filename in self._sound_files:
+            return self._sound_files[filename]
+        if os.path.isfile(filename):
+            file = filename
+        else:
+            file = resolve_resource_file(filename,
+                                         os.path.join(self.root_dir, "res"),
+                                         self.config_core)
+        if not file:
+            LOG.warning(f'Could not resolve requested file: {filename}')
+            file = os.path.join(self.root_dir, 'res', 'snd', default)
+        self._sound_files[filename] = file
+        return file
+
+    def _on_settings_changed(self):
+        """
+        Apply changed skill settings
+        """
+        self._preload_sounds()
+        self._schedule_metrics_writes()
+
+    def _schedule_metrics_writes(self):
+        """
+        Schedule periodic writes of `metrics_file` if it is configured,
+        otherwise cancel them.
+        """
+        self.cancel_scheduled_event("write_metrics")
+        if self.metrics_file:
+            self.schedule_repeating_event(self._write_metrics, None,
+                                          _METRICS_WRITE_SECONDS,
+                                          name="write_metrics")
+
+    def _preload_sounds(self):
+        """
+        Resolve and decode the configured alarm and timer sounds, replacing
+        any previously cached sounds.
+        """
+        self._sound_files = dict()
+        self._sound_cache.clear()
+        self._sound_cache.preload({self.alarm_sound_file,
+                                   self.timer_sound_file})
+
+    def _start_looping_player(self, alert_id: str, to_play: str,
+                              message: Message) -> Optional[LoopingPlayer]:
+        """
+        Start looping playback of a sound for an alert
+        :param alert_id: ID of the alert being played
+        :param to_play: path to the sound file to play
+        :param message: Message associated with the expired alert
+        :returns: started LoopingPlayer or None if looping is not available
+        """
+        if not self.gapless_playback or message.context.get("klat_data"):
+            return None
+        player = LoopingPlayer.from_file(to_play, self._sound_cache)
+        if not player:
+            return None
+        try:
+            player.start()
+        except OSError as e:
+            LOG.error(f"Failed to start looping playback: {e}")
+            return None
+        self._alert_players[alert_id] = player
+        return player
+
+    def _stop_looping_player(self, alert_id: str):
+        """
+        Stop looping playback for an alert, if playing
+        :param alert_id: ID of the alert to stop playback for
+        """
+        player = self._alert_players.pop(alert_id, None)
+        if player:
+            player.stop()
+
+    def _escalate_volume(self, message: Message):
+        """
+        Increase the volume while an alert is playing. Volume is not changed
+        until the volume to restore after playback is known.
+        :param message: scheduled event Message with the `alert_id` of the
+            playing alert
+        """
+        alert_id = message.data.get("alert_id")
+        with self._escalation_lock:
+            alert_message = self._escalating_alerts.get(alert_id)
+            if not alert_message:
+                return
+            if self._restore_volume is None:
+                if self._volume is None:
+                    LOG.debug("Volume not yet known; not escalating")
+                    return
+                self._restore_volume = self._volume
+        # Address the device the alert is playing on, not the scheduler
+        self.bus.emit(alert_message.forward("mycroft.volume.increase"))
+
+    def _on_volume_changed(self, message: Message):
+        """
+        Handle a reported or requested volume and cache it
+        :param message: Message with the volume `percent`
+        """
+        if message.data.get("percent") is not None:
+            self._volume = message.data["percent"]
+
+    def _on_volume_adjusted(self, message: Message):
+        """
+        Handle a relative volume change by requesting the new volume
+        :param message: Message requesting a volume change
+        """
+        self.bus.emit(message.forward("mycroft.volume.get"))
 
     def _speak_notify_expired(self, alert: Alert, message: Message):
         LOG.debug(f"notify alert expired: {get_alert_id(alert)}")
 
         # Notify user until they dismiss the alert
         timeout = time.time() + self.alert_timeout_seconds
-        alert_id = get_alert_id(alert)
-        while self.alert_manager.get_alert_status(alert_id) == \
-                AlertState.ACTIVE and time.time() < timeout:
-            if alert.alert_type == AlertType.REMINDER:
-                self.speak_dialog('expired_reminder',
-                                  {'name': alert.alert_name},
-                                  message=message,
-                                  private=True, wait=True)
-            else:
-                self.speak_dialog('expired_alert', {'name': alert.alert_name},
-                                  message=message,
-                                  private=True, wait=True)
+        self._finish_delivery_trace(get_alert_id(alert), "speak")
+        alerts = self._get_notifying_alerts(alert, timeout)
+        while alerts:
+            self._speak_expired_alerts(alerts, message)
             self.make_active()
             time.sleep(10)
-        if self.alert_manager.get_alert_status(alert_id) == AlertState.ACTIVE:
-            self._missed_alert(alert_id)
+            alerts = self._get_notifying_alerts(alert, timeout)
+
+    def _speak_expired_alerts(self, alerts: List[Alert], message: Message):
+        """
+        Speak one notification for all expired alerts
+        :param alerts: list of active alerts to notify the user of
+        :param message: Message associated with the expired alert
+        """
+        if len(alerts) > 1:
+            names = join_list([a.alert_name for a in alerts], "and",
+                              lang=self.lang)
+            self.speak_dialog('expired_alerts', {'names': names},
+                              message=message, private=True, wait=True)
+            return
+        alert = alerts[0]
+        with self._prerender_lock:
+            audio_file = self._prerendered.get(get_alert_id(alert))
+        if audio_file and os.path.isfile(audio_file) and \
+                not message.context.get("klat_data"):
+            from ovos_utils.sound import play_audio
+            play_audio(audio_file).wait(60)
+        elif alert.alert_type == AlertType.REMINDER:
+            self.speak_dialog('expired_reminder', {'name': alert.alert_name},
+                              message=message, private=True, wait=True)
+        else:
+            self.speak_dialog('expired_alert', {'name': alert.alert_name},
+                              message=message, private=True, wait=True)
+
+    def _is_spoken_alert(self, alert: Alert) -> bool:
+        """
+        Check if an alert will be spoken when it expires
+        :param alert: Alert to check
+        :returns: True if expiration of the alert is spoken locally
+        """
+        if alert.context.get("mq") or alert.script_filename or \
+                alert.audio_file:
+            return False
+        if alert.alert_type == AlertType.ALARM:
+            return self.speak_alarm
+        if alert.alert_type == AlertType.TIMER:
+            return self.speak_timer
+        return True
+
+    def _prerender_alert(self, alert: Alert):
+        """
+        Request TTS audio for an alert's spoken notification so it can be
+        played without synthesis when the alert expires. If rendering fails,
+        the alert may be rendered again on the next sweep.
+        :param alert: Alert to render the notification for
+        """
+        alert_id = get_alert_id(alert)
+        with self._prerender_lock:
+            if alert_id in self._prerendered or \
+                    not self._is_spoken_alert(alert):
+                return
+            # Reserve the entry while rendering so it is only requested once
+            self._prerendered[alert_id] = None
+        audio_file = None
+        try:
+            dialog = 'expired_reminder' if \
+                alert.alert_type == AlertType.REMINDER else 'expired_alert'
+            sentence = self.dialog_renderer.render(dialog,
+                                                   {'name': alert.alert_name})
+            resp = self.bus.wait_for_response(
+                Message("neon.get_tts", {"text": sentence,
+                                         "speaker": {"language": self.lang}},
+                        {"user": get_alert_user(alert)}), timeout=10)
+            files = (resp.data.get(self.lang) or {}) if resp else {}
+            audio_file = next((file for file in files.values()
+                               if isinstance(file, str) and
+                               os.path.isfile(file)), None)
+        finally:
+            with self._prerender_lock:
+                if not audio_file:
+                    self._prerendered.pop(alert_id, None)
+                elif alert_id in self._prerendered:
+                    self._prerendered[alert_id] = audio_file
+        if not audio_file:
+            LOG.debug(f"No TTS audio rendered for: {alert_id}")
+            return
+        LOG.debug(f"Rendered notification for {alert_id}: {audio_file}")
+
+    def _prerender_upcoming(self, _=None):
+        """
+        Render spoken notifications for alerts expiring within the horizon
+        and remove rendered audio for alerts that are no longer scheduled.
+        """
+        upcoming, _ = self.alert_manager.get_alerts_page(
+            disposition="pending",
+            before=datetime.now(timezone.utc) + _PRERENDER_HORIZON)
+        with self._prerender_lock:
+            for alert_id in list(self._prerendered):
+                if not self.alert_manager.has_alert(alert_id):
+                    self._prerendered.pop(alert_id)
+            to_render = [alert for alert in upcoming
+                         if get_alert_id(alert) not in self._prerendered]
+        # Rendering waits on TTS; don't block the scheduler thread
+        for alert in to_render:
+            create_daemon(self._prerender_alert, (alert,))
 
     def _missed_alert(self, alert_id: str):
         """
@@ -1150,6 +1765,21 @@ class AlertSkill(NeonSkill):
         self.alert_manager.dismiss_alert_from_gui(alert_id)
         do_timer = alert_type == AlertType.TIMER
         do_alarm = alert_type == AlertType.ALARM
+        group = self._get_expired_group(alert_id)
+        if group:
+            # Alerts notified together are dismissed together
+            for grouped_id, grouped in list(group["alerts"].items()):
+                if grouped_id != alert_id and \
+                        grouped_id in self.alert_manager.active_alerts:
+                    LOG.debug(f'Dismissing grouped alert: {grouped_id}')
+                    self.alert_manager.dismiss_active_alert(grouped_id)
+                    self.alert_manager.dismiss_alert_from_gui(grouped_id)
+                    do_timer |= grouped.alert_type == AlertType.TIMER
+                    do_alarm |= grouped.alert_type == AlertType.ALARM
+            if group["notification"]:
+                self._dismiss_notification(
+                    Message("dismiss",
+                            {'notification': group["notification"]}))
         self._update_homescreen(do_timer, do_alarm)
 
         if speak:
@@ -1158,7 +1788,9 @@ class AlertSkill(NeonSkill):
 
     def shutdown(self):
         LOG.debug(f"Shutdown, all active alerts are now missed")
+        self._flush_remote_expirations()
         self.alert_manager.shutdown()
+        self._write_metrics()
         self.gui.clear()
 
     def stop(self):
@@ -1223,33 +1855,173 @@ class AlertSkill(NeonSkill):
         candidates.sort(key=lambda match: match[0], reverse=True)
         return candidates[0][1]
 
-    # Static parser methods
+    # Bus event handlers
     def _get_events(self, message):
         """
         Handles a request to get scheduled events for a specified
         user and disposition.
-        :param message: Message specifying 'user' (optional)
-         and 'disposition' (pending/missed)
+        :param message: Message specifying 'user' (optional),
+         'disposition' (pending/missed), 'format_version' (optional), and
+         'encoding' (optional). With `format_version` 2, alerts are returned
+         as dicts instead of serialized strings. With `encoding` `compact`,
+         alerts are returned as compact dicts; with `encoding` `msgpack`,
+         compact alerts are returned as base64-encoded msgpack in `alerts`.
+         Results may be filtered by 'type' (AlertType name or value), 'after'
+         and 'before' (ISO 8601 or epoch expiration times), and projected to
+         the alert data keys in 'fields'. If 'limit' or 'cursor' is specified,
+         one page of alerts is returned in 'alerts' with a 'next_cursor' to
+         request the following page. If 'since' is specified, changes after
+         that version are returned instead of alerts.
         """
         requested_user = message.data.get("user")
         disposition = message.data.get("disposition", "pending")
+        format_version = message.data.get("format_version") or 1
+        encoding = message.data.get("encoding")
+        fields = message.data.get("fields")
+        limit = message.data.get("limit")
+        cursor = message.data.get("cursor")
+
+        if message.data.get("since") is not None:
+            self._get_event_changes(message)
+            return
+        if disposition not in ("pending", "missed"):
+            LOG.error(f"Invalid disposition requested: {disposition}")
+            self.bus.emit(message.response({"error": "Invalid disposition"}))
+            return
+        # Read the version first so changes made while building the response
+        # are included in the client's next `since` request
+        version = self.alert_manager.version
+        try:
+            alert_type = self._parse_events_alert_type(
+                message.data.get("type"))
+            after = self._parse_events_time(message.data.get("after"))
+            before = self._parse_events_time(message.data.get("before"))
+            if limit is not None:
+                limit = int(limit)
+                if limit < 1:
+                    raise ValueError(f"Invalid limit: {limit}")
+            matched, next_cursor = self.alert_manager.get_alerts_page(
+                requested_user, disposition, alert_type, after, before,
+                limit, cursor)
+        except (ValueError, KeyError, TypeError) as e:
+            LOG.error(f"Invalid events request: {e}")
+            self.bus.emit(message.response({"error": "Invalid request"}))
+            return
 
-        if requested_user:
-            matched = self.alert_manager.get_user_alerts(requested_user)
+        if encoding in ("compact", "msgpack"):
+            from skill_alerts.util.encoding import to_compact
+            to_return = {get_alert_id(alert): to_compact(alert)
+                         for alert in matched}
+        elif format_version >= 2 or fields:
+            to_return = {get_alert_id(alert): alert.data for alert in matched}
         else:
-            matched = self.alert_manager.get_all_alerts()
+            to_return = {get_alert_id(alert): alert.serialize
+                         for alert in matched}
+        if fields:
+            to_return = {ident: {key: data[key] for key in fields
+                                 if key in data}
+                         for ident, data in to_return.items()}
+        if encoding == "msgpack":
+            from skill_alerts.util.encoding import pack
+            to_return = {"encoding": "msgpack",
+                         "alerts": b64encode(pack(to_return)).decode()}
+        if limit is not None or cursor is not None:
+            if encoding != "msgpack":
+                to_return = {"alerts": to_return}
+            to_return["next_cursor"] = next_cursor
+            to_return["version"] = version
+        self.bus.emit(message.response(to_return))
 
-        if disposition == "pending":
-            matched = matched["pending"]
-        elif disposition == "missed":
-            matched = matched["missed"]
+    def _get_event_changes(self, message):
+        """
+        Handles a `neon.get_events` request for changes to alerts.
+        :param message: Message specifying 'since' (last version the client
+         has seen) and 'user' (optional). The response contains the current
+         'version', a list of 'changes', and 'reset' if the client must reload
+         all alerts because the requested changes are no longer available.
+        """
+        try:
+            since = int(message.data["since"])
+        except (ValueError, TypeError):
+            LOG.error(f"Invalid version requested: "
+                      f"{message.data.get('since')}")
+            self.bus.emit(message.response({"error": "Invalid request"}))
+            return
+        changes, version, reset = self.alert_manager.get_changes(
+            since, message.data.get("user"))
+        self.bus.emit(message.response({"version": version,
+                                        "changes": changes,
+                                        "reset": reset}))
+
+    def _get_metrics(self, message: Message):
+        """
+        Handles a request for alert timing metrics and counters.
+        :param message: Message optionally specifying 'format' `prometheus` to
+         get metrics in the Prometheus text format
+        """
+        metrics = self.alert_manager.metrics
+        if message.data.get("format") == "prometheus":
+            self.bus.emit(message.response(
+                {"metrics": metrics.to_prometheus()}))
         else:
-            LOG.error(f"Invalid disposition requested: {disposition}")
-            self.bus.emit(message.response({"error": "Invalid disposition"}))
+            self.bus.emit(message.response({"metrics": metrics.snapshot()}))
+
+    def _get_delivery_traces(self, message: Message):
+        """
+        Handles a request for delivery traces of recently expired alerts.
+        :param message: Message optionally specifying an 'alert_id' to get the
+         trace for. Otherwise, a summary and all retained traces are returned.
+        """
+        tracer = self.alert_manager.tracer
+        alert_id = message.data.get("alert_id")
+        if alert_id:
+            self.bus.emit(message.response(
+                {"trace": tracer.get_trace(alert_id)}))
+        else:
+            self.bus.emit(message.response({"summary": tracer.summary(),
+                                            "traces": tracer.get_traces()}))
+
+    def _write_metrics(self, _=None):
+        """
+        Write alert metrics to the configured `metrics_file`, if any.
+        """
+        metrics_file = self.metrics_file
+        if not metrics_file:
             return
+        try:
+            self.alert_manager.metrics.write_prometheus(metrics_file)
+        except OSError as e:
+            LOG.error(f"Failed to write metrics to {metrics_file}: {e}")
 
-        to_return = {get_alert_id(alert): alert.serialize for alert in matched}
-        self.bus.emit(message.response(to_return))
+    # Static parser methods
+    @staticmethod
+    def _parse_events_alert_type(requested_type) -> AlertType:
+        """
+        Parse a requested alert type from a `neon.get_events` request
+        :param requested_type: AlertType name or value (None for all types)
+        :returns: requested AlertType
+        """
+        if requested_type is None:
+            return AlertType.ALL
+        if isinstance(requested_type, str):
+            return AlertType[requested_type.upper()]
+        return AlertType(requested_type)
+
+    @staticmethod
+    def _parse_events_time(requested_time) -> Optional[datetime]:
+        """
+        Parse a requested time from a `neon.get_events` request
+        :param requested_time: ISO 8601 string or epoch timestamp
+        :returns: timezone-aware datetime (None if not requested)
+        """
+        if requested_time is None:
+            return None
+        if isinstance(requested_time, (int, float)):
+            return datetime.fromtimestamp(requested_time, timezone.utc)
+        parsed = datetime.fromisoformat(requested_time)
+        if not parsed.tzinfo:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
 
     def _get_requested_alerts_list(self, user: str,
                                    alert_type: AlertType,
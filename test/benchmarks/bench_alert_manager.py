@@ -0,0 +1,229 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measure latency and memory of AlertManager operations against synthetic
+stores of pending alerts spread across many users. Scheduling is handled by
+an in-process fake so only AlertManager work is measured.
+
+The skill must be installed (i.e. `pip install -e .`) to run this script.
+
+Usage:
+    python test/benchmarks/bench_alert_manager.py [--sizes N [N ...]]
+        [--users N] [--ops N] [--save FILE] [--baseline FILE]
+        [--threshold PCT]
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+import sys
+import tracemalloc
+
+from os.path import join
+from statistics import median
+from tempfile import mkdtemp
+from time import perf_counter
+
+from neon_utils.logger import LOG
+from ovos_bus_client import Message
+
+from skill_alerts.util import AlertType
+from skill_alerts.util.alert import Alert
+from skill_alerts.util.alert_manager import AlertManager
+
+_SEED = 1234
+
+
+class FakeScheduler:
+    """
+    Stand-in for `EventSchedulerInterface` that records scheduled events
+    without a messagebus.
+    """
+
+    def __init__(self):
+        self.events = dict()
+
+    def schedule_event(self, handler, when, data=None, name=None,
+                       context=None):
+        self.events[name] = (handler, when, data, context)
+
+    def cancel_scheduled_event(self, name):
+        self.events.pop(name, None)
+
+
+def _make_alerts(count: int, users: int, rand: random.Random) -> list:
+    """
+    Create pending alerts expiring within the next 30 days
+    :param count: number of alerts to create
+    :param users: number of users to spread alerts across
+    :param rand: seeded Random to generate expirations with
+    :returns: list of Alert objects
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+    alert_types = (AlertType.ALARM, AlertType.TIMER, AlertType.REMINDER)
+    return [Alert.create(now + dt.timedelta(seconds=rand.randint(3600,
+                                                                 2592000)),
+                         f"alert {i}", alert_types[i % len(alert_types)],
+                         context={"user": f"user_{i % users}",
+                                  "ident": f"alert_{i}"})
+            for i in range(count)]
+
+
+def _make_store(path: str, size: int, users: int) -> str:
+    """
+    Write an alerts cache containing `size` pending alerts
+    :param path: directory to write the cache to
+    :param size: number of alerts to cache
+    :param users: number of users to spread alerts across
+    :returns: path to the alerts cache
+    """
+    alerts_file = join(path, f"alerts_{size}.json")
+    manager = AlertManager(alerts_file, FakeScheduler(), lambda _: None)
+    for alert in _make_alerts(size, users, random.Random(_SEED)):
+        manager._schedule_alert_expiration(alert, alert.context["ident"])
+    manager.write_cache_now()
+    return alerts_file
+
+
+def _measure(operation: callable, args: list) -> dict:
+    """
+    Time an operation once per argument; the last argument is used for a
+    separate call with memory tracing
+    :param operation: callable to measure
+    :param args: list of arguments to call `operation` with
+    :returns: dict median ms per call and peak KiB allocated by one call
+    """
+    samples = list()
+    for arg in args[:-1]:
+        start = perf_counter()
+        operation(arg)
+        samples.append(perf_counter() - start)
+    tracemalloc.start()
+    operation(args[-1])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(1000 * median(samples), 3),
+            "kib": round(peak / 1024, 1)}
+
+
+def run_benchmarks(sizes: list, users: int, ops: int) -> dict:
+    """
+    Run all AlertManager benchmarks
+    :param sizes: numbers of cached alerts to benchmark against
+    :param users: number of users to spread alerts across
+    :param ops: number of calls to time per operation
+    :returns: dict of `operation[size]` to median ms and peak KiB
+    """
+    work_dir = mkdtemp()
+    results = dict()
+    for size in sizes:
+        alerts_file = _make_store(work_dir, size, users)
+        managers = list()
+
+        def _load(_):
+            managers.append(AlertManager(alerts_file, FakeScheduler(),
+                                         lambda _: None))
+        results[f"load_cache[{size}]"] = _measure(_load, range(ops + 1))
+        manager = managers[0]
+
+        # Most cached alerts are beyond the default horizon; compare loading
+        # with every alert scheduled
+        results[f"load_cache_no_horizon[{size}]"] = _measure(
+            lambda _: AlertManager(alerts_file, FakeScheduler(),
+                                   lambda _: None, schedule_horizon=None),
+            range(ops + 1))
+
+        new_alerts = _make_alerts(ops + 1, users, random.Random(size))
+        for alert in new_alerts:
+            alert.add_context({"ident": f"new_{alert.context['ident']}"})
+        idents = [a.context["ident"] for a in new_alerts]
+        results[f"add_alert[{size}]"] = _measure(manager.add_alert,
+                                                 new_alerts)
+        results[f"rm_alert[{size}]"] = _measure(manager.rm_alert, idents)
+        results[f"get_user_alerts[{size}]"] = _measure(
+            manager.get_user_alerts,
+            [f"user_{i % users}" for i in range(ops + 1)])
+        results[f"dump_cache[{size}]"] = _measure(
+            lambda _: manager._dump_cache(), range(ops + 1))
+
+        expiring = [Message("neon.alert", alert.data,
+                            {"ident": alert.context["ident"]})
+                    for alert in list(manager.pending_alerts.values())
+                    [:ops + 1]]
+        results[f"handle_alert_expiration[{size}]"] = _measure(
+            manager._handle_alert_expiration, expiring)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 1000, 10000],
+                        help="numbers of cached alerts to benchmark")
+    parser.add_argument("--users", type=int, default=100,
+                        help="number of users to spread alerts across")
+    parser.add_argument("--ops", type=int, default=5,
+                        help="calls to time per operation")
+    parser.add_argument("--save", help="path to write results as JSON")
+    parser.add_argument("--baseline",
+                        help="path to previously saved results to compare")
+    parser.add_argument("--threshold", type=float, default=25,
+                        help="percent slowdown from baseline to flag")
+    args = parser.parse_args()
+
+    LOG.set_level("ERROR")
+    results = run_benchmarks(args.sizes, args.users, args.ops)
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = list()
+    for name, result in results.items():
+        line = f"{name:<40}{result['ms']:>12.3f} ms{result['kib']:>12.1f} KiB"
+        if name in baseline:
+            base_ms = baseline[name]['ms']
+            line += f"  (baseline {base_ms:.3f} ms)"
+            if result['ms'] > base_ms * (1 + args.threshold / 100):
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"{len(regressions)} operation(s) slower than baseline by more "
+              f"than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
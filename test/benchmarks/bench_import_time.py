@@ -0,0 +1,157 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measure the time required to import skill modules, construct an
+AlertManager, and handle a first alert intent. Each measurement runs in a
+fresh interpreter so module caching does not hide the cost of dependencies
+loaded on import.
+
+The skill must be installed (i.e. `pip install -e .`) to run this script.
+
+Usage:
+    python test/benchmarks/bench_import_time.py [--runs N] [--save FILE]
+                                                [--baseline FILE]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from os.path import dirname, join
+from statistics import median
+
+_MODULES = ("skill_alerts",
+            "skill_alerts.util.alert",
+            "skill_alerts.util.alert_manager",
+            "skill_alerts.util.parse_utils",
+            "skill_alerts.util.ui_models")
+
+_MODULE_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, len(sys.modules))
+"""
+
+_MANAGER_SNIPPET = """
+import sys, time
+from tempfile import mkdtemp
+from os.path import join
+from skill_alerts.util.alert_manager import AlertManager
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.events import EventSchedulerInterface
+scheduler = EventSchedulerInterface(bus=FakeBus())
+start = time.perf_counter()
+AlertManager(join(mkdtemp(), "alerts.json"), scheduler, lambda _: None)
+elapsed = time.perf_counter() - start
+print(elapsed, len(sys.modules))
+"""
+
+_INTENT_SNIPPET = """
+import sys, time
+from datetime import timezone
+from ovos_bus_client import Message
+from skill_alerts.util import AlertType
+from skill_alerts.util.parse_utils import build_alert_from_intent, \\
+    load_language
+load_language("en-us")
+with open("{message_file}") as f:
+    message = Message.deserialize(f.read())
+start = time.perf_counter()
+build_alert_from_intent(message, AlertType.ALARM, timezone.utc)
+elapsed = time.perf_counter() - start
+print(elapsed, len(sys.modules))
+"""
+
+
+def _run_snippet(snippet: str) -> tuple:
+    """
+    Run a snippet in a new interpreter and return its reported timing
+    :param snippet: Python code printing `<seconds> <module_count>`
+    :returns: float seconds elapsed, int count of loaded modules
+    """
+    out = subprocess.run([sys.executable, "-c", snippet],
+                         capture_output=True, text=True, check=True)
+    elapsed, modules = out.stdout.strip().split('\n')[-1].split()
+    return float(elapsed), int(modules)
+
+
+def run_benchmarks(runs: int) -> dict:
+    """
+    Run all import benchmarks
+    :param runs: number of fresh interpreters to measure per target
+    :returns: dict of target name to median ms and loaded module count
+    """
+    targets = {f"import {m}": _MODULE_SNIPPET.format(module=m)
+               for m in _MODULES}
+    targets["AlertManager()"] = _MANAGER_SNIPPET
+    targets["build_alert_from_intent()"] = _INTENT_SNIPPET.format(
+        message_file=join(dirname(__file__), "..", "example_messages",
+                          "wake_me_up_at_time_alarm.json"))
+    results = dict()
+    for name, snippet in targets.items():
+        samples = [_run_snippet(snippet) for _ in range(runs)]
+        results[name] = {
+            "ms": round(1000 * median(s[0] for s in samples), 2),
+            "modules": samples[-1][1]
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("--runs", type=int, default=5,
+                        help="interpreters to start per measurement")
+    parser.add_argument("--save", help="path to write results as JSON")
+    parser.add_argument("--baseline",
+                        help="path to previously saved results to compare")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.runs)
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    for name, result in results.items():
+        line = f"{name:<40}{result['ms']:>10.2f} ms" \
+               f"{result['modules']:>8} modules"
+        if name in baseline:
+            line += f"  (baseline {baseline[name]['ms']:.2f} ms)"
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
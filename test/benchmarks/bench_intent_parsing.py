@@ -0,0 +1,212 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measure the time spent in each stage of `build_alert_from_intent` while
+replaying recorded intent messages. Stage functions in `parse_utils` are
+wrapped with timers; time spent in nested stages is only counted once, in the
+innermost stage. Messages are deserialized from files, so no messagebus or
+network connection is used.
+
+The skill must be installed (i.e. `pip install -e .`) to run this script.
+
+Usage:
+    python test/benchmarks/bench_intent_parsing.py [--runs N]
+        [--corpus DIR [DIR ...]] [--save FILE] [--baseline FILE]
+"""
+
+import argparse
+import json
+
+from datetime import timezone
+from functools import wraps
+from glob import glob
+from os.path import basename, dirname, join
+from statistics import median
+from time import perf_counter
+
+from ovos_bus_client import Message
+
+from skill_alerts.util import AlertType
+from skill_alerts.util import parse_utils
+
+# Stage name to `parse_utils` function name
+_STAGES = {"tokenize": "tokenize_utterance",
+           "repeat": "parse_repeat_from_message",
+           "end_condition": "parse_end_condition_from_message",
+           "time": "parse_alert_time_from_message",
+           "name": "parse_alert_name_from_message",
+           "default_name": "get_default_alert_name"}
+
+_DEFAULT_CORPUS = (join(dirname(__file__), "..", "example_messages"),
+                   join(dirname(__file__), "..", "example_messages",
+                        "invalid_messages"))
+
+
+class StageTimer:
+    """
+    Accumulates exclusive time spent in wrapped functions by stage.
+    """
+
+    def __init__(self):
+        self.elapsed = {stage: 0.0 for stage in _STAGES}
+        self._children = list()
+
+    def reset(self):
+        for stage in self.elapsed:
+            self.elapsed[stage] = 0.0
+
+    def wrap(self, stage: str, func: callable) -> callable:
+        """
+        Wrap a function to add its exclusive run time to a stage
+        :param stage: name of the stage to accumulate time for
+        :param func: function to wrap
+        :returns: wrapped function
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._children.append(0.0)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                total = perf_counter() - start
+                self.elapsed[stage] += total - self._children.pop()
+                if self._children:
+                    self._children[-1] += total
+        return wrapper
+
+
+def _get_alert_type(msg_type: str) -> AlertType:
+    """
+    Get the requested AlertType from an intent message type
+    :param msg_type: intent message type
+    :returns: AlertType requested by the intent
+    """
+    msg_type = msg_type.lower()
+    for alert_type in (AlertType.ALARM, AlertType.TIMER, AlertType.REMINDER):
+        if alert_type.name.lower() in msg_type:
+            return alert_type
+    return AlertType.UNKNOWN
+
+
+def load_corpus(directories: list) -> dict:
+    """
+    Load serialized intent messages
+    :param directories: directories containing serialized Message files
+    :returns: dict of message name to serialized Message
+    """
+    corpus = dict()
+    for directory in directories:
+        for file in sorted(glob(join(directory, "*.json"))):
+            with open(file) as f:
+                corpus[basename(file).rsplit('.', 1)[0]] = f.read()
+    return corpus
+
+
+def run_benchmarks(corpus: dict, runs: int) -> dict:
+    """
+    Replay each message in the corpus through `build_alert_from_intent`
+    :param corpus: dict of message name to serialized Message
+    :param runs: number of times to parse each message
+    :returns: dict of stage name to median ms per message, plus the median
+        total and per-message totals
+    """
+    parse_utils.load_language("en-us")
+    timer = StageTimer()
+    originals = {stage: getattr(parse_utils, func)
+                 for stage, func in _STAGES.items()}
+    for stage, func in originals.items():
+        setattr(parse_utils, _STAGES[stage], timer.wrap(stage, func))
+    samples = {stage: list() for stage in (*_STAGES, "other", "total")}
+    messages = dict()
+    try:
+        for name, serialized in corpus.items():
+            totals = list()
+            for _ in range(runs):
+                # Parsing mutates message data; deserialize for each run
+                message = Message.deserialize(serialized)
+                alert_type = _get_alert_type(message.msg_type)
+                timer.reset()
+                start = perf_counter()
+                parse_utils.build_alert_from_intent(message, alert_type,
+                                                    timezone.utc)
+                total = perf_counter() - start
+                for stage, elapsed in timer.elapsed.items():
+                    samples[stage].append(elapsed)
+                samples["other"].append(total - sum(timer.elapsed.values()))
+                samples["total"].append(total)
+                totals.append(total)
+            messages[name] = round(1000 * median(totals), 3)
+    finally:
+        for stage, func in originals.items():
+            setattr(parse_utils, _STAGES[stage], func)
+    results = {stage: {"ms": round(1000 * median(values), 3)}
+               for stage, values in samples.items()}
+    results["messages"] = messages
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("--runs", type=int, default=5,
+                        help="times to parse each message")
+    parser.add_argument("--corpus", nargs="+", default=_DEFAULT_CORPUS,
+                        help="directories of serialized intent messages")
+    parser.add_argument("--save", help="path to write results as JSON")
+    parser.add_argument("--baseline",
+                        help="path to previously saved results to compare")
+    args = parser.parse_args()
+
+    results = run_benchmarks(load_corpus(args.corpus), args.runs)
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    for name, result in results.items():
+        if name == "messages":
+            continue
+        line = f"{name:<40}{result['ms']:>10.3f} ms"
+        if name in baseline:
+            line += f"  (baseline {baseline[name]['ms']:.3f} ms)"
+        print(line)
+    print()
+    for name, ms in sorted(results["messages"].items(), key=lambda i: -i[1]):
+        line = f"{name:<56}{ms:>10.3f} ms"
+        if name in baseline.get("messages", {}):
+            line += f"  (baseline {baseline['messages'][name]:.3f} ms)"
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,7 +29,7 @@ import shutil
 import unittest
 import datetime as dt
 
-from threading import Event
+from threading import Event, Thread
 from os import remove
 from os.path import dirname, join, isfile
 from dateutil.tz import gettz
@@ -57,6 +57,24 @@ def _get_message_from_file(filename: str):
     return Message.deserialize(contents)
 
 
+def _run_shard_node(store_path: str, work_dir: str, users: list):
+    """
+    Acquire all shards on a separate node, add an alert for each user, and
+    exit without releasing leases.
+    """
+    from skill_alerts.util.sharding import ShardedAlertManager, \
+        SQLiteShardStore
+    scheduler = EventSchedulerInterface(bus=FakeBus())
+    node = ShardedAlertManager(SQLiteShardStore(store_path), "node_a",
+                               work_dir, scheduler, Mock(), num_shards=4,
+                               lease_ttl=2)
+    node.refresh()
+    expiration = dt.datetime.now(dt.timezone.utc) + dt.timedelta(hours=1)
+    for user in users:
+        node.add_alert(Alert.create(expiration, user,
+                                    context={"user": user, "ident": user}))
+
+
 class TestSkillMethods(SkillTestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -172,6 +190,64 @@ class TestSkillMethods(SkillTestCase):
         settings['timeout_min'] = '5'
         self.assertEqual(self.skill.alert_timeout_seconds, 60)
 
+        # checkbox settings
+        self.assertTrue(self.skill.gapless_playback)
+        self.assertFalse(self.skill.batch_remote_expirations)
+        settings['gapless_playback'] = "false"
+        settings['batch_remote_expirations'] = "True"
+        self.assertFalse(self.skill.gapless_playback)
+        self.assertTrue(self.skill.batch_remote_expirations)
+        settings['gapless_playback'] = True
+        settings['batch_remote_expirations'] = False
+        self.assertTrue(self.skill.gapless_playback)
+        self.assertFalse(self.skill.batch_remote_expirations)
+
+        # settingsmeta defaults are strings
+        import yaml
+        with open(join(self.skill.root_dir, "settingsmeta.yml")) as f:
+            meta = yaml.safe_load(f)
+        defaults = {field['name']: field['value']
+                    for section in meta['skillMetadata']['sections']
+                    for field in section['fields']}
+        self.skill.preference_skill = Mock(return_value=defaults)
+        self.assertEqual(defaults['batch_remote_expirations'], "false")
+        self.assertFalse(self.skill.batch_remote_expirations)
+        self.assertTrue(self.skill.gapless_playback)
+        self.skill.preference_skill = mock_prefs
+
+        # schedule_horizon
+        self.assertEqual(self.skill.schedule_horizon,
+                         datetime.timedelta(hours=24))
+        settings['schedule_horizon_hours'] = 2.5
+        self.assertEqual(self.skill.schedule_horizon,
+                         datetime.timedelta(hours=2.5))
+        settings['schedule_horizon_hours'] = 0
+        self.assertIsNone(self.skill.schedule_horizon)
+        settings['schedule_horizon_hours'] = '6'
+        self.assertEqual(self.skill.schedule_horizon,
+                         datetime.timedelta(hours=24))
+
+        # cache_encoding
+        self.assertEqual(self.skill.cache_encoding, 'json')
+        settings['cache_encoding'] = 'msgpack'
+        self.assertEqual(self.skill.cache_encoding, 'msgpack')
+        with patch.dict(sys.modules, {"msgpack": None}):
+            self.assertEqual(self.skill.cache_encoding, 'json')
+        settings['cache_encoding'] = 'xml'
+        self.assertEqual(self.skill.cache_encoding, 'json')
+
+        # alert_context_keys
+        from skill_alerts.util.parse_utils import ALERT_CONTEXT_KEYS
+        self.assertEqual(self.skill.alert_context_keys, ALERT_CONTEXT_KEYS)
+        settings['alert_context_keys'] = "timing, session"
+        self.assertEqual(self.skill.alert_context_keys,
+                         (*ALERT_CONTEXT_KEYS, "timing", "session"))
+        settings['alert_context_keys'] = ["timing"]
+        self.assertEqual(self.skill.alert_context_keys,
+                         (*ALERT_CONTEXT_KEYS, "timing"))
+        settings['alert_context_keys'] = "*"
+        self.assertIsNone(self.skill.alert_context_keys)
+
         # use_24hour
         self.assertIsInstance(self.skill.use_24hour, bool)
         # TODO: Better test here
@@ -776,6 +852,499 @@ class TestSkillMethods(SkillTestCase):
         # TODO
         pass
 
+    def test_get_metrics(self):
+        real_prefs = self.skill.preference_skill
+        settings = dict()
+        self.skill.preference_skill = Mock(return_value=settings)
+        self.skill.alert_manager.metrics.increment("test_total")
+        with patch.object(self.skill.bus, "emit") as emit:
+            self.skill._get_metrics(Message("neon.alerts.get_metrics"))
+            response = emit.call_args[0][0]
+            self.assertEqual(response.msg_type,
+                             "neon.alerts.get_metrics.response")
+            self.assertGreaterEqual(
+                response.data["metrics"]["counters"]["test_total"], 1)
+
+            self.skill._get_metrics(Message("neon.alerts.get_metrics",
+                                            {"format": "prometheus"}))
+            self.assertIn("# TYPE test_total counter",
+                          emit.call_args[0][0].data["metrics"])
+
+        # Metrics are only written if configured
+        metrics_file = join(self.test_fs, "metrics.prom")
+        self.skill._write_metrics()
+        self.assertFalse(isfile(metrics_file))
+        settings["metrics_file"] = metrics_file
+        self.skill._write_metrics()
+        with open(metrics_file) as f:
+            self.assertIn("test_total", f.read())
+
+        # Periodic writes follow settings changes
+        with patch.object(self.skill, "_preload_sounds") as preload, \
+                patch.object(self.skill, "schedule_repeating_event") as sched, \
+                patch.object(self.skill, "cancel_scheduled_event") as cancel:
+            self.skill.settings_change_callback()
+            preload.assert_called_once()
+            cancel.assert_called_once_with("write_metrics")
+            self.assertEqual(sched.call_args[0][0], self.skill._write_metrics)
+            settings.pop("metrics_file")
+            self.skill.settings_change_callback()
+            self.assertEqual(cancel.call_count, 2)
+            sched.assert_called_once()
+        remove(metrics_file)
+        self.skill.preference_skill = real_prefs
+
+    def test_get_delivery_traces(self):
+        real_prefs = self.skill.preference_skill
+        settings = {"delivery_lag_budget": 1}
+        self.skill.preference_skill = Mock(return_value=settings)
+        tracer = self.skill.alert_manager.tracer
+        tracer.budget = self.skill.delivery_lag_budget
+        self.assertEqual(tracer.budget, 1.0)
+        tracer.start("on_time", time.time()).mark("scheduler")
+        tracer.start("late", time.time() - 5).mark("scheduler")
+        with patch.object(self.skill.alert_manager, "_metrics") as metrics:
+            self.skill._finish_delivery_trace("on_time", "speak")
+            metrics.increment.assert_not_called()
+            self.skill._finish_delivery_trace("late", "play_audio")
+            metrics.increment.assert_called_once_with(
+                "neon_alerts_delivery_over_budget_total")
+            self.assertEqual(metrics.observe.call_count, 2)
+
+        with patch.object(self.skill.bus, "emit") as emit:
+            self.skill._get_delivery_traces(
+                Message("neon.alerts.get_delivery_traces",
+                        {"alert_id": "late"}))
+            trace = emit.call_args[0][0].data["trace"]
+            self.assertEqual([span["stage"] for span in trace["spans"]],
+                             ["scheduler", "play_audio"])
+            self.assertGreaterEqual(trace["lag"], 5)
+
+            self.skill._get_delivery_traces(
+                Message("neon.alerts.get_delivery_traces"))
+            response = emit.call_args[0][0].data
+            self.assertEqual(response["summary"]["budget"], 1.0)
+            self.assertGreaterEqual(response["summary"]["over_budget"], 1)
+            self.assertIn("late", [t["alert_id"] for t in response["traces"]])
+        self.skill.preference_skill = real_prefs
+
+    def test_play_notify_expired_volume(self):
+        real_prefs = self.skill.preference_skill
+        settings = {"escalate_volume": True, "gapless_playback": False}
+        self.skill.preference_skill = Mock(return_value=settings)
+        alarm = Alert.create(dt.datetime.now(dt.timezone.utc), "test",
+                             AlertType.ALARM, context={"ident": "volume"})
+        message = Message("neon.alert_expired", alarm.data, alarm.context)
+
+        # Volume is cached from bus messages
+        self.skill._volume = None
+        self.skill._on_volume_changed(Message("mycroft.volume.get.response",
+                                              {"percent": 0.5}))
+        self.assertEqual(self.skill._volume, 0.5)
+        with patch.object(self.skill.bus, "emit") as emit:
+            self.skill._on_volume_adjusted(Message("mycroft.volume.increase"))
+            self.assertEqual(emit.call_args[0][0].msg_type,
+                             "mycroft.volume.get")
+
+        with patch("ovos_utils.sound.play_audio"), \
+                patch("time.sleep"), \
+                patch.object(self.skill.bus, "emit") as emit, \
+                patch.object(self.skill.bus, "wait_for_response") as wait, \
+                patch.object(self.skill, "schedule_repeating_event") as sched, \
+                patch.object(self.skill, "cancel_scheduled_event") as cancel, \
+                patch.object(self.skill.alert_manager, "get_alert_status",
+                             side_effect=[AlertState.ACTIVE, None, None]):
+            self.skill._play_notify_expired(alarm, message)
+            wait.assert_not_called()
+            sched.assert_called_once()
+            self.assertEqual(sched.call_args[0][0],
+                             self.skill._escalate_volume)
+            cancel.assert_called_once_with("escalate_volume.volume")
+            # Cached volume is restored after playback
+            restore = emit.call_args[0][0]
+            self.assertEqual(restore.msg_type, "mycroft.volume.set")
+            self.assertEqual(restore.data, {"percent": 0.5})
+        self.assertEqual(self.skill._escalating_alerts, dict())
+        self.assertIsNone(self.skill._restore_volume)
+
+        # Escalation waits for a known volume and addresses the alert's device
+        escalate = Message("test", {"alert_id": "volume"})
+        self.skill._volume = None
+        self.skill._escalating_alerts["volume"] = message
+        with patch.object(self.skill.bus, "emit") as emit:
+            self.skill._escalate_volume(escalate)
+            emit.assert_not_called()
+            self.skill._volume = 0.3
+            self.skill._escalate_volume(escalate)
+            increase = emit.call_args[0][0]
+            self.assertEqual(increase.msg_type, "mycroft.volume.increase")
+            self.assertEqual(increase.context["ident"], "volume")
+            self.assertEqual(self.skill._restore_volume, 0.3)
+
+            # Another alert starting to escalate keeps the original volume
+            self.skill._volume = 0.4
+            other = Alert.create(dt.datetime.now(dt.timezone.utc), "other",
+                                 AlertType.ALARM, context={"ident": "other"})
+            with patch.object(self.skill, "_start_looping_player"), \
+                    patch.object(self.skill, "schedule_repeating_event"), \
+                    patch.object(self.skill, "cancel_scheduled_event"), \
+                    patch.object(self.skill, "_get_notifying_alerts",
+                                 return_value=[]):
+                self.skill._play_notify_expired(
+                    other, Message("neon.alert_expired", other.data,
+                                   other.context))
+            self.assertEqual(self.skill._restore_volume, 0.3)
+            self.assertEqual(emit.call_count, 1)
+
+            self.skill._escalating_alerts.pop("volume")
+            self.skill._escalate_volume(escalate)
+            emit.assert_called_once()
+        self.skill.preference_skill = real_prefs
+
+    def test_play_notify_expired_looping(self):
+        real_prefs = self.skill.preference_skill
+        settings = {"escalate_volume": False}
+        self.skill.preference_skill = Mock(return_value=settings)
+        alarm = Alert.create(dt.datetime.now(dt.timezone.utc), "test",
+                             AlertType.ALARM, context={"ident": "looping"})
+        message = Message("neon.alert_expired", alarm.data, alarm.context)
+        player = Mock()
+
+        def _dismiss(_):
+            # Dismissal stops playback from the change callback
+            self.skill._alert_changed({"ident": "looping", "user": "local",
+                                       "change": "dismissed",
+                                       "dispositions": []})
+            player.stop.assert_called_once()
+            return False
+
+        player.wait.side_effect = _dismiss
+        with patch("skill_alerts.LoopingPlayer") as looping_player, \
+                patch("ovos_utils.sound.play_audio") as play_audio, \
+                patch.object(self.skill.alert_manager, "get_alert_status",
+                             side_effect=[AlertState.ACTIVE, None, None,
+                                          None]):
+            looping_player.from_file.return_value = player
+            self.skill._play_notify_expired(alarm, message)
+            looping_player.from_file.assert_called_once_with(
+                self.skill.alarm_sound_file, self.skill._sound_cache)
+            player.start.assert_called_once()
+            player.stop.assert_called_once()
+            play_audio.assert_not_called()
+        self.assertEqual(self.skill._alert_players, dict())
+
+        # Playback stopped by a dismissal is not repeated
+        def _dismiss_stopped(_):
+            self.skill._alert_changed({"ident": "looping", "user": "local",
+                                       "change": "dismissed",
+                                       "dispositions": []})
+            return True
+
+        player.reset_mock()
+        player.wait.side_effect = _dismiss_stopped
+        with patch("skill_alerts.LoopingPlayer") as looping_player, \
+                patch("ovos_utils.sound.play_audio") as play_audio, \
+                patch("time.sleep"), \
+                patch.object(self.skill.alert_manager, "get_alert_status",
+                             side_effect=[AlertState.ACTIVE, None, None,
+                                          None]):
+            looping_player.from_file.return_value = player
+            self.skill._play_notify_expired(alarm, message)
+            player.wait.assert_called_once()
+            play_audio.assert_not_called()
+        self.assertEqual(self.skill._alert_players, dict())
+
+        # Disabled looping uses repeated playback
+        settings["gapless_playback"] = False
+        self.assertIsNone(self.skill._start_looping_player("looping",
+                                                           "test.wav",
+                                                           message))
+        self.skill.preference_skill = real_prefs
+
+    def test_preload_sounds(self):
+        real_prefs = self.skill.preference_skill
+        settings = dict()
+        self.skill.preference_skill = Mock(return_value=settings)
+        self.skill._preload_sounds()
+        alarm_file = self.skill.alarm_sound_file
+        self.assertEqual(alarm_file, join(self.skill.root_dir, "res", "snd",
+                                          "default-alarm.wav"))
+        with patch("skill_alerts.util.playback.decode_sound") as decode:
+            self.assertIsNotNone(self.skill._sound_cache.get(alarm_file))
+            self.assertIsNotNone(self.skill._sound_cache.get(
+                self.skill.timer_sound_file))
+            decode.assert_not_called()
+
+        # Resolved files are cached until settings change
+        with patch("skill_alerts.resolve_resource_file") as resolve:
+            self.assertEqual(self.skill.alarm_sound_file, alarm_file)
+            resolve.assert_not_called()
+            settings["sound_alarm"] = "invalid.wav"
+            resolve.return_value = None
+            self.assertEqual(self.skill.alarm_sound_file, alarm_file)
+            self.assertEqual(self.skill.alarm_sound_file, alarm_file)
+            resolve.assert_called_once()
+        self.skill.preference_skill = real_prefs
+        self.skill._preload_sounds()
+
+    def test_prerender_notifications(self):
+        real_prefs = self.skill.preference_skill
+        settings = {"speak_alarm": True, "speak_timer": False}
+        self.skill.preference_skill = Mock(return_value=settings)
+        real_manager = self.skill._alert_manager
+        self.skill._alert_manager = AlertManager(
+            join(self.test_fs, "prerender.json"),
+            EventSchedulerInterface(bus=FakeBus()), Mock())
+        self.skill._prerendered = dict()
+        audio_file = join(self.skill.root_dir, "res", "snd",
+                          "default-alarm.wav")
+        now_time = dt.datetime.now(dt.timezone.utc)
+        alarm = Alert.create(now_time + dt.timedelta(minutes=5), "soon",
+                             AlertType.ALARM, context={"ident": "soon"})
+        timer = Alert.create(now_time + dt.timedelta(minutes=5), "timer",
+                             AlertType.TIMER, context={"ident": "timer"})
+        later = Alert.create(now_time + dt.timedelta(hours=1), "later",
+                             AlertType.ALARM, context={"ident": "later"})
+        for alert in (alarm, timer, later):
+            self.skill.alert_manager._schedule_alert_expiration(
+                alert, get_alert_id(alert))
+
+        # Only spoken alerts within the horizon are rendered
+        with patch.object(self.skill.bus, "wait_for_response") as wait, \
+                patch("skill_alerts.create_daemon") as create_daemon:
+            create_daemon.side_effect = lambda target, args: target(*args)
+            wait.return_value = None
+            # Failed renders are retried on the next sweep
+            self.skill._prerender_upcoming()
+            wait.assert_called_once()
+            self.assertEqual(self.skill._prerendered, dict())
+            wait.reset_mock()
+            wait.return_value = Message(
+                "neon.get_tts.response",
+                {self.skill.lang: {"sentence": "test",
+                                   "female": audio_file}})
+            self.skill._prerender_upcoming()
+            wait.assert_called_once()
+            request = wait.call_args[0][0]
+            self.assertEqual(request.msg_type, "neon.get_tts")
+            self.assertIn("soon", request.data["text"])
+            self.assertEqual(self.skill._prerendered, {"soon": audio_file})
+            self.skill._prerender_upcoming()
+            wait.assert_called_once()
+
+        # Rendered audio is played instead of speaking
+        message = Message("neon.alert_expired", alarm.data, alarm.context)
+        with patch("ovos_utils.sound.play_audio") as play_audio, \
+                patch("time.sleep"), \
+                patch.object(self.skill, "speak_dialog") as speak_dialog, \
+                patch.object(self.skill.alert_manager, "get_alert_status",
+                             side_effect=[AlertState.ACTIVE, None, None]):
+            self.skill._speak_notify_expired(alarm, message)
+            play_audio.assert_called_once_with(audio_file)
+            speak_dialog.assert_not_called()
+
+        # Removed alerts are evicted without logging an error
+        self.skill.alert_manager.rm_alert("soon")
+        with patch.object(self.skill.bus, "wait_for_response"), \
+                patch("skill_alerts.create_daemon"), \
+                patch("skill_alerts.util.alert_manager.LOG") as log:
+            self.skill._prerender_upcoming()
+            log.error.assert_not_called()
+        self.assertEqual(self.skill._prerendered, dict())
+
+        self.skill._alert_manager.shutdown()
+        self.skill._alert_manager = real_manager
+        self.skill.preference_skill = real_prefs
+
+    def test_notify_expired_group(self):
+        now_time = dt.datetime.now(dt.timezone.utc)
+        first = Alert.create(now_time, "first", AlertType.REMINDER,
+                             context={"ident": "first", "user": "grouped"})
+        second = Alert.create(now_time, "second", AlertType.REMINDER,
+                              context={"ident": "second", "user": "grouped"})
+        other = Alert.create(now_time, "other", AlertType.REMINDER,
+                             context={"ident": "other", "user": "other"})
+        message = Message("neon.alert_expired", first.data, first.context)
+        statuses = {"first": AlertState.ACTIVE, "second": AlertState.ACTIVE}
+
+        # Alerts expiring for one user join the first alert's group
+        group = self.skill._join_expired_group(first)
+        self.assertIsNotNone(group)
+        self.assertIsNotNone(self.skill._join_expired_group(other))
+        self.assertIsNone(self.skill._get_expired_group("missing"))
+
+        # Reminders share one notification
+        with patch.object(self.skill.bus, "emit") as emit:
+            self.skill._notify_expired_reminder(first)
+            self.assertIsNone(self.skill._join_expired_group(second))
+            self.assertIs(self.skill._get_expired_group("second"), group)
+            self.skill._notify_expired_reminder(second)
+            cleared = emit.call_args_list[1][0][0]
+            self.assertEqual(cleared.data["notification"]["text"],
+                             "Reminder: first")
+            created = emit.call_args_list[2][0][0]
+            self.assertEqual(created.msg_type, "ovos.notification.api.set")
+            self.assertEqual(len(created.data["callback_data"]["alerts"]), 2)
+        self.assertEqual(group["notification"],
+                         "Reminder: first, Reminder: second")
+
+        # One spoken notification for all active alerts in the group
+        def _speak(*_, **__):
+            statuses["first"] = None
+            statuses["second"] = None
+
+        with patch.object(self.skill.alert_manager, "get_alert_status",
+                          side_effect=statuses.get), \
+                patch("time.sleep"), \
+                patch.object(self.skill, "speak_dialog",
+                             side_effect=_speak) as speak_dialog:
+            self.skill._speak_notify_expired(first, message)
+            speak_dialog.assert_called_once()
+            self.assertEqual(speak_dialog.call_args[0][0], "expired_alerts")
+            self.assertEqual(speak_dialog.call_args[0][1],
+                             {"names": "first and second"})
+        self.assertNotIn("grouped", self.skill._expired_groups)
+
+        # Dismissing one alert dismisses the group
+        self.skill._join_expired_group(first)
+        self.skill._join_expired_group(second)
+        real_manager = self.skill._alert_manager
+        self.skill._alert_manager = Mock()
+        self.skill._alert_manager.active_alerts = {"first": first,
+                                                   "second": second}
+        self.skill._dismiss_alert("first", AlertType.REMINDER)
+        self.assertEqual(
+            [c[0][0] for c in
+             self.skill._alert_manager.dismiss_active_alert.call_args_list],
+            ["first", "second"])
+        self.skill._alert_manager = real_manager
+        self.skill._expired_groups = dict()
+
+    def test_remote_alert_expired(self):
+        real_prefs = self.skill.preference_skill
+        settings = dict()
+        self.skill.preference_skill = Mock(return_value=settings)
+        expiration = dt.datetime.now(dt.timezone.utc)
+        client_1 = [Alert.create(expiration, f"client 1 alert {i}",
+                                 context={"mq": {"routing_key": "client_1"},
+                                          "user": "remote", "ident": str(i),
+                                          "session": {"session_id": "1"}})
+                    for i in range(3)]
+        client_2 = Alert.create(expiration, "client 2 alert",
+                                context={"mq": {"routing_key": "client_2"},
+                                         "ident": "client_2"})
+        with patch.object(self.skill.bus, "emit") as emit, \
+                patch.object(self.skill, "schedule_event") as schedule:
+            # Unbatched expirations are emitted immediately
+            self.skill._remote_alert_expired(client_2)
+            message = emit.call_args[0][0]
+            self.assertEqual(message.msg_type, "neon.alert_expired")
+            self.assertEqual(message.data, client_2.data)
+            schedule.assert_not_called()
+
+            # Batched expirations are emitted once per client
+            emit.reset_mock()
+            settings["batch_remote_expirations"] = True
+            for alert in (*client_1, client_2):
+                self.skill._remote_alert_expired(alert)
+            schedule.assert_called_once()
+            emit.assert_not_called()
+            self.skill._flush_remote_expirations()
+            self.assertEqual(emit.call_count, 2)
+            batches = {m.context["mq"]["routing_key"]: m for m in
+                       (c[0][0] for c in emit.call_args_list)}
+            self.assertEqual(batches["client_1"].msg_type,
+                             "neon.alert_expired.batch")
+            self.assertNotIn("session", batches["client_1"].context)
+            self.assertEqual([a["alert_name"] for a in
+                              batches["client_1"].data["alerts"]],
+                             [a.alert_name for a in client_1])
+            self.assertEqual(len(batches["client_2"].data["alerts"]), 1)
+            self.assertEqual(self.skill._remote_expirations, dict())
+        self.skill.preference_skill = real_prefs
+
+    def test_timer_gui_pages(self):
+        from skill_alerts import _TIMER_GUI_PAGE_SIZE
+        real_manager = self.skill._alert_manager
+        manager = AlertManager(join(self.test_fs, "gui_alerts.json"),
+                               EventSchedulerInterface(bus=FakeBus()), Mock())
+        self.skill._alert_manager = manager
+        now_time = dt.datetime.now(dt.timezone.utc)
+        timers = [Alert.create(now_time + dt.timedelta(minutes=i + 1),
+                               f"timer {i}", AlertType.TIMER)
+                  for i in range(_TIMER_GUI_PAGE_SIZE * 2 + 5)]
+        for timer in reversed(timers):
+            manager.add_timer_to_gui(timer)
+
+        # First page is displayed
+        self.skill._timer_gui_offset = 0
+        self.assertEqual(self.skill._update_timer_gui(), len(timers))
+        self.assertEqual([t['timerName'] for t in
+                          self.skill.gui['activeTimers']['timers']],
+                         [t.alert_name for t in
+                          timers[:_TIMER_GUI_PAGE_SIZE]])
+        self.assertEqual(self.skill.gui['timerTotal'], len(timers))
+
+        # Page requests are aligned to page boundaries
+        self.skill._gui_page_timers(Message("timerskill.gui.page.timers",
+                                            {"offset": 12}))
+        self.assertEqual(self.skill.gui['timerOffset'], _TIMER_GUI_PAGE_SIZE)
+        self.assertEqual(self.skill.gui['activeTimers']['timers'][0]
+                         ['timerName'], timers[_TIMER_GUI_PAGE_SIZE]
+                         .alert_name)
+        self.skill._gui_page_timers(Message("timerskill.gui.page.timers",
+                                            {"offset": 1000}))
+        self.assertEqual(self.skill.gui['timerOffset'],
+                         _TIMER_GUI_PAGE_SIZE * 2)
+        self.assertEqual(self.skill.gui['activeTimerCount'], 5)
+
+        # Dismissing the last page displays the previous page
+        for timer in timers[_TIMER_GUI_PAGE_SIZE * 2:]:
+            manager.dismiss_alert_from_gui(get_alert_id(timer))
+        self.skill._update_timer_gui()
+        self.assertEqual(self.skill.gui['timerOffset'], _TIMER_GUI_PAGE_SIZE)
+
+        self.skill._timer_gui_offset = 0
+        self.skill._alert_manager = real_manager
+        manager.shutdown()
+
+    def test_gui_cancel_alarm(self):
+        now_time = dt.datetime.now(dt.timezone.utc)
+        alarms = [Alert.create(now_time + dt.timedelta(hours=i + 1),
+                               f"alarm {i}", AlertType.ALARM,
+                               context={"ident": f"gui_alarm_{i}"})
+                  for i in range(3)]
+        with patch.object(self.skill.gui, "show_page"), \
+                patch.object(self.skill.gui, "release") as release, \
+                patch.object(self.skill, "_dismiss_alert") as dismiss:
+            self.skill._display_alarms(alarms)
+            self.assertEqual(self.skill.gui['activeAlarmCount'], 3)
+
+            # Dismissed alarms are removed from the overview by ID
+            self.skill._gui_cancel_alarm(Message("ovos.alarm.skill.cancel",
+                                                 {"alarmIndex": "gui_alarm_1"}))
+            dismiss.assert_called_once_with("gui_alarm_1", AlertType.ALARM,
+                                            True)
+            self.assertEqual([a["alarmIndex"] for a in
+                              self.skill.gui['activeAlarms']],
+                             ["gui_alarm_0", "gui_alarm_2"])
+            self.assertEqual(self.skill.gui['activeAlarmCount'], 2)
+            release.assert_not_called()
+            for alarm_id in ("gui_alarm_0", "gui_alarm_2"):
+                self.skill._gui_cancel_alarm(
+                    Message("ovos.alarm.skill.cancel",
+                            {"alarmIndex": alarm_id}))
+            self.assertEqual(self.skill.gui['activeAlarmCount'], 0)
+            release.assert_called_once()
+
+            # The single alarm view is released on dismissal
+            with patch.object(self.skill, "_update_homescreen"):
+                self.skill._display_alarm_gui(alarms[0], False)
+            self.assertEqual(self.skill._gui_alarms, dict())
+            self.skill._gui_cancel_alarm(Message("ovos.alarm.skill.cancel",
+                                                 {"alarmIndex": "gui_alarm_0"}))
+            self.assertEqual(release.call_count, 2)
+
     def test_run_notify_expired(self):
         # TODO
         pass
@@ -801,8 +1370,121 @@ class TestSkillMethods(SkillTestCase):
         pass
 
     def test_get_events(self):
-        # TODO
-        pass
+        valid_alarms = {get_alert_id(alert) for alert in
+                        (self.valid_alarm_1, self.valid_alarm_2,
+                         self.valid_alarm_3)}
+        with patch.object(self.skill.bus, "emit") as emit:
+            # Legacy serialized response
+            message = Message("neon.get_events", {"user": self.valid_user})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertTrue(valid_alarms.issubset(response.data.keys()))
+            for alert_str in response.data.values():
+                self.assertIsInstance(alert_str, str)
+                self.assertIsInstance(Alert.deserialize(alert_str), Alert)
+
+            # Native dict response
+            message = Message("neon.get_events", {"user": self.valid_user,
+                                                  "format_version": 2})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertTrue(valid_alarms.issubset(response.data.keys()))
+            for ident, alert_data in response.data.items():
+                self.assertIsInstance(alert_data, dict)
+                self.assertEqual(alert_data["context"]["ident"], ident)
+
+            # Compact dict response
+            message = Message("neon.get_events", {"user": self.valid_user,
+                                                  "encoding": "compact"})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertTrue(valid_alarms.issubset(response.data.keys()))
+            for alert_data in response.data.values():
+                self.assertIsInstance(alert_data["next_expiration_time"], int)
+
+            # Packed compact response
+            from base64 import b64decode
+            from skill_alerts.util.encoding import unpack
+            message = Message("neon.get_events", {"user": self.valid_user,
+                                                  "encoding": "msgpack"})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertEqual(response.data["encoding"], "msgpack")
+            alerts = unpack(b64decode(response.data["alerts"]))
+            self.assertTrue(valid_alarms.issubset(alerts.keys()))
+
+            # Invalid disposition
+            message = Message("neon.get_events", {"disposition": "active"})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertEqual(response.data, {"error": "Invalid disposition"})
+
+            # Filtered pages
+            alarm_ids = list()
+            cursor = None
+            while True:
+                message = Message("neon.get_events",
+                                  {"user": self.valid_user, "type": "alarm",
+                                   "limit": 2, "cursor": cursor,
+                                   "fields": ["alert_name", "alert_type"]})
+                self.skill._get_events(message)
+                response = emit.call_args[0][0]
+                page = response.data["alerts"]
+                self.assertLessEqual(len(page), 2)
+                for alert_data in page.values():
+                    self.assertEqual(set(alert_data.keys()),
+                                     {"alert_name", "alert_type"})
+                    self.assertEqual(alert_data["alert_type"],
+                                     AlertType.ALARM)
+                alarm_ids.extend(page.keys())
+                cursor = response.data["next_cursor"]
+                if not cursor:
+                    break
+            self.assertEqual(len(alarm_ids), len(set(alarm_ids)))
+            self.assertTrue(valid_alarms.issubset(alarm_ids))
+            self.assertNotIn(get_alert_id(self.valid_reminder), alarm_ids)
+
+            # Time window
+            window_start = self.valid_alarm_2.next_expiration
+            message = Message("neon.get_events",
+                              {"user": self.valid_user, "format_version": 2,
+                               "after": window_start.isoformat(),
+                               "before": window_start.timestamp() + 1})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertEqual(set(response.data.keys()),
+                             {get_alert_id(self.valid_alarm_2)})
+
+            # Change feed
+            message = Message("neon.get_events", {"user": self.valid_user,
+                                                  "limit": 1})
+            self.skill._get_events(message)
+            version = emit.call_args[0][0].data["version"]
+            new_alarm = Alert.create(
+                self.valid_alarm_1.next_expiration + dt.timedelta(hours=1),
+                "New Alarm", AlertType.ALARM,
+                context={"username": self.valid_user})
+            new_id = self.skill.alert_manager.add_alert(new_alarm)
+            changed = emit.call_args[0][0]
+            self.assertEqual(changed.msg_type, "neon.alert_changed")
+            self.assertEqual(changed.data["ident"], new_id)
+            message = Message("neon.get_events", {"user": self.valid_user,
+                                                  "since": version})
+            self.skill._get_events(message)
+            response = emit.call_args[0][0]
+            self.assertFalse(response.data["reset"])
+            self.assertEqual([c["ident"] for c in response.data["changes"]],
+                             [new_id])
+            self.assertEqual(response.data["version"], version + 1)
+            self.skill.alert_manager.rm_alert(new_id)
+
+            # Invalid filters
+            for data in ({"type": "meeting"}, {"limit": 0},
+                         {"cursor": "invalid"}):
+                message = Message("neon.get_events", data)
+                self.skill._get_events(message)
+                response = emit.call_args[0][0]
+                self.assertEqual(response.data, {"error": "Invalid request"})
 
     def test_get_requested_alert_name_and_time(self):
         # TODO
@@ -989,6 +1671,16 @@ class TestSkillMethods(SkillTestCase):
                           'data': {'count': 0,
                                    'action': 'alerts.gui.show_timers'}})
 
+    def test_on_profile_update(self):
+        from skill_alerts.util.user_prefs import user_prefs
+        with patch.object(user_prefs, "invalidate") as invalidate:
+            self.skill._on_profile_update(
+                Message("neon.profile_update",
+                        {"profile": {"user": {"username": "test_user"}}}))
+            invalidate.assert_called_once_with("test_user")
+            self.skill._on_profile_update(Message("configuration.updated"))
+            invalidate.assert_called_with(None)
+
     def test_get_spoken_alert_type(self):
         # TODO
         pass
@@ -1161,6 +1853,33 @@ class TestAlert(unittest.TestCase):
         self.assertEqual(alert.context, {"ident": "new_ident",
                                          "testing": True})
 
+    def test_alert_compact_encoding(self):
+        from skill_alerts.util.encoding import to_compact, from_compact, \
+            is_compact, pack, unpack
+        tz = dt.timezone(dt.timedelta(hours=-8))
+        alert_time = dt.datetime.now(tz).replace(microsecond=0) + \
+            dt.timedelta(hours=1)
+        end_repeat = alert_time + dt.timedelta(days=7)
+        alert = Alert.create(alert_time, "compact alert",
+                             repeat_frequency=3600, end_repeat=end_repeat,
+                             context={"ident": "compact", "user": "test",
+                                      "session": {"lang": "en-us"}})
+        compact = to_compact(alert)
+        self.assertTrue(is_compact(compact))
+        self.assertFalse(is_compact(alert.data))
+        self.assertEqual(compact["context"], {"ident": "compact",
+                                              "user": "test"})
+        self.assertNotIn("audio_file", compact)
+
+        parsed = from_compact(unpack(pack(compact)))
+        self.assertEqual(parsed.next_expiration, alert.next_expiration)
+        self.assertEqual(parsed.next_expiration.utcoffset(),
+                         alert_time.utcoffset())
+        self.assertEqual(parsed.end_repeat, end_repeat)
+        self.assertEqual(parsed.alert_name, alert.alert_name)
+        self.assertEqual(parsed.repeat_frequency, alert.repeat_frequency)
+        self.assertEqual(parsed.context, compact["context"])
+
 
 class TestAlertManager(unittest.TestCase):
     manager_path = join(dirname(__file__), "test_cache")
@@ -1362,6 +2081,248 @@ class TestAlertManager(unittest.TestCase):
 
         remove(test_file)
 
+    def test_alert_manager_cache_migration(self):
+        from skill_alerts.util.alert_manager import CACHE_FORMAT_VERSION
+        test_file = join(self.manager_path, "alerts.json")
+        now_time = dt.datetime.now(dt.timezone.utc)
+        pending = Alert.create(now_time + dt.timedelta(minutes=5),
+                               context={"ident": "pending"})
+        missed = Alert.create(now_time - dt.timedelta(minutes=5),
+                              context={"ident": "missed"})
+
+        # Write a version 1 cache with serialized alerts
+        os.makedirs(self.manager_path, exist_ok=True)
+        with open(test_file, 'w') as f:
+            json.dump({"missed": {"missed": missed.serialize},
+                       "pending": {"pending": pending.serialize}}, f)
+
+        scheduler = EventSchedulerInterface(bus=self.bus)
+        manager = AlertManager(test_file, scheduler, Mock())
+        self.assertEqual(manager.pending_alerts["pending"].next_expiration,
+                         pending.next_expiration)
+        self.assertEqual(manager.missed_alerts["missed"].data, missed.data)
+
+        # Cache is rewritten with alert dicts
+        with open(test_file) as f:
+            alerts_data = json.load(f)
+        self.assertEqual(alerts_data["version"], CACHE_FORMAT_VERSION)
+        self.assertIsInstance(alerts_data["pending"]["pending"], dict)
+        self.assertEqual(
+            Alert.from_dict(alerts_data["pending"]["pending"]).next_expiration,
+            pending.next_expiration)
+        self.assertEqual(alerts_data["missed"]["missed"], missed.data)
+
+        manager.shutdown()
+        remove(test_file)
+
+    def test_alert_manager_schedule_context(self):
+        alert_manager = self._init_alert_manager()
+        alert_time = dt.datetime.now(dt.timezone.utc) + dt.timedelta(hours=1)
+        context = {"user": "test_user"}
+        alert = Alert.create(alert_time, context=context)
+        ident = alert_manager.add_alert(alert)
+        # Scheduler context additions are not stored with the alert
+        self.assertEqual(alert_manager.pending_alerts[ident].context,
+                         {**context, "ident": ident})
+        alert_manager.shutdown()
+
+    def test_alert_manager_remote_expiration(self):
+        alert_manager = self._init_alert_manager()
+        remote_expired = Mock()
+        alert_manager._remote_callback = remote_expired
+        now_time = dt.datetime.now(dt.timezone.utc)
+        remote_alert = Alert.create(now_time + dt.timedelta(seconds=1),
+                                    context={"mq": {"routing_key": "test"},
+                                             "user": "remote"})
+        repeat_alert = Alert.create(now_time + dt.timedelta(seconds=1),
+                                    repeat_frequency=60,
+                                    context={"mq": {"routing_key": "test"},
+                                             "user": "remote"})
+        idents = [alert_manager.add_alert(alert)
+                  for alert in (remote_alert, repeat_alert)]
+        time.sleep(1.5)
+        for ident, alert in zip(idents, (remote_alert, repeat_alert)):
+            alert_manager._handle_alert_expiration(
+                Message(f"alert.{ident}", alert.data, alert.context))
+            self.assertNotIn(ident, alert_manager.active_alerts)
+            self.assertEqual(get_alert_id(remote_expired.call_args[0][0]),
+                             ident)
+        alert_manager._callback.assert_not_called()
+
+        # Repeating alerts remain pending
+        self.assertEqual(set(alert_manager.pending_alerts.keys()),
+                         {get_alert_id(repeat_alert)})
+        self.assertEqual(alert_manager._user_index,
+                         {"remote": {get_alert_id(repeat_alert)}})
+        alert_manager.shutdown()
+
+    def test_alert_manager_metrics(self):
+        from skill_alerts.util.metrics import Metrics
+        metrics = Metrics()
+        alert_manager = AlertManager(join(self.manager_path, "metrics.json"),
+                                     EventSchedulerInterface(bus=self.bus),
+                                     Mock(), metrics=metrics)
+        self.assertIs(alert_manager.metrics, metrics)
+        now_time = dt.datetime.now(dt.timezone.utc)
+        alert = Alert.create(now_time - dt.timedelta(seconds=2),
+                             context={"ident": "expired"})
+        alert_manager._pending_alerts["expired"] = alert
+        alert_manager._handle_alert_expiration(
+            Message("alert.expired", alert.data, alert.context))
+        trace = alert_manager.tracer.get_trace("expired")
+        self.assertEqual(trace["due"], dt.datetime.fromisoformat(
+            alert.data["next_expiration_time"]).timestamp())
+        self.assertEqual([span["stage"] for span in trace["spans"]],
+                         ["scheduler", "expiration_handled"])
+        self.assertFalse(trace["finished"])
+        alert_manager.add_alert(Alert.create(now_time + dt.timedelta(hours=1)))
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"],
+                         {'neon_alerts_changes_total{change="created"}': 1,
+                          'neon_alerts_changes_total{change="expired"}': 1})
+        lag = snapshot["histograms"]["neon_alerts_scheduler_lag_seconds"]
+        self.assertEqual(lag["count"], 1)
+        self.assertGreaterEqual(lag["sum"], 2)
+        self.assertGreaterEqual(
+            snapshot["histograms"]["neon_alerts_dump_cache_seconds"]["count"],
+            1)
+        histograms = snapshot["histograms"]
+        self.assertGreater(histograms[
+            'neon_alerts_lock_wait_seconds{mode="read"}']["count"], 1)
+        self.assertGreater(histograms[
+            'neon_alerts_lock_wait_seconds{mode="write"}']["count"], 1)
+        alert_manager.shutdown()
+        os.remove(join(self.manager_path, "metrics.json"))
+
+    def test_alert_manager_cache_msgpack(self):
+        test_file = join(self.manager_path, "alerts.json")
+        packed_file = join(self.manager_path, "alerts.msgpack")
+        now_time = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+        pending = Alert.create(now_time + dt.timedelta(minutes=5),
+                               context={"ident": "pending", "client": "cli",
+                                        "session": {"session_id": "abc"}})
+        missed = Alert.create(now_time - dt.timedelta(minutes=5),
+                              context={"ident": "missed"})
+        os.makedirs(self.manager_path, exist_ok=True)
+        with open(test_file, 'w') as f:
+            json.dump({"missed": {"missed": missed.data},
+                       "pending": {"pending": pending.data}, "version": 2}, f)
+
+        # JSON cache is converted to msgpack with the configured context keys
+        scheduler = EventSchedulerInterface(bus=self.bus)
+        manager = AlertManager(test_file, scheduler, Mock(),
+                               cache_encoding="msgpack", context_keys=None)
+        self.assertTrue(isfile(packed_file))
+        self.assertFalse(isfile(test_file))
+        manager.shutdown()
+
+        # msgpack cache is loaded
+        manager = AlertManager(test_file, scheduler, Mock(),
+                               cache_encoding="msgpack")
+        self.assertEqual(manager.pending_alerts["pending"].next_expiration,
+                         pending.next_expiration)
+        self.assertEqual(manager.pending_alerts["pending"].context,
+                         pending.context)
+        self.assertEqual(manager.missed_alerts["missed"].next_expiration,
+                         missed.next_expiration)
+        manager.shutdown()
+
+        # msgpack cache is converted back to JSON
+        manager = AlertManager(test_file, scheduler, Mock())
+        self.assertEqual(set(manager.pending_alerts.keys()), {"pending"})
+        self.assertEqual(manager.pending_alerts["pending"].context,
+                         {"ident": "pending", "client": "cli"})
+        self.assertTrue(isfile(test_file))
+        self.assertFalse(isfile(packed_file))
+        manager.shutdown()
+
+        with self.assertRaises(ValueError):
+            AlertManager(test_file, scheduler, Mock(), cache_encoding="xml")
+        remove(test_file)
+
+    def test_alert_manager_cache_load_deferred(self):
+        from skill_alerts.util.alert_manager import _SWEEP_EVENT_NAME
+        test_file = join(self.manager_path, "alerts.json")
+        now_time = dt.datetime.now(dt.timezone.utc)
+        near_alert = Alert.create(now_time + dt.timedelta(minutes=5),
+                                  context={"ident": "near"})
+        far_alert = Alert.create(now_time + dt.timedelta(days=30),
+                                 context={"ident": "far"})
+
+        # Cache contains both serialized and dict records
+        os.makedirs(self.manager_path, exist_ok=True)
+        with open(test_file, 'w') as f:
+            json.dump({"missed": {},
+                       "pending": {"near": near_alert.serialize,
+                                   "far": far_alert.data}}, f)
+
+        scheduler = EventSchedulerInterface(bus=self.bus)
+        manager = AlertManager(test_file, scheduler, Mock())
+        self.assertEqual(set(manager.pending_alerts.keys()), {"near", "far"})
+        scheduled = [e[0].split(':', 1)[1] for e in scheduler.events.events]
+        self.assertEqual(set(scheduled), {"near", _SWEEP_EVENT_NAME})
+
+        # Sweep schedules alerts that moved into the horizon
+        manager._schedule_horizon = dt.timedelta(days=31)
+        manager._sweep_deferred_alerts()
+        scheduled = [e[0].split(':', 1)[1] for e in scheduler.events.events]
+        self.assertEqual(set(scheduled), {"near", "far"})
+        self.assertEqual(manager._deferred_alerts, set())
+
+        manager.shutdown()
+        self.assertFalse(scheduler.events.events)
+        remove(test_file)
+
+    def test_alert_manager_add_deferred(self):
+        from skill_alerts.util.alert_manager import _SWEEP_EVENT_NAME
+        test_file = join(self.manager_path, "deferred.json")
+        now_time = dt.datetime.now(dt.timezone.utc)
+        scheduler = EventSchedulerInterface(bus=self.bus)
+        manager = AlertManager(test_file, scheduler, Mock(),
+                               schedule_horizon=dt.timedelta(days=1))
+
+        def _scheduled():
+            return {e[0].split(':', 1)[1] for e in scheduler.events.events}
+
+        # Only alerts within the horizon are scheduled
+        manager.add_alert(Alert.create(now_time + dt.timedelta(hours=1),
+                                       context={"ident": "near"}))
+        manager.add_alert(Alert.create(now_time + dt.timedelta(days=30),
+                                       context={"ident": "far"}))
+        self.assertEqual(_scheduled(), {"near", _SWEEP_EVENT_NAME})
+        self.assertEqual(manager._deferred_alerts, {"far"})
+        self.assertEqual(manager.get_alert_status("far"), AlertState.PENDING)
+        far_sweep = manager._next_sweep
+
+        # The sweep is only rescheduled for alerts entering the horizon sooner
+        with patch.object(scheduler, "schedule_event") as schedule:
+            manager.add_alert(Alert.create(now_time + dt.timedelta(days=60),
+                                           context={"ident": "farther"}))
+            schedule.assert_not_called()
+        manager.add_alert(Alert.create(now_time + dt.timedelta(days=10),
+                                       context={"ident": "sooner"}))
+        self.assertLess(manager._next_sweep, far_sweep)
+
+        # Repeating and snoozed alerts beyond the horizon are deferred
+        weekly = Alert.create(now_time, repeat_frequency=dt.timedelta(days=7),
+                              context={"ident": "weekly"})
+        manager._pending_alerts["weekly"] = weekly
+        manager._handle_alert_expiration(Message("alert.expired", weekly.data,
+                                                 weekly.context))
+        self.assertIn("weekly", manager._deferred_alerts)
+        self.assertNotIn("weekly", _scheduled())
+        snoozed = manager.snooze_alert("weekly", dt.timedelta(days=2))
+        self.assertIn(get_alert_id(snoozed), manager._deferred_alerts)
+
+        # Removed alerts are no longer deferred
+        manager.rm_alert("sooner")
+        self.assertNotIn("sooner", manager._deferred_alerts)
+
+        manager.shutdown()
+        self.assertIsNone(manager._next_sweep)
+        remove(test_file)
+
     def test_get_user_alerts(self):
         from skill_alerts.util.alert_manager import get_alert_user
         alert_manager = self._init_alert_manager()
@@ -1388,6 +2349,113 @@ class TestAlertManager(unittest.TestCase):
                               *other_user_alerts["active"],
                               *other_user_alerts["missed"]]]))
 
+    def test_get_alerts_page(self):
+        alert_manager = self._init_alert_manager()
+        now_time = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+        for i in range(10):
+            alert_time = now_time + dt.timedelta(minutes=i + 1)
+            alert = Alert.create(alert_time, f"alert {i}",
+                                 AlertType.TIMER if i % 2 else AlertType.ALARM,
+                                 context={"user": "test_user" if i < 6
+                                          else "other_user"})
+            alert_manager.add_alert(alert)
+
+        # Pages are ordered and do not overlap
+        page_1, cursor = alert_manager.get_alerts_page(limit=4)
+        self.assertEqual([a.alert_name for a in page_1],
+                         [f"alert {i}" for i in range(4)])
+        page_2, cursor = alert_manager.get_alerts_page(limit=4, cursor=cursor)
+        self.assertEqual([a.alert_name for a in page_2],
+                         [f"alert {i}" for i in range(4, 8)])
+        page_3, cursor = alert_manager.get_alerts_page(limit=4, cursor=cursor)
+        self.assertEqual(len(page_3), 2)
+        self.assertIsNone(cursor)
+
+        # Filters
+        timers, _ = alert_manager.get_alerts_page("test_user",
+                                                  alert_type=AlertType.TIMER)
+        self.assertEqual([a.alert_name for a in timers],
+                         ["alert 1", "alert 3", "alert 5"])
+        window, _ = alert_manager.get_alerts_page(
+            after=now_time + dt.timedelta(minutes=3),
+            before=now_time + dt.timedelta(minutes=5))
+        self.assertEqual([a.alert_name for a in window],
+                         ["alert 2", "alert 3"])
+        with self.assertRaises(ValueError):
+            alert_manager.get_alerts_page(disposition="dismissed")
+
+        # Removed alerts are dropped from the user index
+        for alert in alert_manager.get_user_alerts("other_user")["pending"]:
+            alert_manager.rm_alert(get_alert_id(alert))
+        self.assertNotIn("other_user", alert_manager._user_index)
+        self.assertEqual(len(alert_manager.get_alerts_page("test_user")[0]),
+                         6)
+
+        # Alerts added out of order are paged in expiration order
+        early = Alert.create(now_time + dt.timedelta(seconds=30), "early",
+                             context={"user": "test_user"})
+        early_id = alert_manager.add_alert(early)
+        page, cursor = alert_manager.get_alerts_page("test_user", limit=2)
+        self.assertEqual([a.alert_name for a in page], ["early", "alert 0"])
+        page, _ = alert_manager.get_alerts_page("test_user", limit=2,
+                                                cursor=cursor)
+        self.assertEqual([a.alert_name for a in page],
+                         ["alert 1", "alert 2"])
+        alert_manager.rm_alert(early_id)
+        pending = alert_manager._pending_alerts
+        self.assertEqual(len(pending._keys), len(pending))
+        self.assertEqual(pending._keys, sorted(pending._keys))
+        alert_manager.shutdown()
+
+    def test_get_changes(self):
+        from skill_alerts.util.alert_manager import _CHANGE_FEED_SIZE
+        alert_manager = self._init_alert_manager()
+        changes = list()
+        alert_manager._change_callback = changes.append
+        start = alert_manager.version
+        now_time = dt.datetime.now(dt.timezone.utc)
+
+        test_alert = Alert.create(now_time + dt.timedelta(hours=1),
+                                  context={"user": "test_user"})
+        other_alert = Alert.create(now_time + dt.timedelta(hours=2),
+                                   context={"user": "other_user"})
+        test_id = alert_manager.add_alert(test_alert)
+        other_id = alert_manager.add_alert(other_alert)
+        alert_manager.rm_alert(other_id)
+        self.assertEqual([c["change"] for c in changes],
+                         ["created", "created", "removed"])
+        self.assertEqual([c["version"] for c in changes],
+                         [start + 1, start + 2, start + 3])
+        self.assertEqual(changes[0]["alert"]["context"]["ident"], test_id)
+        self.assertEqual(changes[0]["dispositions"], ["pending"])
+        self.assertEqual(changes[2]["dispositions"], [])
+
+        # Deltas since a version, optionally by user
+        delta, version, reset = alert_manager.get_changes(start + 1)
+        self.assertEqual([c["ident"] for c in delta], [other_id, other_id])
+        self.assertEqual(version, start + 3)
+        self.assertFalse(reset)
+        delta, _, _ = alert_manager.get_changes(start, "test_user")
+        self.assertEqual([c["ident"] for c in delta], [test_id])
+        self.assertEqual(alert_manager.get_changes(version), ([], version,
+                                                              False))
+
+        # Unknown or expired versions require a reload
+        self.assertTrue(alert_manager.get_changes(version + 1)[2])
+        for _ in range(_CHANGE_FEED_SIZE):
+            alert_manager._record_change("rescheduled", test_alert, test_id)
+        self.assertTrue(alert_manager.get_changes(start)[2])
+
+        # Version persists with the cache
+        alert_manager.shutdown()
+        scheduler = EventSchedulerInterface(bus=self.bus)
+        reloaded = AlertManager(join(self.manager_path, "alerts.json"),
+                                scheduler, Mock())
+        self.assertEqual(reloaded.version, alert_manager.version)
+        self.assertTrue(reloaded.get_changes(start)[2])
+        self.assertFalse(reloaded.get_changes(reloaded.version)[2])
+        reloaded.shutdown()
+
     def test_get_all_alerts(self):
         alert_manager = self._init_alert_manager()
         now_time = dt.datetime.now(dt.timezone.utc)
@@ -1534,6 +2602,488 @@ class TestAlertManager(unittest.TestCase):
         self.assertEqual(manager.active_gui_timers[0].data, timer_1.data)
         self.assertEqual(manager.active_gui_timers[1].data, timer_3.data)
 
+        # Get a page of timers
+        timer_0 = Alert.create(now_time + dt.timedelta(minutes=1), 'timer 0',
+                               AlertType.TIMER)
+        manager.add_timer_to_gui(timer_0)
+        page, total, times = manager.get_gui_timers_page(1, 1)
+        self.assertEqual(total, 3)
+        self.assertEqual([t.data for t in page], [timer_1.data])
+        self.assertEqual(times,
+                         [(None, timer_1.next_expiration.timestamp())])
+        self.assertEqual(manager.get_gui_timers_page(limit=0), ([], 3, []))
+        self.assertEqual([t.alert_name for t in
+                          manager.get_gui_timers_page(1)[0]],
+                         [timer_1_name, timer_1_name])
+        self.assertFalse(manager.dismiss_alert_from_gui("invalid"))
+
+        # Concurrent adds and dismissals keep the index consistent
+        timers = [Alert.create(now_time + dt.timedelta(minutes=i % 7),
+                               f"timer {i}", AlertType.TIMER)
+                  for i in range(200)]
+
+        def _add_and_dismiss(timer):
+            manager.add_timer_to_gui(timer)
+            manager.get_gui_timers_page(0, 10)
+            self.assertTrue(manager.dismiss_alert_from_gui(
+                get_alert_id(timer)))
+
+        threads = [Thread(target=_add_and_dismiss, args=(timer,))
+                   for timer in timers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(manager.get_gui_timers_page(limit=0)[1], 3)
+        self.assertEqual(len(manager._gui_timer_keys),
+                         len(manager._gui_timers))
+
+
+class TestAsyncAlertManager(unittest.TestCase):
+    manager_path = join(dirname(__file__), "test_cache")
+
+    def test_async_alert_manager(self):
+        import asyncio
+        from skill_alerts.util.async_alert_manager import AsyncAlertManager
+        cache_file = join(self.manager_path, "async_alerts.json")
+        now_time = dt.datetime.now(dt.timezone.utc)
+
+        async def _test():
+            expired = list()
+            handled = asyncio.Event()
+
+            async def _on_expired(alert):
+                expired.append(alert)
+                handled.set()
+
+            manager = await AsyncAlertManager.create(
+                cache_file, EventSchedulerInterface(bus=FakeBus()),
+                _on_expired)
+            writes = Mock(wraps=manager.manager.write_cache_now)
+            manager.manager.write_cache_now = writes
+
+            # Concurrent changes share cache writes
+            alerts = [Alert.create(now_time + dt.timedelta(minutes=i + 1),
+                                   f"alert {i}", context={"ident": f"a{i}"})
+                      for i in range(100)]
+            ids = await asyncio.gather(*(manager.add_alert(alert)
+                                         for alert in alerts))
+            self.assertEqual(ids, [f"a{i}" for i in range(100)])
+            await manager.flush()
+            self.assertGreaterEqual(writes.call_count, 1)
+            self.assertLess(writes.call_count, 100)
+            with open(cache_file) as f:
+                self.assertEqual(len(json.load(f)["pending"]), 100)
+
+            # Queries and changes are awaitable
+            self.assertEqual(await manager.get_alert_status("a0"),
+                             AlertState.PENDING)
+            page, cursor = await manager.get_alerts_page(limit=10)
+            self.assertEqual(len(page), 10)
+            self.assertIsNotNone(cursor)
+            await manager.rm_alert("a1")
+            self.assertIsNone(await manager.get_alert_status("a1"))
+            changes, version, reload = await manager.get_changes(100)
+            self.assertEqual([c["change"] for c in changes], ["removed"])
+            self.assertFalse(reload)
+
+            # Changes run on the loop while a cache write is in progress
+            writing = Event()
+            release = Event()
+            write_store = manager.manager._write_store
+
+            def _slow_write_store():
+                writing.set()
+                release.wait(5)
+                write_store()
+
+            with patch.object(manager.manager, "_write_store",
+                              _slow_write_store):
+                late = Alert.create(now_time + dt.timedelta(hours=2), "late",
+                                    context={"ident": "late"})
+                await manager.add_alert(late)
+                await asyncio.get_running_loop().run_in_executor(
+                    None, writing.wait, 5)
+                start = time.monotonic()
+                await manager.rm_alert("late")
+                self.assertIsNone(await manager.get_alert_status("late"))
+                self.assertLess(time.monotonic() - start, 1)
+                release.set()
+                await manager.flush()
+            with open(cache_file) as f:
+                self.assertNotIn("late", json.load(f)["pending"])
+
+            # Expiration from the scheduler thread awaits the callback
+            alert = alerts[0]
+            thread = Thread(target=manager.manager._handle_alert_expiration,
+                            args=(Message("alert.expired", alert.data,
+                                          alert.context),))
+            thread.start()
+            await asyncio.wait_for(handled.wait(), 5)
+            thread.join()
+            self.assertEqual(get_alert_id(expired[0]), "a0")
+            self.assertEqual(await manager.get_alert_status("a0"),
+                             AlertState.ACTIVE)
+            snoozed = await manager.snooze_alert("a0",
+                                                 dt.timedelta(minutes=5))
+            self.assertEqual(await manager.get_alert_status(
+                get_alert_id(snoozed)), AlertState.PENDING)
+
+            # Pending writes finish before shutdown; alerts marked missed by
+            # shutdown are saved by its final write, not the writer thread
+            manager.manager._handle_alert_expiration(
+                Message("alert.expired", alerts[2].data, alerts[2].context))
+            self.assertEqual(await manager.get_alert_status("a2"),
+                             AlertState.ACTIVE)
+            writes.reset_mock()
+            await manager.shutdown()
+            self.assertEqual(writes.call_count, 1)
+            self.assertIsNone(manager._write_task.exception())
+            with open(cache_file) as f:
+                cache = json.load(f)
+            self.assertNotIn("a1", cache["pending"])
+            self.assertIn(get_alert_id(snoozed), cache["pending"])
+            self.assertIn("a2", cache["missed"])
+
+        asyncio.run(_test())
+        os.remove(cache_file)
+
+
+class TestSharding(unittest.TestCase):
+    shard_path = join(dirname(__file__), "test_cache", "shards")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.shard_path, ignore_errors=True)
+
+    def _test_store_leases(self, store):
+        self.assertIsNone(store.get_lease(0))
+        self.assertTrue(store.acquire_lease(0, "node_a", 30))
+        self.assertTrue(store.acquire_lease(0, "node_a", 30))
+        self.assertFalse(store.acquire_lease(0, "node_b", 30))
+        self.assertEqual(store.get_lease(0)[0], "node_a")
+
+        # Only the lease owner may save or dequeue
+        self.assertTrue(store.save_shard(0, "node_a", {"pending": {}}))
+        self.assertFalse(store.save_shard(0, "node_b", {"pending": {1: 1}}))
+        self.assertEqual(store.load_shard(0), {"pending": {}})
+        self.assertEqual(store.load_shard(1), {})
+        store.enqueue(0, {"op": "remove", "ident": "1"})
+        store.enqueue(0, {"op": "remove", "ident": "2"})
+        self.assertEqual(store.dequeue(0, "node_b"), [])
+        self.assertEqual([op["ident"] for op in store.dequeue(0, "node_a")],
+                         ["1", "2"])
+        self.assertEqual(store.dequeue(0, "node_a"), [])
+
+        # Expired or released leases may be acquired
+        store.release_lease(0, "node_b")
+        self.assertEqual(store.get_lease(0)[0], "node_a")
+        store.release_lease(0, "node_a")
+        self.assertIsNone(store.get_lease(0))
+        self.assertTrue(store.acquire_lease(0, "node_b", -1))
+        self.assertTrue(store.acquire_lease(0, "node_a", 30))
+
+    def test_get_shard(self):
+        from skill_alerts.util.sharding import get_shard
+        self.assertEqual(get_shard("local", 16), get_shard("local", 16))
+        shards = {get_shard(f"user_{i}", 16) for i in range(100)}
+        self.assertEqual(shards, set(range(16)))
+
+    def test_sqlite_shard_store(self):
+        from skill_alerts.util.sharding import SQLiteShardStore
+        self._test_store_leases(
+            SQLiteShardStore(join(self.shard_path, "shards.db")))
+
+    def test_file_shard_store(self):
+        from skill_alerts.util.sharding import FileShardStore, ShardStore
+        with self.assertRaises(TypeError):
+            ShardStore()
+        store_path = join(self.shard_path, "store")
+        self._test_store_leases(FileShardStore(store_path))
+        # Shard files are replaced, not written in place
+        self.assertFalse([file for file in os.listdir(store_path)
+                          if file.endswith(".tmp")])
+
+    def test_sharded_alert_manager(self):
+        from skill_alerts.util.sharding import ShardedAlertManager, \
+            FileShardStore, get_shard
+        store = FileShardStore(join(self.shard_path, "store"))
+        scheduler = EventSchedulerInterface(bus=FakeBus())
+        remote_callback = Mock()
+        node_a = ShardedAlertManager(store, "node_a",
+                                     join(self.shard_path, "node_a"),
+                                     scheduler, Mock(), num_shards=2,
+                                     preferred_shards=[0],
+                                     remote_callback=remote_callback,
+                                     context_keys=None)
+        node_b = ShardedAlertManager(store, "node_b",
+                                     join(self.shard_path, "node_b"),
+                                     scheduler, Mock(), num_shards=2,
+                                     preferred_shards=[1])
+        node_a.refresh()
+        node_b.refresh()
+        self.assertEqual(node_a.owned_shards, [0])
+        self.assertEqual(node_b.owned_shards, [1])
+        # AlertManager options are forwarded to each shard's manager
+        self.assertIs(node_a._managers[0]._remote_callback, remote_callback)
+        self.assertIsNone(node_a._managers[0]._context_keys)
+
+        users = {get_shard(f"user_{i}", 2): f"user_{i}" for i in range(10)}
+        expiration = dt.datetime.now(dt.timezone.utc) + dt.timedelta(hours=1)
+        # Alert for a remote shard is queued for the owner
+        remote = Alert.create(expiration, context={"user": users[1]})
+        remote_id = node_a.add_alert(remote)
+        self.assertIsNone(node_a.get_manager(users[1]))
+        node_b.refresh()
+        self.assertIn(remote_id, node_b.get_manager(users[1]).pending_alerts)
+        local = Alert.create(expiration, context={"user": users[0]})
+        local_id = node_a.add_alert(local)
+        self.assertIn(local_id, store.load_shard(0)["pending"])
+
+        node_b.rm_alert(local_id, users[0])
+        node_a.refresh()
+        self.assertNotIn(local_id, node_a.get_manager(users[0]).pending_alerts)
+
+        node_a.shutdown()
+        node_b.shutdown()
+        self.assertIsNone(store.get_lease(0))
+        self.assertIn(remote_id, store.load_shard(1)["pending"])
+
+    def test_sharded_failover_multiprocess(self):
+        from multiprocessing import get_context
+        from skill_alerts.util.sharding import ShardedAlertManager, \
+            SQLiteShardStore
+        store_path = join(self.shard_path, "shards.db")
+        users = [f"user_{i}" for i in range(8)]
+        node_a = get_context("fork").Process(
+            target=_run_shard_node,
+            args=(store_path, join(self.shard_path, "node_a"), users))
+        node_a.start()
+        node_a.join(30)
+        self.assertEqual(node_a.exitcode, 0)
+
+        # node_a exited without releasing its leases
+        scheduler = EventSchedulerInterface(bus=FakeBus())
+        node_b = ShardedAlertManager(SQLiteShardStore(store_path), "node_b",
+                                     join(self.shard_path, "node_b"),
+                                     scheduler, Mock(), num_shards=4,
+                                     lease_ttl=2)
+        node_b.refresh()
+        self.assertEqual(node_b.owned_shards, [])
+
+        # Shards fail over after the leases expire
+        time.sleep(2.5)
+        node_b.refresh()
+        self.assertEqual(node_b.owned_shards, [0, 1, 2, 3])
+        scheduled = {e[0].split(':', 1)[1] for e in scheduler.events.events}
+        for user in users:
+            self.assertIn(user, node_b.get_manager(user).pending_alerts)
+            self.assertIn(user, scheduled)
+        node_b.shutdown()
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram(self):
+        from skill_alerts.util.metrics import Histogram
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        self.assertEqual(histogram.snapshot(),
+                         {"buckets": {"0.1": 2, "1.0": 3, "+Inf": 4},
+                          "count": 4, "sum": 2.65})
+
+    def test_read_write_lock(self):
+        from skill_alerts.util.locks import ReadWriteLock
+        lock = ReadWriteLock()
+
+        # Readers share the lock and exclude writers
+        with lock.reader:
+            self.assertTrue(lock.reader.acquire(blocking=False))
+            self.assertFalse(lock.writer.acquire(blocking=False))
+            self.assertFalse(lock.writer.acquire(timeout=0.01))
+            lock.reader.release()
+        with lock.writer:
+            self.assertFalse(lock.reader.acquire(blocking=False))
+            self.assertFalse(lock.writer.acquire(blocking=False))
+        self.assertRaises(RuntimeError, lock.reader.release)
+        self.assertRaises(RuntimeError, lock.writer.release)
+
+        # A waiting writer blocks new readers until it has written
+        events = list()
+        writer_waiting = Event()
+
+        def _write():
+            writer_waiting.set()
+            with lock.writer:
+                events.append("write")
+
+        def _read():
+            with lock.reader:
+                events.append("read")
+
+        with lock.reader:
+            writer = Thread(target=_write)
+            writer.start()
+            writer_waiting.wait()
+            time.sleep(0.1)
+            reader = Thread(target=_read)
+            reader.start()
+            time.sleep(0.1)
+            self.assertEqual(events, [])
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_metrics(self):
+        from threading import Lock
+        from skill_alerts.util.metrics import Metrics, TimedLock
+        metrics = Metrics()
+        metrics.increment("changes_total", change="created")
+        metrics.increment("changes_total", 2, change="created")
+        metrics.increment("changes_total", change="removed")
+        with metrics.time("duration_seconds"):
+            time.sleep(0.01)
+        lock = TimedLock(Lock(), metrics, "lock_wait_seconds")
+        with lock:
+            self.assertFalse(lock.acquire(blocking=False))
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"],
+                         {'changes_total{change="created"}': 3,
+                          'changes_total{change="removed"}': 1})
+        self.assertEqual(snapshot["histograms"]["lock_wait_seconds"]["count"],
+                         2)
+        duration = snapshot["histograms"]["duration_seconds"]
+        self.assertEqual(duration["count"], 1)
+        self.assertGreaterEqual(duration["sum"], 0.01)
+
+        prometheus = metrics.to_prometheus()
+        self.assertEqual(prometheus.count("# TYPE changes_total counter"), 1)
+        self.assertIn('changes_total{change="created"} 3', prometheus)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 1', prometheus)
+        self.assertIn("duration_seconds_count 1", prometheus)
+
+        test_file = join(dirname(__file__), "metrics.prom")
+        metrics.write_prometheus(test_file)
+        with open(test_file) as f:
+            self.assertEqual(f.read(), prometheus)
+        remove(test_file)
+
+
+class TestTracing(unittest.TestCase):
+    def test_delivery_tracer(self):
+        from skill_alerts.util.tracing import DeliveryTracer
+        tracer = DeliveryTracer(max_traces=2)
+        due = time.time() - 2
+        trace = tracer.start("alert", due)
+        trace.mark("scheduler", due + 1)
+        tracer.mark("alert", "gui_notify")
+        tracer.mark("untraced", "gui_notify")
+
+        finished = tracer.finish("alert", "speak")
+        self.assertTrue(finished["finished"])
+        self.assertEqual([span["stage"] for span in finished["spans"]],
+                         ["scheduler", "gui_notify", "speak"])
+        self.assertEqual(finished["spans"][0]["duration"], 1)
+        self.assertAlmostEqual(finished["lag"], 2, 0)
+        self.assertIsNone(tracer.finish("alert", "speak"))
+        tracer.mark("alert", "ignored")
+        self.assertEqual(len(tracer.get_trace("alert")["spans"]), 3)
+
+        # Over budget deliveries are counted
+        tracer.budget = 1
+        tracer.start("late", due)
+        tracer.finish("late", "play_audio")
+        summary = tracer.summary()
+        self.assertEqual(summary["over_budget"], 1)
+        self.assertEqual(summary["lag"]["count"], 2)
+        self.assertEqual(summary["stages"]["speak"]["count"], 1)
+        self.assertEqual(summary["stages"]["play_audio"]["count"], 1)
+
+        # Oldest traces are dropped
+        tracer.start("new", time.time())
+        self.assertEqual([t["alert_id"] for t in tracer.get_traces()],
+                         ["late", "new"])
+        self.assertEqual(tracer.summary()["lag"]["count"], 1)
+
+
+class TestPlayback(unittest.TestCase):
+    sound_file = join(dirname(dirname(__file__)), "res", "snd",
+                      "default-alarm.wav")
+
+    def test_decode_sound(self):
+        from skill_alerts.util.playback import decode_sound
+        sound = decode_sound(self.sound_file)
+        self.assertEqual(sound.rate, 48000)
+        self.assertEqual(sound.channels, 2)
+        self.assertEqual(sound.sample_width, 2)
+        self.assertEqual(len(sound.frames) % 4, 0)
+        self.assertIsNone(decode_sound(__file__))
+        self.assertIsNone(decode_sound("/invalid/file.wav"))
+
+    def test_get_player_command(self):
+        from skill_alerts.util.playback import DecodedSound, \
+            get_player_command
+        sound = DecodedSound(b"\x00\x00", 44100, 1, 2)
+        with patch("skill_alerts.util.playback.which") as which:
+            which.return_value = None
+            self.assertIsNone(get_player_command(sound))
+            which.side_effect = lambda cmd: cmd == "aplay"
+            self.assertEqual(get_player_command(sound),
+                             ["aplay", "-q", "-t", "raw", "-r", "44100",
+                              "-c", "1", "-f", "S16_LE"])
+            which.side_effect = lambda cmd: True
+            self.assertEqual(get_player_command(sound)[:2],
+                             ["paplay", "--raw"])
+
+    def test_sound_cache(self):
+        from skill_alerts.util.playback import SoundCache, decode_sound
+        sound_size = len(decode_sound(self.sound_file).frames)
+        timer_file = join(dirname(self.sound_file), "default-timer.wav")
+        cache = SoundCache(max_bytes=sound_size)
+        with patch("skill_alerts.util.playback.decode_sound",
+                   wraps=decode_sound) as decode:
+            cache.preload([self.sound_file])
+            sound = cache.get(self.sound_file)
+            self.assertIs(cache.get(self.sound_file), sound)
+            decode.assert_called_once()
+            self.assertEqual(cache.size, sound_size)
+
+            # Least recently used sounds are removed to stay within limits
+            cache.get(timer_file)
+            self.assertLessEqual(cache.size, sound_size)
+            cache.get(self.sound_file)
+            self.assertEqual(decode.call_count, 3)
+
+            self.assertIsNone(cache.get("/invalid/file.wav"))
+            cache.clear()
+            self.assertEqual(cache.size, 0)
+
+    def test_looping_player(self):
+        from skill_alerts.util.playback import LoopingPlayer, decode_sound
+        with patch("skill_alerts.util.playback.get_player_command",
+                   return_value=None):
+            self.assertIsNone(LoopingPlayer.from_file(self.sound_file))
+
+        # Audio is written to one process until stopped
+        player = LoopingPlayer(decode_sound(self.sound_file), ["cat"])
+        with patch("subprocess.Popen", wraps=__import__("subprocess").Popen) \
+                as popen:
+            player.start()
+            self.assertFalse(player.wait(1))
+            self.assertTrue(player.is_playing)
+            popen.assert_called_once()
+        start = time.time()
+        player.stop()
+        self.assertLess(time.time() - start, 1)
+        self.assertFalse(player.is_playing)
+        self.assertTrue(player.wait(0))
+
+        # Playback ends if the player exits
+        player = LoopingPlayer(decode_sound(self.sound_file), ["true"])
+        player.start()
+        self.assertTrue(player.wait(5))
+        player.stop()
+
 
 class TestParseUtils(unittest.TestCase):
     def test_round_nearest_minute(self):
@@ -1873,8 +3423,29 @@ class TestParseUtils(unittest.TestCase):
         pass
 
     def test_parse_script_file_from_message(self):
-        # TODO
-        pass
+        from skill_alerts.util.parse_utils import \
+            parse_script_file_from_message
+        bus = Mock()
+
+        # No script requested, bus is not queried
+        message = Message("test", {"utterance": "set an alarm for 9 am"})
+        self.assertIsNone(parse_script_file_from_message(message, bus=bus))
+        bus.wait_for_response.assert_not_called()
+
+        # Valid script
+        bus.wait_for_response.return_value = Message(
+            "neon.script_exists.response", {"script_exists": True,
+                                            "script_name": "demo"})
+        message = Message("test", {"utterance": "run demo script at 9 am",
+                                   "script": "script"})
+        self.assertEqual(parse_script_file_from_message(message, bus=bus),
+                         "demo")
+        bus.wait_for_response.assert_called_once()
+
+        # Invalid script
+        bus.wait_for_response.return_value = Message(
+            "neon.script_exists.response", {"script_exists": False})
+        self.assertIsNone(parse_script_file_from_message(message, bus=bus))
 
     def test_parse_alert_name_from_message(self):
         from skill_alerts.util.parse_utils import parse_alert_name_from_message
@@ -2030,9 +3601,18 @@ class TestParseUtils(unittest.TestCase):
         self.assertEqual(local_user["user"], "local")
         self.assertEqual(local_user["origin_ident"], "1644629287")
         self.assertEqual(local_user["created"], 1644629287.028714)
-        self.assertIsInstance(local_user["timing"], dict)
+        self.assertNotIn("timing", local_user)
         self.assertIsInstance(local_user['ident'], str)
 
+        full_context = parse_alert_context_from_message(
+            test_message_local_user, None)
+        self.assertIsInstance(full_context["timing"], dict)
+        self.assertEqual(full_context["origin_ident"], "1644629287")
+        timing_context = parse_alert_context_from_message(
+            test_message_local_user, ("user", "timing"))
+        self.assertIsInstance(timing_context["timing"], dict)
+        self.assertEqual(timing_context["user"], "local")
+
         klat_user = parse_alert_context_from_message(test_message_klat_data)
         self.assertEqual(klat_user["user"], "server_user")
         self.assertIsInstance(klat_user["ident"], str)
@@ -2337,6 +3917,47 @@ class TestUIModels(unittest.TestCase):
                         timer_data['percentRemaining'])
         self.assertAlmostEqual(timer_data['percentRemaining'], 1, 1)
 
+    def test_build_timers_data(self):
+        from skill_alerts.util.ui_models import build_timers_data, \
+            build_timer_data, get_timer_times
+
+        remaining, percent, expired = get_timer_times([110., 100., 50.],
+                                                      [90., 100., 0.], 100.)
+        self.assertEqual(remaining, [10., 0., -50.])
+        self.assertEqual(percent, [0.5, 0, 0])
+        self.assertEqual(expired, [False, True, True])
+
+        now_time = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+        timers = [Alert.create(now_time + dt.timedelta(minutes=i),
+                               f"timer {i}", AlertType.TIMER,
+                               context={"start_time": (
+                                   now_time - dt.timedelta(minutes=i)
+                               ).isoformat()})
+                  for i in range(-2, 3)]
+        with self.assertRaises(ValueError):
+            build_timers_data(timers + [Alert.create(now_time,
+                                                     alert_type=AlertType.ALARM)])
+        timers_data = build_timers_data(timers, now_time)
+        self.assertEqual(timers_data, [build_timer_data(timer, now_time)
+                                       for timer in timers])
+        self.assertEqual([t['expired'] for t in timers_data],
+                         [True, True, True, False, False])
+        self.assertEqual([t['percentRemaining'] for t in timers_data],
+                         [0, 0, 0, 0.5, 0.5])
+        self.assertEqual([t['timerName'] for t in timers_data],
+                         [f"timer {i}" for i in range(-2, 3)])
+        self.assertTrue(timers_data[0]['timeDelta'].startswith('-'))
+        self.assertEqual(build_timers_data([]), [])
+
+        # Precomputed epochs are used instead of parsing the alerts
+        now = now_time.timestamp()
+        times = [(now - 60, now + 60), (None, now + 60)]
+        with patch("skill_alerts.util.ui_models.datetime") as mock_dt:
+            mock_dt.fromisoformat.side_effect = AssertionError
+            timers_data = build_timers_data(timers[3:], now_time, times)
+        self.assertEqual([t['percentRemaining'] for t in timers_data],
+                         [0.5, 1])
+
     def test_build_alarm_data(self):
         from skill_alerts.util.ui_models import build_alarm_data
         us_context = {
@@ -2386,6 +4007,66 @@ class TestUIModels(unittest.TestCase):
         self.assertEqual(metric_display['alarmIndex'],
                          get_alert_id(metric_alarm))
 
+        # Explicit preference skips lookup
+        self.assertEqual(build_alarm_data(us_alarm, True)['alarmTime'],
+                         "09:00")
+        self.assertEqual(build_alarm_data(metric_alarm, False)['alarmAmPm'],
+                         "AM")
+
+    def test_user_prefs_cache(self):
+        from skill_alerts.util.user_prefs import UserPrefsCache
+        cache = UserPrefsCache()
+        profile = {"user": {"username": "test_user"}, "units": {"time": 24}}
+        context_message = Message("test", {},
+                                  {"username": "test_user",
+                                   "user_profiles": [profile]})
+        user_message = Message("test", {}, {"username": "test_user"})
+
+        # Default user resolves once
+        with patch("neon_utils.configuration_utils."
+                   "get_user_config_from_mycroft_conf") as get_cfg:
+            get_cfg.return_value = {"user": {"username": "local"},
+                                    "units": {"time": 12}}
+            self.assertFalse(cache.use_24hour())
+            self.assertFalse(cache.use_24hour())
+            get_cfg.assert_called_once()
+
+            # Profiles in context are resolved once and cached for the user
+            with patch.object(cache, "_get_default_config",
+                              wraps=cache._get_default_config) as resolve:
+                self.assertTrue(cache.use_24hour(context_message))
+                self.assertTrue(cache.use_24hour(Message(
+                    "test", {}, {"username": "test_user",
+                                 "user_profiles": [dict(profile)]})))
+                self.assertTrue(cache.use_24hour(user_message))
+                resolve.assert_called_once()
+
+                # Updated profile in context replaces the cached value
+                updated = Message("test", {}, {
+                    "username": "test_user",
+                    "user_profiles": [{**profile, "units": {"time": 12}}]})
+                self.assertFalse(cache.use_24hour(updated))
+                self.assertFalse(cache.use_24hour(user_message))
+                self.assertEqual(resolve.call_count, 2)
+
+            # Invalidated user is resolved again
+            cache.invalidate("other_user")
+            self.assertFalse(cache.use_24hour(user_message))
+            cache.invalidate("test_user")
+            self.assertFalse(cache.use_24hour(user_message))
+            self.assertEqual(cache.get_prefs(user_message)["user"]["username"],
+                             "test_user")
+            get_cfg.assert_called_once()
+
+            # Default user configuration is reloaded after invalidation
+            get_cfg.return_value = {"user": {"username": "local"},
+                                    "units": {"time": 24}}
+            cache.invalidate("test_user")
+            self.assertFalse(cache.use_24hour())
+            cache.invalidate()
+            self.assertEqual(cache._prefs, dict())
+            self.assertTrue(cache.use_24hour())
+            self.assertEqual(get_cfg.call_count, 2)
 
 if __name__ == '__main__':
     pytest.main()
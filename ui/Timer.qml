@@ -10,6 +10,9 @@ import Mycroft 1.0 as Mycroft
 Mycroft.CardDelegate {
     id: timerFrame
     property int timerCount: sessionData.activeTimerCount
+    property int timerTotal: sessionData.timerTotal ? sessionData.timerTotal : timerCount
+    property int timerOffset: sessionData.timerOffset ? sessionData.timerOffset : 0
+    property int timerPageSize: sessionData.timerPageSize ? sessionData.timerPageSize : timerCount
     property int previousCount: 0
     property bool horizontalMode: parent.width >= parent.height ? 1 : 0
 
@@ -52,7 +55,10 @@ Mycroft.CardDelegate {
 
     Flickable {
         id: timerFlick
-        anchors.fill: parent
+        anchors.top: parent.top
+        anchors.left: parent.left
+        anchors.right: parent.right
+        anchors.bottom: pageBar.top
         contentWidth: timerFrame.horizontalMode ? (timerViews.count == 1 ? width : width / 2.5 * timerViews.count) : width
         contentHeight: timerFrame.horizontalMode ? parent.height : timerViewLayout.implicitHeight
         clip: true
@@ -79,4 +85,48 @@ Mycroft.CardDelegate {
             }
         }
     }
+
+    RowLayout {
+        id: pageBar
+        visible: timerFrame.timerTotal > timerFrame.timerPageSize
+        anchors.left: parent.left
+        anchors.right: parent.right
+        anchors.bottom: parent.bottom
+        height: visible ? Mycroft.Units.gridUnit * 3 : 0
+
+        Button {
+            Layout.fillHeight: true
+            Layout.preferredWidth: parent.width * 0.2
+            enabled: timerFrame.timerOffset > 0
+            contentItem: Kirigami.Icon {
+                source: "go-previous-symbolic"
+                color: Kirigami.Theme.textColor
+            }
+            onClicked: {
+                triggerGuiEvent("timerskill.gui.page.timers", {"offset": timerFrame.timerOffset - timerFrame.timerPageSize})
+            }
+        }
+
+        Label {
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            horizontalAlignment: Text.AlignHCenter
+            verticalAlignment: Text.AlignVCenter
+            color: Kirigami.Theme.textColor
+            text: (timerFrame.timerOffset + 1) + " - " + (timerFrame.timerOffset + timerFrame.timerCount) + " / " + timerFrame.timerTotal
+        }
+
+        Button {
+            Layout.fillHeight: true
+            Layout.preferredWidth: parent.width * 0.2
+            enabled: timerFrame.timerOffset + timerFrame.timerPageSize < timerFrame.timerTotal
+            contentItem: Kirigami.Icon {
+                source: "go-next-symbolic"
+                color: Kirigami.Theme.textColor
+            }
+            onClicked: {
+                triggerGuiEvent("timerskill.gui.page.timers", {"offset": timerFrame.timerOffset + timerFrame.timerPageSize})
+            }
+        }
+    }
 }
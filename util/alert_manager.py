@@ -26,22 +26,42 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from __future__ import annotations
+
 import datetime as dt
+import json
 
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import count
+from threading import Lock
 from copy import deepcopy
-from typing import Optional, List
-from json_database import JsonStorage
+from os import makedirs, remove
+from os.path import dirname, expanduser, isdir, isfile, splitext
+from typing import Dict, Iterable, Optional, List, Set, Tuple, \
+    TYPE_CHECKING
 from uuid import uuid4 as uuid
-from ovos_bus_client import Message
 from neon_utils.logger import LOG
-from neon_utils.location_utils import to_system_time
-from combo_lock import NamedLock
-from ovos_utils.events import EventSchedulerInterface
 
 from . import AlertState, AlertType
 from .alert import Alert
+from .encoding import ALERT_CONTEXT_KEYS, to_compact, from_compact, \
+    is_compact, pack, unpack
+from .locks import ReadWriteLock
+from .metrics import Metrics, TimedLock
+from .tracing import DeliveryTracer
+
+if TYPE_CHECKING:
+    from ovos_bus_client import Message
+    from ovos_utils.events import EventSchedulerInterface
 
 _DEFAULT_USER = "local"
+# Version 1 stored `Alert.serialize` strings, version 2 stores `Alert.data`
+CACHE_FORMAT_VERSION = 2
+_DEFAULT_SCHEDULE_HORIZON = dt.timedelta(days=1)
+_SWEEP_EVENT_NAME = "alert_manager_sweep"
+# Number of recent changes retained for `get_changes`
+_CHANGE_FEED_SIZE = 1000
 
 
 def get_alert_user(alert: Alert):
@@ -75,6 +95,97 @@ def sort_alerts_list(alerts: List[Alert]) -> List[Alert]:
     return alerts
 
 
+def _get_sort_key(alert: Alert, ident: str) -> Tuple[dt.datetime, str]:
+    """
+    Get the key alerts are ordered by when paging through alerts
+    :param alert: Alert object to get a key for
+    :param ident: Unique identifier associated with the Alert
+    :returns: tuple of next expiration time and alert ID
+    """
+    return (dt.datetime.fromisoformat(alert.data["next_expiration_time"]),
+            ident)
+
+
+def _encode_cursor(key: Tuple[dt.datetime, str]) -> str:
+    """
+    Build a paging cursor positioned after the specified sort key
+    :param key: sort key of the last alert included in a page
+    :returns: opaque cursor string
+    """
+    expiration, ident = key
+    return f"{expiration.timestamp()}|{ident}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[dt.datetime, str]:
+    """
+    Parse a cursor returned by `_encode_cursor`
+    :param cursor: cursor string
+    :returns: sort key to resume paging after
+    """
+    timestamp, ident = cursor.split('|', 1)
+    return (dt.datetime.fromtimestamp(float(timestamp), dt.timezone.utc),
+            ident)
+
+
+class _SortedAlerts(dict):
+    """
+    Alerts by ID that also keeps a list of sort keys ordered by next
+    expiration, so pages of alerts can be read without sorting. The key of an
+    alert is computed when it is added; callers must hold the lock guarding
+    the alerts while modifying or iterating.
+    """
+    def __init__(self):
+        super().__init__()
+        self._keys: List[Tuple[dt.datetime, str]] = list()
+        self._key_by_id: Dict[str, Tuple[dt.datetime, str]] = dict()
+
+    def __setitem__(self, ident: str, alert: Alert):
+        self._discard_key(ident)
+        super().__setitem__(ident, alert)
+        key = _get_sort_key(alert, ident)
+        self._key_by_id[ident] = key
+        insort(self._keys, key)
+
+    def __delitem__(self, ident: str):
+        super().__delitem__(ident)
+        self._discard_key(ident)
+
+    def pop(self, ident: str, *default):
+        alert = super().pop(ident, *default)
+        self._discard_key(ident)
+        return alert
+
+    def clear(self):
+        super().clear()
+        self._keys.clear()
+        self._key_by_id.clear()
+
+    def iter_sorted(self, start: Optional[Tuple[dt.datetime, str]] = None):
+        """
+        Iterate over alerts in expiration order
+        :param start: only include alerts with a sort key after this key
+        :returns: generator of (sort key, Alert) tuples
+        """
+        idx = 0
+        if start:
+            idx = bisect_left(self._keys, start)
+            if idx < len(self._keys) and self._keys[idx] == start:
+                idx += 1
+        while idx < len(self._keys):
+            key = self._keys[idx]
+            yield key, self[key[1]]
+            idx += 1
+
+    def _discard_key(self, ident: str):
+        """
+        Remove the sort key for an alert ID if it is indexed
+        :param ident: alert ID to remove
+        """
+        key = self._key_by_id.pop(ident, None)
+        if key is not None:
+            del self._keys[bisect_left(self._keys, key)]
+
+
 def get_alerts_by_type(alerts: List[Alert]) -> dict:
     """
     Parse a list of alerts into a dict of alerts by alert type.
@@ -94,22 +205,130 @@ def get_alerts_by_type(alerts: List[Alert]) -> dict:
 class AlertManager:
     def __init__(self, alerts_file: str,
                  event_scheduler: EventSchedulerInterface,
-                 alert_callback: callable):
+                 alert_callback: callable,
+                 schedule_horizon: Optional[dt.timedelta] =
+                 _DEFAULT_SCHEDULE_HORIZON,
+                 cache_encoding: str = "json",
+                 change_callback: Optional[callable] = None,
+                 instance_name: Optional[str] = None,
+                 remote_callback: Optional[callable] = None,
+                 metrics: Optional[Metrics] = None,
+                 tracer: Optional[DeliveryTracer] = None,
+                 cache_writer: Optional[callable] = None,
+                 context_keys: Optional[Iterable[str]] = ALERT_CONTEXT_KEYS):
+        """
+        :param alerts_file: path to the file used to persist alerts
+        :param event_scheduler: EventSchedulerInterface to schedule alerts with
+        :param alert_callback: method to call with each expired Alert
+        :param schedule_horizon: pending alerts expiring further in the future
+            than this are not scheduled until they enter the horizon (None to
+            schedule all alerts)
+        :param cache_encoding: `json` to persist alerts to `alerts_file` or
+            `msgpack` to persist compact alerts to a `.msgpack` file
+        :param change_callback: optional method to call with each change dict
+            recorded in the change feed
+        :param instance_name: optional name distinguishing this manager from
+            others sharing `event_scheduler`
+        :param remote_callback: optional method to call with each expired
+            Alert from a remote client (with `mq` context). If specified,
+            remote alerts are not tracked as active after expiration.
+        :param metrics: optional Metrics to record timings and counts in
+        :param tracer: optional DeliveryTracer to start traces of expired
+            alerts in
+        :param cache_writer: optional method to call instead of writing the
+            cache when alerts change. It is responsible for calling
+            `write_cache_now` to persist changes.
+        :param context_keys: context keys to keep in compact cached alerts
+            (None to keep the full context)
+        """
+        from json_database import JsonStorage
+        if cache_encoding not in ("json", "msgpack"):
+            raise ValueError(f"Invalid cache_encoding: {cache_encoding}")
+        self._cache_encoding = cache_encoding
+        self._packed_file = f"{splitext(expanduser(alerts_file))[0]}.msgpack"
         self._alerts_store = JsonStorage(alerts_file)
+        self._encoding_changed = self._read_packed_store()
         self._scheduler = event_scheduler
         self._callback = alert_callback
-        self._pending_alerts = dict()
-        self._missed_alerts = dict()
-        self._active_alerts = dict()
-        self._read_lock = NamedLock("alert_manager")
-        self._active_gui_timers = list()
+        self._remote_callback = remote_callback
+        self._schedule_horizon = schedule_horizon
+        self._pending_alerts = _SortedAlerts()
+        self._missed_alerts = _SortedAlerts()
+        self._active_alerts = _SortedAlerts()
+        self._deferred_alerts = set()
+        self._next_sweep: Optional[dt.datetime] = None
+        self._sweep_lock = Lock()
+        self._user_index: Dict[str, Set[str]] = dict()
+        self._change_callback = change_callback
+        self._cache_writer = cache_writer
+        self._context_keys = context_keys
+        self._sweep_event_name = f"{_SWEEP_EVENT_NAME}.{instance_name}" \
+            if instance_name else _SWEEP_EVENT_NAME
+        self._changes = deque(maxlen=_CHANGE_FEED_SIZE)
+        self._version = self._alerts_store.get("change_version") or 0
+        self._metrics = metrics or Metrics()
+        self._tracer = tracer or DeliveryTracer()
+        # Queries share `_read_lock`; changes to alerts take `_write_lock`.
+        # Cache writes are serialized by `_cache_lock` and only hold
+        # `_read_lock` while copying references to alerts
+        lock = ReadWriteLock()
+        self._read_lock = TimedLock(lock.reader, self._metrics,
+                                    "neon_alerts_lock_wait_seconds",
+                                    mode="read")
+        self._write_lock = TimedLock(lock.writer, self._metrics,
+                                     "neon_alerts_lock_wait_seconds",
+                                     mode="write")
+        self._cache_lock = Lock()
+        # GUI timers are indexed by ID and kept in a list of sort keys ordered
+        # by expiration. The GUI index has its own lock, which is never held
+        # while acquiring `_read_lock` or `_write_lock`
+        self._gui_lock = Lock()
+        # GUI timers by ID with their index key and epoch start time
+        self._gui_timers: Dict[str, Tuple[tuple, Alert,
+                                          Optional[float]]] = dict()
+        self._gui_timer_keys: List[Tuple[float, int, str]] = list()
+        self._gui_timer_seq = count()
 
         self._load_cache()
 
     @property
-    def active_gui_timers(self):
-        with self._read_lock:
-            return deepcopy(self._active_gui_timers)
+    def metrics(self) -> Metrics:
+        """
+        Returns the Metrics this manager records timings and counts in
+        """
+        return self._metrics
+
+    @property
+    def tracer(self) -> DeliveryTracer:
+        """
+        Returns the DeliveryTracer that traces expired alerts
+        """
+        return self._tracer
+
+    @property
+    def active_gui_timers(self) -> List[Alert]:
+        with self._gui_lock:
+            return deepcopy([self._gui_timers[key[2]][1]
+                             for key in self._gui_timer_keys])
+
+    def get_gui_timers_page(self, offset: int = 0,
+                            limit: Optional[int] = None) -> \
+            Tuple[List[Alert], int, List[Tuple[Optional[float], float]]]:
+        """
+        Get a window of GUI timers ordered by expiration. Returned Alert
+        objects are not copies and should not be modified.
+        :param offset: index of the first timer to return
+        :param limit: maximum number of timers to return (None for all)
+        :returns: list of timers, the total number of GUI timers, and the
+            epoch start (None if unknown) and expiration of each timer
+        """
+        end = None if limit is None else offset + limit
+        with self._gui_lock:
+            keys = self._gui_timer_keys[offset:end]
+            entries = [self._gui_timers[key[2]] for key in keys]
+            total = len(self._gui_timer_keys)
+        return [entry[1] for entry in entries], total, \
+            [(entry[2], entry[0][0]) for entry in entries]
 
     @property
     def missed_alerts(self):
@@ -117,7 +336,8 @@ class AlertManager:
         Returns a static dict of current missed alerts
         """
         with self._read_lock:
-            return deepcopy(self._missed_alerts)
+            alerts = dict(self._missed_alerts)
+        return deepcopy(alerts)
 
     @property
     def pending_alerts(self):
@@ -125,7 +345,8 @@ class AlertManager:
         Returns a static dict of current pending alerts
         """
         with self._read_lock:
-            return deepcopy(self._pending_alerts)
+            alerts = dict(self._pending_alerts)
+        return deepcopy(alerts)
 
     @property
     def active_alerts(self):
@@ -133,7 +354,8 @@ class AlertManager:
         Returns a static dict of current active alerts
         """
         with self._read_lock:
-            return deepcopy(self._active_alerts)
+            alerts = dict(self._active_alerts)
+        return deepcopy(alerts)
 
     # Query Methods
     def get_alert_status(self, alert_id: str) -> Optional[AlertState]:
@@ -152,6 +374,16 @@ class AlertManager:
             return AlertState.PENDING
         LOG.error(f"{alert_id} not found")
 
+    def has_alert(self, alert_id: str) -> bool:
+        """
+        Check if an alert is active, missed, or pending
+        :param alert_id: ID of alert to check
+        :returns: True if the alert exists
+        """
+        return alert_id in self._active_alerts or \
+            alert_id in self._missed_alerts or \
+            alert_id in self._pending_alerts
+
     def get_user_alerts(self, user: str = _DEFAULT_USER) -> dict:
         """
         Get a sorted list of alerts for the requested user.
@@ -172,18 +404,89 @@ class AlertManager:
         :returns: dict of disposition to sorted alerts for all users
         """
         with self._read_lock:
-            missed = sort_alerts_list([alert for alert in
-                                       self._missed_alerts.values()])
-            active = sort_alerts_list([alert for alert in
-                                       self._active_alerts.values()])
-            pending = sort_alerts_list([alert for alert in
-                                        self._pending_alerts.values()])
+            missed = list(self._missed_alerts.values())
+            active = list(self._active_alerts.values())
+            pending = list(self._pending_alerts.values())
         return {
-            "missed": missed,
-            "active": active,
-            "pending": pending
+            "missed": sort_alerts_list(missed),
+            "active": sort_alerts_list(active),
+            "pending": sort_alerts_list(pending)
         }
 
+    def get_alerts_page(self, user: Optional[str] = None,
+                        disposition: str = "pending",
+                        alert_type: AlertType = AlertType.ALL,
+                        after: Optional[dt.datetime] = None,
+                        before: Optional[dt.datetime] = None,
+                        limit: Optional[int] = None,
+                        cursor: Optional[str] = None) -> \
+            Tuple[List[Alert], Optional[str]]:
+        """
+        Get one page of alerts matching the requested filters, ordered by
+        next expiration time.
+        :param user: Username to get alerts for (None for all users)
+        :param disposition: `pending`, `missed`, or `active`
+        :param alert_type: AlertType to include (AlertType.ALL for all)
+        :param after: only include alerts expiring at or after this time
+        :param before: only include alerts expiring before this time
+        :param limit: maximum number of alerts to return (None for no limit)
+        :param cursor: cursor returned with the previous page
+        :returns: list of alerts and a cursor for the next page (None if this
+            is the last page)
+        """
+        alerts = {"pending": self._pending_alerts,
+                  "missed": self._missed_alerts,
+                  "active": self._active_alerts}.get(disposition)
+        if alerts is None:
+            raise ValueError(f"Invalid disposition: {disposition}")
+        start = _decode_cursor(cursor) if cursor else None
+        if after and (not start or start[0] < after):
+            start = (after, "")
+        page = list()
+        next_cursor = None
+        with self._read_lock:
+            idents = self._user_index.get(user, set()) if user else None
+            for key, alert in alerts.iter_sorted(start):
+                if before and key[0] >= before:
+                    break
+                if (idents is not None and key[1] not in idents) or \
+                        alert_type not in (AlertType.ALL, alert.alert_type):
+                    continue
+                if limit and len(page) == limit:
+                    next_cursor = _encode_cursor(last_key)
+                    break
+                page.append(alert)
+                last_key = key
+        return page, next_cursor
+
+    @property
+    def version(self) -> int:
+        """
+        Return the version of the most recent change to managed alerts
+        """
+        return self._version
+
+    def get_changes(self, since: int, user: Optional[str] = None) -> \
+            Tuple[List[dict], int, bool]:
+        """
+        Get changes recorded after the specified version.
+        :param since: version the caller has already seen
+        :param user: Username to get changes for (None for all users)
+        :returns: list of change dicts in version order, the current version,
+            and True if changes after `since` are no longer retained and the
+            caller must reload all alerts
+        """
+        with self._read_lock:
+            version = self._version
+            if since > version or \
+                    (self._changes and since < self._changes[0]["version"] - 1) \
+                    or (not self._changes and since < version):
+                return [], version, True
+            changes = [change for change in self._changes
+                       if change["version"] > since and
+                       (not user or change["user"] == user)]
+        return changes, version, False
+
     # Alert Management
     def mark_alert_missed(self, alert_id: str):
         """
@@ -191,9 +494,11 @@ class AlertManager:
         :param alert_id: ident of active alert to mark as missed
         """
         try:
-            with self._read_lock:
-                self._missed_alerts[alert_id] = self._active_alerts.pop(alert_id)
+            with self._write_lock:
+                alert = self._active_alerts.pop(alert_id)
+                self._missed_alerts[alert_id] = alert
             self.dismiss_alert_from_gui(alert_id)
+            self._record_change("missed", alert, alert_id)
             self._dump_cache()
         except KeyError:
             LOG.error(f"{alert_id} is not active")
@@ -205,8 +510,10 @@ class AlertManager:
         :returns: active Alert that was dismissed (None if alert_id invalid)
         """
         try:
-            with self._read_lock:
+            with self._write_lock:
                 alert = self._active_alerts.pop(alert_id)
+                self._unindex_alert(alert, alert_id)
+            self._record_change("dismissed", alert, alert_id)
             return alert
         except KeyError:
             LOG.error(f"{alert_id} is not active")
@@ -220,11 +527,13 @@ class AlertManager:
         :returns: New Alert added to pending
         """
         alert = None
-        with self._read_lock:
+        with self._write_lock:
             if alert_id in self._active_alerts:
                 alert = self._active_alerts.pop(alert_id)
             elif alert_id in self._missed_alerts:
                 alert = self._missed_alerts.pop(alert_id)
+            if alert:
+                self._unindex_alert(alert, alert_id)
         if not alert:
             raise KeyError(f'No missed or active alert with ID: {alert_id}')
         assert isinstance(alert, Alert)
@@ -242,7 +551,7 @@ class AlertManager:
             alert_dict['context']['ident'] = f"snoozed_{get_alert_id(alert)}"
 
         new_alert = Alert.from_dict(alert_dict)
-        self.add_alert(new_alert)
+        self._add_alert(new_alert, "snoozed", alert_id)
         return new_alert
 
     def dismiss_missed_alert(self, alert_id: str) -> Alert:
@@ -252,9 +561,11 @@ class AlertManager:
         :returns: active Alert that was dismissed (None if alert_id invalid)
         """
         try:
-            with self._read_lock:
+            with self._write_lock:
                 alert = self._missed_alerts.pop(alert_id)
-                self.dismiss_alert_from_gui(alert_id)
+                self._unindex_alert(alert, alert_id)
+            self.dismiss_alert_from_gui(alert_id)
+            self._record_change("dismissed", alert, alert_id)
             self._dump_cache()
             return alert
         except KeyError:
@@ -265,9 +576,21 @@ class AlertManager:
         Add an alert to the scheduler and return the alert ID
         :returns: string identifier for the scheduled alert
         """
+        return self._add_alert(alert, "created")
+
+    def _add_alert(self, alert: Alert, change: str,
+                   replaces: Optional[str] = None) -> str:
+        """
+        Schedule an alert and record it in the change feed
+        :param alert: Alert to schedule
+        :param change: change type to record
+        :param replaces: ID of an alert this alert replaces
+        :returns: string identifier for the scheduled alert
+        """
         # TODO: Consider checking ident is unique
         ident = alert.context.get("ident") or str(uuid())
-        self._schedule_alert_expiration(alert, ident)
+        self._track_alert_expiration(alert, ident)
+        self._record_change(change, alert, ident, replaces)
         self._dump_cache()
         return ident
 
@@ -278,9 +601,12 @@ class AlertManager:
         """
         try:
             LOG.debug(f"Removing alert: {alert_id}")
-            with self._read_lock:
-                self._pending_alerts.pop(alert_id)
-                self.dismiss_alert_from_gui(alert_id)
+            with self._write_lock:
+                alert = self._pending_alerts.pop(alert_id)
+                self._deferred_alerts.discard(alert_id)
+                self._unindex_alert(alert, alert_id)
+            self.dismiss_alert_from_gui(alert_id)
+            self._record_change("removed", alert, alert_id)
         except KeyError:
             LOG.error(f"{alert_id} is not pending")
         self._dump_cache()
@@ -288,24 +614,36 @@ class AlertManager:
 
     def add_timer_to_gui(self, alert: Alert):
         """
-        Add a timer to the GUI.
+        Add a timer to the GUI. A timer without an ID is assigned one.
         :param alert: Timer to add to GUI
         """
-        if alert not in self._active_gui_timers:
-            self._active_gui_timers.append(alert)
-            self._active_gui_timers.sort(
-                key=lambda i: i.time_to_expiration.total_seconds())
+        if not get_alert_id(alert):
+            alert.add_context({"ident": str(uuid())})
+        ident = get_alert_id(alert)
+        expiration = dt.datetime.fromisoformat(
+            alert.data["next_expiration_time"]).timestamp()
+        start_time = alert.context.get("start_time")
+        start = dt.datetime.fromisoformat(start_time).timestamp() \
+            if start_time else None
+        with self._gui_lock:
+            if ident in self._gui_timers:
+                return
+            key = (expiration, next(self._gui_timer_seq), ident)
+            self._gui_timers[ident] = (key, alert, start)
+            insort(self._gui_timer_keys, key)
 
-    def dismiss_alert_from_gui(self, alert_id: str):
+    def dismiss_alert_from_gui(self, alert_id: str) -> bool:
         """
         Dismiss an alert from long-lived GUI displays.
+        :param alert_id: ID of the alert to dismiss
+        :returns: True if the alert was displayed
         """
-        # Active timers are a copy of the original, check by ID
-        for pending in self._active_gui_timers:
-            if get_alert_id(pending) == alert_id:
-                self._active_gui_timers.remove(pending)
-                return True
-        return False
+        with self._gui_lock:
+            if alert_id not in self._gui_timers:
+                return False
+            key = self._gui_timers.pop(alert_id)[0]
+            del self._gui_timer_keys[bisect_left(self._gui_timer_keys, key)]
+        return True
 
     def shutdown(self):
         """
@@ -317,13 +655,24 @@ class AlertManager:
             self._scheduler.cancel_scheduled_event(alert)
         for alert in self.pending_alerts:
             self._scheduler.cancel_scheduled_event(alert)
-        self._dump_cache()
+        with self._sweep_lock:
+            self._scheduler.cancel_scheduled_event(self._sweep_event_name)
+            self._next_sweep = None
+        self._write_cache()
+
+    def export_alerts(self) -> dict:
+        """
+        Get a JSON-serializable snapshot of missed and pending alerts in the
+        same format as the alerts cache.
+        :returns: dict cache data
+        """
+        return self._build_cache(lambda alert: alert.data)
 
     def write_cache_now(self):
         """
         Write the current state of the AlertManager to file cache
         """
-        self._dump_cache()
+        self._write_cache()
 
     # Alert Event Handlers
     def _schedule_alert_expiration(self, alrt: Alert, ident: str):
@@ -332,20 +681,121 @@ class AlertManager:
         :param alrt: Alert object to schedule
         :param ident: Unique identifier associated with the Alert
         """
+        from neon_utils.location_utils import to_system_time
         expire_time = alrt.next_expiration
         if not expire_time:
             raise ValueError(
                 f"Requested alert has no valid expiration: {ident}")
         alrt.add_context({"ident": ident})  # Ensure ident is correct in alert
-        with self._read_lock:
+        with self._write_lock:
             self._pending_alerts[ident] = alrt
+            self._index_alert(alrt, ident)
         data = alrt.data
-        context = data.get("context")
-        LOG.debug(f"Scheduling alert: {ident}")
+        # The scheduler adds session data to the context it is passed; copy it
+        # so that is not persisted with the alert
+        context = dict(data.get("context") or {})
         self._scheduler.schedule_event(self._handle_alert_expiration,
                                        to_system_time(expire_time),
                                        data, ident, context=context)
 
+    def _track_alert_expiration(self, alrt: Alert, ident: str):
+        """
+        Schedule an Alert if it expires within the schedule horizon, otherwise
+        defer it and make sure a sweep is scheduled to promote it.
+        :param alrt: Alert object to track
+        :param ident: Unique identifier associated with the Alert
+        """
+        if self._is_within_horizon(alrt):
+            LOG.debug(f"Scheduling alert: {ident}")
+            self._schedule_alert_expiration(alrt, ident)
+        else:
+            self._defer_alert_expiration(alrt, ident)
+            self._schedule_sweep(alrt)
+
+    def _defer_alert_expiration(self, alrt: Alert, ident: str):
+        """
+        Track a pending Alert without scheduling it. The alert is scheduled by
+        `_sweep_deferred_alerts` once it expires within the schedule horizon.
+        :param alrt: Alert object to defer
+        :param ident: Unique identifier associated with the Alert
+        """
+        expire_time = alrt.next_expiration
+        if not expire_time:
+            raise ValueError(
+                f"Requested alert has no valid expiration: {ident}")
+        alrt.add_context({"ident": ident})  # Ensure ident is correct in alert
+        with self._write_lock:
+            self._pending_alerts[ident] = alrt
+            self._deferred_alerts.add(ident)
+            self._index_alert(alrt, ident)
+
+    def _is_within_horizon(self, alrt: Alert) -> bool:
+        """
+        Check if an alert should be scheduled now.
+        :param alrt: Alert object to check
+        :returns: True if the alert expires within the schedule horizon
+        """
+        if self._schedule_horizon is None:
+            return True
+        expiration = alrt.next_expiration
+        if not expiration:
+            return True
+        return expiration - dt.datetime.now(expiration.tzinfo) <= \
+            self._schedule_horizon
+
+    def _schedule_sweep(self, deferred_alert: Optional[Alert] = None):
+        """
+        Schedule the next sweep of deferred alerts for when the earliest
+        deferred alert enters the schedule horizon.
+        :param deferred_alert: newly deferred Alert. If specified, the sweep is
+            only rescheduled if this alert enters the horizon before the next
+            scheduled sweep.
+        """
+        from neon_utils.location_utils import to_system_time
+        with self._sweep_lock:
+            if deferred_alert and self._next_sweep and \
+                    dt.datetime.fromisoformat(
+                        deferred_alert.data["next_expiration_time"]) - \
+                    self._schedule_horizon >= self._next_sweep:
+                return
+            with self._read_lock:
+                deferred = [self._pending_alerts[ident] for ident in
+                            self._deferred_alerts
+                            if ident in self._pending_alerts]
+            self._scheduler.cancel_scheduled_event(self._sweep_event_name)
+            self._next_sweep = None
+            if not deferred:
+                return
+            next_expiration = min(dt.datetime.fromisoformat(
+                alert.data["next_expiration_time"]) for alert in deferred)
+            self._next_sweep = next_expiration - self._schedule_horizon
+            LOG.debug(f"Next deferred alert sweep at {self._next_sweep}")
+            self._scheduler.schedule_event(self._sweep_deferred_alerts,
+                                           to_system_time(self._next_sweep),
+                                           name=self._sweep_event_name)
+
+    def _sweep_deferred_alerts(self, _=None):
+        """
+        Schedule any deferred alerts that now expire within the schedule
+        horizon and schedule the next sweep.
+        """
+        with self._read_lock:
+            deferred = {ident: self._pending_alerts.get(ident)
+                        for ident in self._deferred_alerts}
+        for ident, alert in deferred.items():
+            if not alert:
+                with self._write_lock:
+                    self._deferred_alerts.discard(ident)
+                continue
+            if self._is_within_horizon(alert):
+                with self._write_lock:
+                    self._deferred_alerts.discard(ident)
+                try:
+                    self._schedule_alert_expiration(alert, ident)
+                except ValueError as e:
+                    LOG.error(e)
+        self._schedule_sweep()
+
     def _handle_alert_expiration(self, message: Message):
         """
         Called upon expiration of an alert. Updates internal references, checks
@@ -354,63 +804,249 @@ class AlertManager:
         """
         alert = Alert.from_dict(message.data)
         ident = message.context.get("ident")
+        expiration = dt.datetime.fromisoformat(
+            alert.data["next_expiration_time"])
+        self._metrics.observe("neon_alerts_scheduler_lag_seconds",
+                              max((dt.datetime.now(expiration.tzinfo) -
+                                   expiration).total_seconds(), 0))
+        # Remote clients handle their own notifications, so remote alerts go
+        # straight from pending to dismissed
+        remote = bool(self._remote_callback and alert.context.get("mq"))
+        if not remote:
+            self._tracer.start(ident, expiration.timestamp()).mark("scheduler")
         try:
-            with self._read_lock:
+            with self._write_lock:
                 self._pending_alerts.pop(ident)
-                self._active_alerts[ident] = deepcopy(alert)
+                if remote:
+                    self._unindex_alert(alert, ident)
+                else:
+                    self._active_alerts[ident] = deepcopy(alert)
         except IndexError:
             LOG.error(f"Expired alert not pending: {ident}")
+        self._record_change("expired", alert, ident)
         if alert.next_expiration:
             LOG.info(f"Scheduling repeating alert: {alert}")
-            self._schedule_alert_expiration(alert, ident)
-        self._callback(alert)
+            self._track_alert_expiration(alert, ident)
+            self._record_change("rescheduled", alert, ident)
+        if remote:
+            self._remote_callback(alert)
+        else:
+            self._tracer.mark(ident, "expiration_handled")
+            self._callback(alert)
+
+    def _record_change(self, change: str, alrt: Alert, ident: str,
+                       replaces: Optional[str] = None):
+        """
+        Add a change to the change feed and notify `change_callback`. Each
+        change lists the dispositions the alert is in after the change.
+        :param change: type of change (created, rescheduled, expired, missed,
+            snoozed, dismissed, removed)
+        :param alrt: Alert that changed
+        :param ident: Unique identifier associated with the Alert
+        :param replaces: ID of an alert replaced by this change
+        """
+        alert_data = deepcopy(alrt.data) if \
+            change in ("created", "rescheduled", "snoozed") else None
+        with self._write_lock:
+            self._version += 1
+            # A repeating alert may be pending and active or missed at once
+            dispositions = [name for name, alerts in
+                            (("pending", self._pending_alerts),
+                             ("active", self._active_alerts),
+                             ("missed", self._missed_alerts))
+                            if ident in alerts]
+            record = {"version": self._version, "change": change,
+                      "ident": ident, "user": get_alert_user(alrt),
+                      "dispositions": dispositions}
+            if alert_data:
+                record["alert"] = alert_data
+            if replaces:
+                record["replaces"] = replaces
+            self._changes.append(record)
+        self._metrics.increment("neon_alerts_changes_total", change=change)
+        if self._change_callback:
+            try:
+                self._change_callback(record)
+            except Exception as e:
+                LOG.exception(e)
 
     # File Operations
     def _dump_cache(self):
+        """
+        Persist changed alerts, deferring to `cache_writer` if specified
+        """
+        if self._cache_writer:
+            self._cache_writer()
+        else:
+            self._write_cache()
+
+    def _write_cache(self):
         """
         Write current alerts to the cache on disk. Active alerts are not cached
         """
+        if self._cache_encoding == "msgpack":
+            def encode(alert):
+                return to_compact(alert, self._context_keys)
+        else:
+            def encode(alert):
+                return alert.data
+        with self._cache_lock, \
+                self._metrics.time("neon_alerts_dump_cache_seconds"):
+            self._alerts_store.update(self._build_cache(encode))
+            self._write_store()
+
+    def _build_cache(self, encode: callable) -> dict:
+        """
+        Build the cache document for missed and pending alerts. Alerts are
+        encoded after releasing `_read_lock`.
+        :param encode: method to encode each Alert as a cache record
+        :returns: dict cache data
+        """
         with self._read_lock:
-            missed_alerts = {ident: alert.serialize for
-                             ident, alert in self._missed_alerts.items()}
-            pending_alerts = {ident: alert.serialize for
-                              ident, alert in self._pending_alerts.items()}
-            self._alerts_store["missed"] = missed_alerts
-            self._alerts_store["pending"] = pending_alerts
-            self._alerts_store.store()
+            version = self._version
+            missed = list(self._missed_alerts.items())
+            pending = list(self._pending_alerts.items())
+        return {"version": CACHE_FORMAT_VERSION,
+                "change_version": version,
+                "missed": {ident: encode(alert) for ident, alert in missed},
+                "pending": {ident: encode(alert) for ident, alert in pending}}
+
+    def _write_store(self):
+        """
+        Write the alerts store to disk in the configured encoding and remove
+        any cache file written with a different encoding. This replaces
+        `JsonStorage.store`, which indents output and would inflate nested
+        alert records.
+        """
+        json_file = expanduser(self._alerts_store.path)
+        if self._cache_encoding == "msgpack":
+            path, stale_path = self._packed_file, json_file
+        else:
+            path, stale_path = json_file, self._packed_file
+        if dirname(path) and not isdir(dirname(path)):
+            makedirs(dirname(path))
+        with self._alerts_store.lock:
+            if self._cache_encoding == "msgpack":
+                with open(path, 'wb') as f:
+                    f.write(pack(dict(self._alerts_store)))
+            else:
+                with open(path, 'w', encoding="utf-8") as f:
+                    # `json.dumps` uses the C encoder; `json.dump` does not
+                    f.write(json.dumps(self._alerts_store, ensure_ascii=False,
+                                       separators=(',', ':')))
+            if isfile(stale_path):
+                remove(stale_path)
+
+    def _read_packed_store(self) -> bool:
+        """
+        Load a msgpack cache into the alerts store if one exists.
+        :returns: True if the cache on disk does not match `cache_encoding`
+        """
+        has_packed = isfile(self._packed_file)
+        if has_packed:
+            with open(self._packed_file, 'rb') as f:
+                data = unpack(f.read())
+            self._alerts_store.clear()
+            self._alerts_store.update(data)
+        return has_packed != (self._cache_encoding == "msgpack")
+
+    def _iter_cached_alerts(self, disposition: str):
+        """
+        Iterate over cached alerts one record at a time. Records may be
+        serialized strings, alert data dicts, or compact alert dicts.
+        :param disposition: cache key to read (`missed` or `pending`)
+        :returns: generator of (ident, Alert) tuples
+        """
+        with self._read_lock:
+            records = self._alerts_store.get(disposition) or dict()
+        for ident, record in records.items():
+            try:
+                if isinstance(record, str):
+                    alert = Alert.deserialize(record)
+                elif is_compact(record):
+                    alert = from_compact(record)
+                else:
+                    alert = Alert.from_dict(record)
+            except ValueError as e:
+                LOG.error(f"Skipping invalid cached alert {ident}: {e}")
+                continue
+            yield ident, alert
 
     def _load_cache(self):
         """
         Read alerts from cache on disk. Any loaded alerts will be overwritten.
+        Pending alerts expiring beyond the schedule horizon are deferred.
+        A cache written in an older format or another encoding is rewritten
+        after loading.
         """
-        # Load cached alerts into internal objects
         with self._read_lock:
-            missed = self._alerts_store.get("missed") or dict()
-            pending = self._alerts_store.get("pending") or dict()
+            cache_version = self._alerts_store.get("version") or 1
+            has_cache = bool(self._alerts_store.get("missed") or
+                             self._alerts_store.get("pending"))
 
         # Populate previously missed alerts
-        for ident, alert_json in missed.items():
-            alert = Alert.deserialize(alert_json)
-            with self._read_lock:
+        for ident, alert in self._iter_cached_alerts("missed"):
+            with self._write_lock:
                 self._missed_alerts[ident] = alert
+                self._index_alert(alert, ident)
 
-        # Populate previously pending alerts
-        for ident, alert_json in pending.items():
-            alert = Alert.deserialize(alert_json)
+        # Populate previously pending alerts. Alerts are logged in one summary
+        # since each log call inspects the stack.
+        scheduled = 0
+        for ident, alert in self._iter_cached_alerts("pending"):
             if alert.is_expired:  # Alert expired while shut down
-                with self._read_lock:
+                with self._write_lock:
                     self._missed_alerts[ident] = alert
+                    self._index_alert(alert, ident)
             try:
-                self._schedule_alert_expiration(alert, ident)
+                if self._is_within_horizon(alert):
+                    self._schedule_alert_expiration(alert, ident)
+                    scheduled += 1
+                else:
+                    self._defer_alert_expiration(alert, ident)
             except ValueError:
                 # Alert is expired with no valid repeat param
                 pass
             if alert.alert_type == AlertType.TIMER and \
                     get_alert_user(alert) == _DEFAULT_USER:
                 LOG.debug(f'Adding timer to GUI: {alert.alert_name}')
-                self._active_gui_timers.append(alert)
+                self.add_timer_to_gui(alert)
+        LOG.debug(f"Scheduled {scheduled} cached alerts and deferred "
+                  f"{len(self._deferred_alerts)} beyond the schedule horizon")
+        if self._deferred_alerts:
+            self._schedule_sweep()
+        if has_cache and (cache_version < CACHE_FORMAT_VERSION or
+                          self._encoding_changed):
+            LOG.info(f"Migrating alerts cache from version {cache_version} "
+                     f"to {self._cache_encoding}")
+            self._write_cache()
 
     # Data Operations
+    def _index_alert(self, alrt: Alert, ident: str):
+        """
+        Add an alert to the user index. Callers must hold `_write_lock`.
+        :param alrt: Alert object to index
+        :param ident: Unique identifier associated with the Alert
+        """
+        self._user_index.setdefault(get_alert_user(alrt), set()).add(ident)
+
+    def _unindex_alert(self, alrt: Alert, ident: str):
+        """
+        Remove an alert from the user index if it is no longer missed, active,
+        or pending. Callers must hold `_write_lock`.
+        :param alrt: Alert object to remove
+        :param ident: Unique identifier associated with the Alert
+        """
+        if ident in self._pending_alerts or ident in self._missed_alerts or \
+                ident in self._active_alerts:
+            return
+        user = get_alert_user(alrt)
+        idents = self._user_index.get(user)
+        if idents is not None:
+            idents.discard(ident)
+            if not idents:
+                self._user_index.pop(user)
+
     def _get_user_alerts(self, user: str = _DEFAULT_USER) -> tuple:
         """
         Get all alerts for the specified user.
@@ -418,10 +1054,11 @@ class AlertManager:
         :returns: unsorted lists of missed, active, pending alerts
         """
         with self._read_lock:
-            user_missed = [alert for alert in self._missed_alerts.values() if
-                           get_alert_user(alert) == user]
-            user_active = [alert for alert in self._active_alerts.values() if
-                           get_alert_user(alert) == user]
-            user_pending = [alert for alert in self._pending_alerts.values() if
-                            get_alert_user(alert) == user]
+            idents = self._user_index.get(user, ())
+            user_missed = [self._missed_alerts[ident] for ident in idents
+                           if ident in self._missed_alerts]
+            user_active = [self._active_alerts[ident] for ident in idents
+                           if ident in self._active_alerts]
+            user_pending = [self._pending_alerts[ident] for ident in idents
+                            if ident in self._pending_alerts]
         return user_missed, user_active, user_pending
@@ -0,0 +1,279 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, List, Optional, Tuple, TYPE_CHECKING
+
+from neon_utils.logger import LOG
+
+from . import AlertState
+from .alert import Alert
+from .alert_manager import AlertManager, _DEFAULT_USER
+
+if TYPE_CHECKING:
+    from ovos_utils.events import EventSchedulerInterface
+
+
+class AsyncAlertManager:
+    """
+    Awaitable interface to an AlertManager for asyncio-based hosts. Alert
+    operations run directly on the event loop; AlertManager only holds its
+    locks for in-memory updates, so they are never held across I/O. Cache
+    writes are coalesced and run on a single writer thread. Use `create` to
+    construct an instance from a coroutine so the cache is loaded off the
+    event loop.
+    """
+
+    def __init__(self, alerts_file: str,
+                 event_scheduler: EventSchedulerInterface,
+                 alert_callback: Callable[[Alert], Awaitable],
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 remote_callback: Optional[Callable[[Alert],
+                                                    Awaitable]] = None,
+                 **kwargs):
+        """
+        :param alerts_file: path to the file used to persist alerts
+        :param event_scheduler: EventSchedulerInterface to schedule alerts with
+        :param alert_callback: coroutine function to await with each expired
+            Alert
+        :param loop: event loop to run callbacks and writes on (default the
+            running loop). Required if not called from the event loop.
+        :param remote_callback: optional coroutine function to await with each
+            expired Alert from a remote client
+        :param kwargs: additional keyword arguments passed to `AlertManager`
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        self._alert_callback = alert_callback
+        self._remote_callback = remote_callback
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="alert_cache")
+        self._write_task: Optional[asyncio.Task] = None
+        self._write_requested = False
+        self._closing = False
+        self._manager = AlertManager(
+            alerts_file, event_scheduler,
+            lambda alert: self._run_callback(self._alert_callback, alert),
+            remote_callback=(lambda alert: self._run_callback(
+                self._remote_callback, alert)) if remote_callback else None,
+            cache_writer=self._request_write, **kwargs)
+
+    @classmethod
+    async def create(cls, alerts_file: str,
+                     event_scheduler: EventSchedulerInterface,
+                     alert_callback: Callable[[Alert], Awaitable],
+                     **kwargs) -> AsyncAlertManager:
+        """
+        Create an AsyncAlertManager for the running loop, loading cached alerts
+        in an executor. Accepts the same arguments as `AsyncAlertManager`.
+        :returns: AsyncAlertManager with cached alerts loaded
+        """
+        loop = asyncio.get_running_loop()
+        kwargs.setdefault("loop", loop)
+        return await loop.run_in_executor(None, partial(
+            cls, alerts_file, event_scheduler, alert_callback, **kwargs))
+
+    @property
+    def manager(self) -> AlertManager:
+        """
+        Returns the AlertManager sharing storage and scheduling with this
+        interface
+        """
+        return self._manager
+
+    async def add_alert(self, alert: Alert) -> str:
+        """
+        Add an alert to the scheduler and return the alert ID
+        :returns: string identifier for the scheduled alert
+        """
+        return self._manager.add_alert(alert)
+
+    async def rm_alert(self, alert_id: str):
+        """
+        Remove a pending alert
+        :param alert_id: ident of pending alert to remove
+        """
+        self._manager.rm_alert(alert_id)
+
+    async def snooze_alert(self, alert_id: str,
+                           snooze_duration: dt.timedelta) -> Alert:
+        """
+        Snooze an active or missed alert for some period of time.
+        :param alert_id: ID of active or missed alert to reschedule
+        :param snooze_duration: time until next notification
+        :returns: New Alert added to pending
+        """
+        return self._manager.snooze_alert(alert_id, snooze_duration)
+
+    async def mark_alert_missed(self, alert_id: str):
+        """
+        Mark an active alert as missed
+        :param alert_id: ident of active alert to mark as missed
+        """
+        self._manager.mark_alert_missed(alert_id)
+
+    async def dismiss_active_alert(self, alert_id: str) -> Alert:
+        """
+        Dismiss an active alert
+        :param alert_id: ident of active alert to dismiss
+        :returns: active Alert that was dismissed (None if alert_id invalid)
+        """
+        return self._manager.dismiss_active_alert(alert_id)
+
+    async def dismiss_missed_alert(self, alert_id: str) -> Alert:
+        """
+        Dismiss a missed alert
+        :param alert_id: ident of missed alert to dismiss
+        :returns: missed Alert that was dismissed (None if alert_id invalid)
+        """
+        return self._manager.dismiss_missed_alert(alert_id)
+
+    async def get_alert_status(self, alert_id: str) -> Optional[AlertState]:
+        """
+        Get the current state of an alert
+        :param alert_id: ID of alert to check
+        :returns: AlertState of the alert, or None if not found
+        """
+        return self._manager.get_alert_status(alert_id)
+
+    async def get_user_alerts(self, user: str = _DEFAULT_USER) -> dict:
+        """
+        Get a sorted list of alerts for the requested user.
+        :param user: Username to retrieve alerts for
+        :returns: dict of disposition to sorted alerts for the specified user
+        """
+        return self._manager.get_user_alerts(user)
+
+    async def get_alerts_page(self, **kwargs) -> Tuple[List[Alert],
+                                                        Optional[str]]:
+        """
+        Get a page of alerts. Accepts the same keyword arguments as
+        `AlertManager.get_alerts_page`.
+        :returns: list of alerts and a cursor for the next page, if any
+        """
+        return self._manager.get_alerts_page(**kwargs)
+
+    async def get_changes(self, since: int, user: Optional[str] = None) -> \
+            Tuple[List[dict], int, bool]:
+        """
+        Get changes recorded after the specified version.
+        :param since: version the caller has already seen
+        :param user: Username to get changes for (None for all users)
+        :returns: list of change dicts in version order, the current version,
+            and True if changes after `since` are no longer retained and the
+            caller must reload all alerts
+        """
+        return self._manager.get_changes(since, user)
+
+    async def flush(self):
+        """
+        Wait for pending changes to be written to the cache
+        """
+        while self._write_task and not self._write_task.done():
+            await asyncio.shield(self._write_task)
+
+    async def shutdown(self):
+        """
+        Shutdown the AlertManager and write the alerts cache once pending
+        writes have finished.
+        """
+        await self.flush()
+        # `AlertManager.shutdown` writes the cache after its last change, so
+        # writes requested while it runs are not needed
+        self._closing = True
+        await self._loop.run_in_executor(self._executor,
+                                         self._manager.shutdown)
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _run_callback(self, callback: Callable[[Alert], Awaitable],
+                      alert: Alert):
+        """
+        Schedule an async callback on the event loop from the scheduler thread
+        :param callback: coroutine function to call
+        :param alert: expired Alert to pass to `callback`
+        """
+        try:
+            future = asyncio.run_coroutine_threadsafe(callback(alert),
+                                                      self._loop)
+        except RuntimeError as e:
+            LOG.error(f"Unable to handle expired alert: {e}")
+            return
+        future.add_done_callback(self._log_callback_error)
+
+    @staticmethod
+    def _log_callback_error(future):
+        """
+        Log an exception raised by an expiration callback
+        :param future: completed callback future
+        """
+        if not future.cancelled() and future.exception():
+            LOG.error(f"Expiration callback failed: {future.exception()}")
+
+    def _request_write(self):
+        """
+        Request a cache write after a change. May be called from any thread.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._schedule_write()
+        else:
+            self._loop.call_soon_threadsafe(self._schedule_write)
+
+    def _schedule_write(self):
+        """
+        Start a cache write, or mark a write in progress as outdated so it is
+        repeated once with all changes made in the meantime.
+        """
+        if self._closing:
+            return
+        if self._write_task and not self._write_task.done():
+            self._write_requested = True
+            return
+        self._write_task = self._loop.create_task(self._write_cache())
+
+    async def _write_cache(self):
+        """
+        Write the cache on the writer thread until no writes are outstanding
+        """
+        self._write_requested = True
+        while self._write_requested:
+            self._write_requested = False
+            try:
+                await self._loop.run_in_executor(
+                    self._executor, self._manager.write_cache_now)
+            except Exception as e:
+                LOG.exception(e)
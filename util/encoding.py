@@ -0,0 +1,122 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import datetime as dt
+
+from typing import Dict, Iterable, Optional
+
+from .alert import Alert
+
+# Message context keys kept in alerts by default; other keys (session,
+# timing, etc.) are dropped unless explicitly requested
+ALERT_CONTEXT_KEYS = ("user", "username", "ident", "origin_ident", "created",
+                      "start_time", "mq", "klat_data", "source",
+                      "destination", "client", "client_name",
+                      "user_profiles", "nick_profiles")
+
+
+def _to_epoch(timestamp: Optional[str]) -> Optional[int]:
+    if not timestamp:
+        return None
+    return int(dt.datetime.fromisoformat(timestamp).timestamp())
+
+
+def _from_epoch(epoch: Optional[int], tz: dt.tzinfo) -> Optional[str]:
+    if epoch is None:
+        return None
+    return dt.datetime.fromtimestamp(epoch, tz).isoformat()
+
+
+def to_compact(alert: Alert,
+               context_keys: Optional[Iterable[str]] = ALERT_CONTEXT_KEYS
+               ) -> dict:
+    """
+    Build a compact representation of an alert with epoch timestamps, only
+    the requested context keys, and no null values.
+    :param alert: Alert to encode
+    :param context_keys: context keys to keep in the compact record (None to
+        keep the full context)
+    :returns: dict compact alert data
+    """
+    data = alert.data
+    expiration = dt.datetime.fromisoformat(data["next_expiration_time"])
+    compact = {**data,
+               "next_expiration_time": int(expiration.timestamp()),
+               "utc_offset": int(expiration.utcoffset().total_seconds()),
+               "end_repeat": _to_epoch(data.get("end_repeat")),
+               "context": {key: val for key, val in alert.context.items()
+                           if context_keys is None or key in context_keys}}
+    return {key: val for key, val in compact.items()
+            if val is not None}
+
+
+def from_compact(compact: dict) -> Alert:
+    """
+    Parse a compact alert record into an Alert object
+    :param compact: dict as returned by `to_compact`
+    :returns: Alert object
+    """
+    data = dict(compact)
+    tz = dt.timezone(dt.timedelta(seconds=data.pop("utc_offset", 0)))
+    data["next_expiration_time"] = _from_epoch(data["next_expiration_time"],
+                                               tz)
+    data["end_repeat"] = _from_epoch(data.get("end_repeat"), tz)
+    for key in ("repeat_frequency", "repeat_days", "alert_name",
+                "audio_file", "script_filename"):
+        data.setdefault(key, None)
+    data.setdefault("context", dict())
+    return Alert.from_dict(data)
+
+
+def is_compact(record: dict) -> bool:
+    """
+    Check if an alert record was built by `to_compact`
+    :param record: dict alert record
+    :returns: True if the record has an epoch expiration time
+    """
+    return isinstance(record.get("next_expiration_time"), int)
+
+
+def pack(data: Dict[str, dict]) -> bytes:
+    """
+    Encode a dict of compact alert records with msgpack
+    :param data: dict to encode
+    :returns: msgpack bytes
+    """
+    import msgpack
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def unpack(data: bytes) -> dict:
+    """
+    Decode bytes returned by `pack`
+    :param data: msgpack bytes
+    :returns: decoded dict
+    """
+    import msgpack
+    return msgpack.unpackb(data, raw=False)
@@ -0,0 +1,116 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from threading import Condition, Lock
+
+
+class _LockView:
+    """
+    One side of a ReadWriteLock with the interface of a `threading.Lock`.
+    """
+
+    def __init__(self, acquire: callable, release: callable):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class ReadWriteLock:
+    """
+    Lock that may be held by any number of readers or by one writer. New
+    readers wait while a writer is waiting so writers are not starved. Neither
+    side is reentrant.
+    """
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        self.reader = _LockView(self._acquire_read, self._release_read)
+        self.writer = _LockView(self._acquire_write, self._release_write)
+
+    def _wait(self, predicate: callable, blocking: bool,
+              timeout: float) -> bool:
+        """
+        Wait for a condition. Callers must hold `_condition`.
+        :param predicate: method returning True once the lock may be acquired
+        :param blocking: if False, return immediately
+        :param timeout: maximum seconds to wait (-1 to wait indefinitely)
+        :returns: True if `predicate` was satisfied
+        """
+        if not blocking:
+            return predicate()
+        return self._condition.wait_for(predicate,
+                                        None if timeout < 0 else timeout)
+
+    def _acquire_read(self, blocking: bool = True,
+                      timeout: float = -1) -> bool:
+        with self._condition:
+            if not self._wait(lambda: not self._writing and
+                              not self._writers_waiting, blocking, timeout):
+                return False
+            self._readers += 1
+            return True
+
+    def _release_read(self):
+        with self._condition:
+            if not self._readers:
+                raise RuntimeError("Read lock is not held")
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def _acquire_write(self, blocking: bool = True,
+                       timeout: float = -1) -> bool:
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                acquired = self._wait(lambda: not self._writing and
+                                      not self._readers, blocking, timeout)
+            finally:
+                self._writers_waiting -= 1
+            if acquired:
+                self._writing = True
+            elif not self._writers_waiting:
+                # Readers waiting on this writer may proceed
+                self._condition.notify_all()
+            return acquired
+
+    def _release_write(self):
+        with self._condition:
+            if not self._writing:
+                raise RuntimeError("Write lock is not held")
+            self._writing = False
+            self._condition.notify_all()
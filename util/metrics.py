@@ -0,0 +1,224 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic
+from typing import Dict, Tuple
+
+# Upper bounds of histogram buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0)
+
+
+def _format_key(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Format a metric name and labels as a Prometheus series name
+    :param name: metric name
+    :param labels: sorted tuple of label name/value pairs
+    :returns: string series name, i.e. `name{label="value"}`
+    """
+    if not labels:
+        return name
+    label_str = ','.join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{label_str}}}"
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: sorted upper bounds of histogram buckets
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Add a value to the histogram
+        :param value: value to add
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get the current state of the histogram
+        :returns: dict with cumulative `buckets` keyed by upper bound, `count`,
+            and `sum`
+        """
+        buckets = dict()
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            buckets[str(bound)] = total
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters and histograms.
+    """
+
+    def __init__(self):
+        self._counters: Dict[tuple, float] = dict()
+        self._histograms: Dict[tuple, Histogram] = dict()
+        self._lock = Lock()
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """
+        Increment a counter
+        :param name: counter name
+        :param value: amount to increment the counter by
+        :param labels: optional labels identifying the counter series
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Add a value to a histogram
+        :param name: histogram name
+        :param value: value to add
+        :param labels: optional labels identifying the histogram series
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """
+        Context manager adding the elapsed seconds to a histogram
+        :param name: histogram name
+        :param labels: optional labels identifying the histogram series
+        """
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, monotonic() - start, **labels)
+
+    def snapshot(self) -> dict:
+        """
+        Get the current value of all metrics
+        :returns: dict of `counters` and `histograms`, each keyed by series
+            name
+        """
+        with self._lock:
+            return {"counters": {_format_key(*key): value for key, value
+                                 in self._counters.items()},
+                    "histograms": {_format_key(*key): hist.snapshot() for
+                                   key, hist in self._histograms.items()}}
+
+    def to_prometheus(self) -> str:
+        """
+        Format all metrics in the Prometheus text exposition format
+        :returns: string metrics
+        """
+        lines = list()
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, hist.snapshot()) for key, hist
+                                in self._histograms.items())
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                lines.append(f"# TYPE {name} counter")
+                last_name = name
+            lines.append(f"{_format_key(name, labels)} {value}")
+        for (name, labels), hist in histograms:
+            if name != last_name:
+                lines.append(f"# TYPE {name} histogram")
+                last_name = name
+            for bound, count in hist["buckets"].items():
+                bucket_labels = (*labels, ("le", bound))
+                lines.append(f"{_format_key(f'{name}_bucket', bucket_labels)}"
+                             f" {count}")
+            lines.append(f"{_format_key(f'{name}_sum', labels)} {hist['sum']}")
+            lines.append(f"{_format_key(f'{name}_count', labels)} "
+                         f"{hist['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """
+        Write metrics in the Prometheus text exposition format, replacing any
+        existing file at `path`
+        :param path: file to write
+        """
+        path = os.path.expanduser(path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+class TimedLock:
+    """
+    Wraps a lock to record the time spent waiting to acquire it.
+    """
+
+    def __init__(self, lock, metrics: Metrics, name: str, **labels):
+        """
+        :param lock: lock to wrap
+        :param metrics: Metrics to record wait times in
+        :param name: name of the histogram to record wait times in
+        :param labels: labels of the histogram to record wait times in
+        """
+        self._lock = lock
+        self._metrics = metrics
+        self._name = name
+        self._labels = labels
+
+    def acquire(self, *args, **kwargs) -> bool:
+        start = monotonic()
+        acquired = self._lock.acquire(*args, **kwargs)
+        self._metrics.observe(self._name, monotonic() - start, **self._labels)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
@@ -25,27 +25,40 @@
 # LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+from __future__ import annotations
+
 import datetime as dt
 import os.path
 
 from time import time
 from uuid import uuid4 as uuid
-from typing import Optional, List, Union
-from lingua_franca import load_language
+from typing import Optional, Iterable, List, Union, TYPE_CHECKING
 from neon_utils.logger import LOG
-from ovos_bus_client import Message, MessageBusClient
-
-from mycroft.util.format import TimeResolution, nice_duration, nice_time
-from mycroft.util.parse import extract_datetime, extract_duration, normalize
 
 from . import AlertPriority, Weekdays, AlertType
 from .alert import Alert
 from .alert_manager import _DEFAULT_USER
+from .encoding import ALERT_CONTEXT_KEYS
+
+# Parsing and bus dependencies are only needed when an intent is handled, so
+# they are imported on first use to keep `skill_alerts.util` cheap to load
+if TYPE_CHECKING:
+    from ovos_bus_client import Message, MessageBusClient
 
 _SCRIPT_PRIORITY = AlertPriority.HIGHEST
 _default_lang = "en-US"
 
 
+def load_language(lang: str):
+    """
+    Load the requested lingua_franca language, importing lingua_franca on the
+    first call.
+    :param lang: language code to load
+    """
+    from lingua_franca import load_language as _load_language
+    _load_language(lang)
+
+
 def _default_find_resource(res_name, _=None, lang=None):
     # TODO: Refactor on skill resources object as a singleton
     LOG.warning("find_resource method not defined, using fallback")
@@ -94,6 +107,7 @@ def spoken_time_remaining(alert_time: dt.datetime,
     :param lang: Language to format response in
     :return: speakable duration string
     """
+    from mycroft.util.format import TimeResolution, nice_duration
     load_language(lang or _default_lang)
     now_time = now_time or dt.datetime.now(dt.timezone.utc)
     remaining_time: dt.timedelta = alert_time - now_time
@@ -129,6 +143,7 @@ def get_default_alert_name(alert_time: dt.datetime, alert_type: AlertType,
     if alert_type == AlertType.TIMER:
         time_str = spoken_time_remaining(alert_time, now_time, lang)
     else:
+        from mycroft.util.format import nice_time
         load_language(lang)
         time_str = nice_time(alert_time, lang, False, use_24hour, True)
     return f"{time_str} {spoken_alert_type(alert_type)}"
@@ -137,8 +152,9 @@ def get_default_alert_name(alert_time: dt.datetime, alert_type: AlertType,
 def build_alert_from_intent(message: Message, alert_type: AlertType,
                             timezone: dt.tzinfo, use_24hour: bool = False,
                             get_spoken_alert_type: callable = _default_spoken,
-                            find_resource: callable = _default_find_resource) \
-        -> Optional[Alert]:
+                            find_resource: callable = _default_find_resource,
+                            context_keys: Optional[Iterable[str]] =
+                            ALERT_CONTEXT_KEYS) -> Optional[Alert]:
     """
     Parse alert parameters from a matched intent into an Alert object
     :param message: Message associated with request
@@ -147,6 +163,7 @@ def build_alert_from_intent(message: Message, alert_type: AlertType,
     :param use_24hour: Use 24 hour time format if True, else 12 hour
     :param get_spoken_alert_type: optional method to get translated alert types
     :param find_resource: skill.find_resource method to resolve resource files
+    :param context_keys: message context keys to keep (None to keep all)
     :returns: Alert extracted from utterance or None if missing required params
     """
     tokens = tokenize_utterance(message)
@@ -195,7 +212,7 @@ def build_alert_from_intent(message: Message, alert_type: AlertType,
     else:
         LOG.warning(f"No articles.voc found for lang={lang}")
         articles = list()
-    alert_context = parse_alert_context_from_message(message)
+    alert_context = parse_alert_context_from_message(message, context_keys)
     alert_context['start_time'] = anchor_time.isoformat()
     alert_name = parse_alert_name_from_message(message, tokens, True,
                                                articles) or \
@@ -255,6 +272,7 @@ def parse_repeat_from_message(message: Message,
     :param tokens: optional tokens parsed from message by `tokenize_utterances`
     :returns: list of parsed repeat Weekdays or timedelta between occurrences
     """
+    from mycroft.util.parse import extract_datetime, extract_duration
     repeat_days = list()
     lang = message.data.get("lang", "en-us")
     load_language(lang)
@@ -328,6 +346,7 @@ def parse_end_condition_from_message(message: Message,
     anchor_date = dt.datetime.now(timezone)
 
     if message.data.get("until"):
+        from mycroft.util.parse import extract_datetime, extract_duration
         lang = message.data.get("lang") or "en-us"
         load_language(lang)
         idx = tokens.index(message.data["until"]) + 1
@@ -365,6 +384,7 @@ def parse_alert_time_from_message(message: Message,
     :param timezone: timezone of request, defaults to utc
     :returns: Parsed datetime for the alert or None if no time is extracted
     """
+    from mycroft.util.parse import extract_datetime, extract_duration
     anchor_time = anchor_time or dt.datetime.now(timezone)
     tokens = tokens or tokenize_utterance(message)
     remainder_tokens = get_unmatched_tokens(message, tokens)
@@ -413,10 +433,12 @@ def parse_script_file_from_message(message: Message,
     :param tokens: optional tokens parsed from message by `tokenize_utterances`
     :returns: validated script filename, else None
     """
-    bus = bus or MessageBusClient()
-    if not bus.started_running:
-        bus.run_in_thread()
     if message.data.get("script"):
+        # Only connect to the bus when there is a script to validate
+        from ovos_bus_client import Message, MessageBusClient
+        bus = bus or MessageBusClient()
+        if not bus.started_running:
+            bus.run_in_thread()
         # TODO: Validate/test this DM
         # check if CC can access the required script and get its valid name
         resp = bus.wait_for_response(Message("neon.script_exists",
@@ -463,6 +485,9 @@ def parse_alert_name_from_message(message: Message,
     :param articles: list of words to strip from a candidate alert name
     :returns: Best guess at a name extracted from tokens
     """
+    from mycroft.util.parse import extract_datetime, extract_duration, \
+        normalize
+
     def _strip_datetime_from_token(t):
         try:
             _, t = extract_duration(t, lang)
@@ -506,10 +531,13 @@ def parse_alert_name_from_message(message: Message,
     return candidate_names[0]
 
 
-def parse_alert_context_from_message(message: Message) -> dict:
+def parse_alert_context_from_message(message: Message,
+                                     context_keys: Optional[Iterable[str]] =
+                                     ALERT_CONTEXT_KEYS) -> dict:
     """
     Parse the request message context and ensure required parameters exist
     :param message: Message associated with the request
+    :param context_keys: message context keys to keep (None to keep all)
     :returns: dict context to include in Alert object
     """
     required_context = {
@@ -519,4 +547,9 @@ def parse_alert_context_from_message(message: Message) -> dict:
         "created": message.context.get("timing",
                                        {}).get("handle_utterance") or time()
     }
-    return {**message.context, **required_context}
+    if context_keys is None:
+        context = message.context
+    else:
+        context = {key: val for key, val in message.context.items()
+                   if key in context_keys}
+    return {**context, **required_context}
@@ -0,0 +1,243 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import subprocess
+import wave
+
+from collections import OrderedDict
+from shutil import which
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from neon_utils.logger import LOG
+
+# Bytes written to the player per write
+_CHUNK_SIZE = 8192
+# Default maximum bytes of decoded audio kept in a SoundCache
+_DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Sample width in bytes to `paplay` and `aplay` sample format names
+_PAPLAY_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+_APLAY_FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+
+
+class DecodedSound(NamedTuple):
+    """
+    Raw PCM audio decoded from a sound file.
+    """
+    frames: bytes
+    rate: int
+    channels: int
+    sample_width: int
+
+
+def decode_sound(path: str) -> Optional[DecodedSound]:
+    """
+    Decode a sound file into raw PCM audio. Only PCM WAV files are supported.
+    :param path: path to the sound file
+    :returns: DecodedSound or None if the file could not be decoded
+    """
+    try:
+        with wave.open(path, 'rb') as f:
+            return DecodedSound(f.readframes(f.getnframes()),
+                                f.getframerate(), f.getnchannels(),
+                                f.getsampwidth())
+    except (OSError, EOFError, wave.Error) as e:
+        LOG.debug(f"Unable to decode {path}: {e}")
+        return None
+
+
+def get_player_command(sound: DecodedSound) -> Optional[List[str]]:
+    """
+    Get a command that plays raw PCM audio from stdin
+    :param sound: DecodedSound to be played
+    :returns: list command args or None if no supported player is installed
+    """
+    if which("paplay") and sound.sample_width in _PAPLAY_FORMATS:
+        return ["paplay", "--raw", f"--rate={sound.rate}",
+                f"--channels={sound.channels}",
+                f"--format={_PAPLAY_FORMATS[sound.sample_width]}"]
+    if which("aplay") and sound.sample_width in _APLAY_FORMATS:
+        return ["aplay", "-q", "-t", "raw", "-r", str(sound.rate),
+                "-c", str(sound.channels),
+                "-f", _APLAY_FORMATS[sound.sample_width]]
+    return None
+
+
+class SoundCache:
+    """
+    Bounded cache of decoded sounds keyed by file path. The least recently
+    used sounds are removed when the cache exceeds its size limit.
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_CACHE_BYTES):
+        """
+        :param max_bytes: maximum bytes of decoded audio to keep
+        """
+        self._max_bytes = max_bytes
+        self._sounds: Dict[str, DecodedSound] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes of decoded audio currently cached
+        """
+        return self._size
+
+    def get(self, path: str) -> Optional[DecodedSound]:
+        """
+        Get a decoded sound, decoding and caching it if not already cached
+        :param path: path to the sound file
+        :returns: DecodedSound or None if the file could not be decoded
+        """
+        with self._lock:
+            sound = self._sounds.get(path)
+            if sound:
+                self._sounds.move_to_end(path)
+                return sound
+        sound = decode_sound(path)
+        if not sound or len(sound.frames) > self._max_bytes:
+            return sound
+        with self._lock:
+            if path not in self._sounds:
+                self._sounds[path] = sound
+                self._size += len(sound.frames)
+            while self._size > self._max_bytes:
+                _, removed = self._sounds.popitem(last=False)
+                self._size -= len(removed.frames)
+        return sound
+
+    def preload(self, paths: Iterable[str]):
+        """
+        Decode and cache sounds before they are needed
+        :param paths: paths to sound files to cache
+        """
+        for path in paths:
+            if not self.get(path):
+                LOG.warning(f"Unable to preload sound: {path}")
+
+    def clear(self):
+        """
+        Remove all cached sounds
+        """
+        with self._lock:
+            self._sounds.clear()
+            self._size = 0
+
+
+class LoopingPlayer:
+    """
+    Plays decoded audio in a loop through a single player process until
+    stopped.
+    """
+
+    def __init__(self, sound: DecodedSound, command: List[str]):
+        """
+        :param sound: DecodedSound to play
+        :param command: player command reading raw audio from stdin
+        """
+        self._sound = sound
+        self._command = command
+        self._process = None
+        self._thread = None
+        self._stopped = Event()
+
+    @classmethod
+    def from_file(cls, path: str, cache: Optional[SoundCache] = None) -> \
+            Optional['LoopingPlayer']:
+        """
+        Create a player for a sound file
+        :param path: path to the sound file
+        :param cache: optional SoundCache to get the decoded sound from
+        :returns: LoopingPlayer or None if the file can't be looped
+        """
+        sound = cache.get(path) if cache else decode_sound(path)
+        if not sound or not sound.frames:
+            return None
+        command = get_player_command(sound)
+        if not command:
+            LOG.debug("No raw audio player available")
+            return None
+        return cls(sound, command)
+
+    @property
+    def is_playing(self) -> bool:
+        return self._process is not None and not self._stopped.is_set()
+
+    def start(self):
+        """
+        Start playback in a background thread
+        """
+        self._stopped.clear()
+        self._process = subprocess.Popen(self._command,
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL,
+                                         stderr=subprocess.DEVNULL)
+        self._thread = Thread(target=self._write_audio, daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for playback to stop
+        :param timeout: maximum seconds to wait
+        :returns: True if playback stopped
+        """
+        return self._stopped.wait(timeout)
+
+    def stop(self):
+        """
+        Stop playback immediately
+        """
+        self._stopped.set()
+        if self._process and self._process.poll() is None:
+            self._process.kill()
+        if self._thread:
+            self._thread.join()
+
+    def _write_audio(self):
+        """
+        Write audio to the player until stopped or the player exits
+        """
+        frames = memoryview(self._sound.frames)
+        try:
+            while not self._stopped.is_set():
+                for i in range(0, len(frames), _CHUNK_SIZE):
+                    if self._stopped.is_set():
+                        break
+                    self._process.stdin.write(frames[i:i + _CHUNK_SIZE])
+        except (BrokenPipeError, ValueError, OSError) as e:
+            if not self._stopped.is_set():
+                LOG.error(f"Player exited: {e}")
+        finally:
+            self._stopped.set()
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
@@ -0,0 +1,525 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import sqlite3
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from os import makedirs, remove, replace
+from os.path import dirname, expanduser, isdir, isfile, join
+from tempfile import mkstemp
+from time import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from uuid import uuid4 as uuid
+from zlib import crc32
+from neon_utils.logger import LOG
+from combo_lock import ComboLock
+
+from .alert import Alert
+from .alert_manager import AlertManager, get_alert_user, \
+    _DEFAULT_SCHEDULE_HORIZON
+
+if TYPE_CHECKING:
+    from ovos_utils.events import EventSchedulerInterface
+
+_REFRESH_EVENT_NAME = "alert_shard_refresh"
+
+
+def get_shard(user: str, num_shards: int) -> int:
+    """
+    Get the shard alerts for the specified user are stored in. Shards are
+    stable across processes and restarts.
+    :param user: username to get a shard for
+    :param num_shards: total number of shards
+    :returns: int shard index
+    """
+    return crc32(user.encode("utf-8")) % num_shards
+
+
+def _write_json(path: str, data: dict):
+    """
+    Atomically write a JSON file so readers never see a partial document.
+    :param path: file to write
+    :param data: dict to write
+    """
+    fd, tmp_path = mkstemp(dir=dirname(path) or None, suffix=".tmp")
+    try:
+        with open(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        replace(tmp_path, path)
+    except BaseException:
+        remove(tmp_path)
+        raise
+
+
+class ShardStore(ABC):
+    """
+    Storage shared by all nodes running a `ShardedAlertManager`. A store holds
+    a lease, a snapshot of cached alerts, and a queue of operations submitted
+    by other nodes for each shard.
+    """
+
+    @abstractmethod
+    def acquire_lease(self, shard: int, node_id: str, ttl: float) -> bool:
+        """
+        Acquire or renew the lease on a shard.
+        :param shard: shard index
+        :param node_id: node requesting the lease
+        :param ttl: seconds until the lease expires if not renewed
+        :returns: True if `node_id` owns the shard
+        """
+
+    @abstractmethod
+    def release_lease(self, shard: int, node_id: str):
+        """
+        Release a lease held by the specified node.
+        :param shard: shard index
+        :param node_id: node releasing the lease
+        """
+
+    @abstractmethod
+    def get_lease(self, shard: int) -> Optional[Tuple[str, float]]:
+        """
+        Get the current lease on a shard.
+        :param shard: shard index
+        :returns: owner node ID and lease expiration epoch, or None
+        """
+
+    @abstractmethod
+    def load_shard(self, shard: int) -> dict:
+        """
+        Get the cached alerts for a shard.
+        :param shard: shard index
+        :returns: dict alerts cache data (empty if never saved)
+        """
+
+    @abstractmethod
+    def save_shard(self, shard: int, node_id: str, data: dict) -> bool:
+        """
+        Save cached alerts for a shard if `node_id` holds its lease.
+        :param shard: shard index
+        :param node_id: node saving the shard
+        :param data: dict alerts cache data
+        :returns: True if the shard was saved
+        """
+
+    @abstractmethod
+    def enqueue(self, shard: int, operation: dict):
+        """
+        Queue an operation for the owner of a shard.
+        :param shard: shard index
+        :param operation: dict operation to queue
+        """
+
+    @abstractmethod
+    def dequeue(self, shard: int, node_id: str) -> List[dict]:
+        """
+        Remove and return queued operations if `node_id` holds the lease.
+        :param shard: shard index
+        :param node_id: node handling the operations
+        :returns: list of queued operations in the order they were queued
+        """
+
+
+class SQLiteShardStore(ShardStore):
+    """
+    ShardStore backed by a SQLite database. Suitable for nodes sharing a
+    local or network filesystem with working locks.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path to the SQLite database file
+        """
+        self.path = expanduser(path)
+        if dirname(self.path) and not isdir(dirname(self.path)):
+            makedirs(dirname(self.path), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (shard INTEGER "
+                         "PRIMARY KEY, owner TEXT, expires REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS shards (shard INTEGER "
+                         "PRIMARY KEY, data TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS operations (id INTEGER "
+                         "PRIMARY KEY AUTOINCREMENT, shard INTEGER, "
+                         "operation TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _is_owner(conn: sqlite3.Connection, shard: int, node_id: str) -> bool:
+        row = conn.execute("SELECT owner, expires FROM leases WHERE shard=?",
+                           (shard,)).fetchone()
+        return bool(row) and row[0] == node_id and row[1] > time()
+
+    def acquire_lease(self, shard: int, node_id: str, ttl: float) -> bool:
+        now = time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, expires FROM leases WHERE "
+                               "shard=?", (shard,)).fetchone()
+            if row and row[0] != node_id and row[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                         (shard, node_id, now + ttl))
+        return True
+
+    def release_lease(self, shard: int, node_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE shard=? AND owner=?",
+                         (shard, node_id))
+
+    def get_lease(self, shard: int) -> Optional[Tuple[str, float]]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, expires FROM leases WHERE "
+                               "shard=?", (shard,)).fetchone()
+        return tuple(row) if row else None
+
+    def load_shard(self, shard: int) -> dict:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM shards WHERE shard=?",
+                               (shard,)).fetchone()
+        return json.loads(row[0]) if row else dict()
+
+    def save_shard(self, shard: int, node_id: str, data: dict) -> bool:
+        with self._transaction() as conn:
+            if not self._is_owner(conn, shard, node_id):
+                return False
+            conn.execute("INSERT OR REPLACE INTO shards VALUES (?, ?)",
+                         (shard, json.dumps(data, separators=(',', ':'))))
+        return True
+
+    def enqueue(self, shard: int, operation: dict):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO operations (shard, operation) "
+                         "VALUES (?, ?)", (shard, json.dumps(operation)))
+
+    def dequeue(self, shard: int, node_id: str) -> List[dict]:
+        with self._transaction() as conn:
+            if not self._is_owner(conn, shard, node_id):
+                return []
+            rows = conn.execute("SELECT id, operation FROM operations WHERE "
+                                "shard=? ORDER BY id", (shard,)).fetchall()
+            if rows:
+                conn.execute("DELETE FROM operations WHERE shard=? AND "
+                             "id<=?", (shard, rows[-1][0]))
+        return [json.loads(row[1]) for row in rows]
+
+
+class FileShardStore(ShardStore):
+    """
+    ShardStore backed by one JSON file per shard in a shared directory.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: directory to store shard files in
+        """
+        self.directory = expanduser(directory)
+        makedirs(self.directory, exist_ok=True)
+        self._locks: Dict[int, ComboLock] = dict()
+
+    @contextmanager
+    def _shard_file(self, shard: int):
+        """
+        Lock and read a shard file, then write back any changes to it.
+        """
+        lock = self._locks.setdefault(
+            shard, ComboLock(join(self.directory, f"shard_{shard}.lock")))
+        path = join(self.directory, f"shard_{shard}.json")
+        with lock:
+            doc = dict()
+            if isfile(path):
+                with open(path) as f:
+                    doc = json.load(f)
+            original = json.dumps(doc, sort_keys=True)
+            yield doc
+            if json.dumps(doc, sort_keys=True) != original:
+                _write_json(path, doc)
+
+    @staticmethod
+    def _is_owner(doc: dict, node_id: str) -> bool:
+        lease = doc.get("lease") or {}
+        return lease.get("owner") == node_id and \
+            lease.get("expires", 0) > time()
+
+    def acquire_lease(self, shard: int, node_id: str, ttl: float) -> bool:
+        now = time()
+        with self._shard_file(shard) as doc:
+            lease = doc.get("lease") or {}
+            if lease.get("owner") not in (None, node_id) and \
+                    lease.get("expires", 0) > now:
+                return False
+            doc["lease"] = {"owner": node_id, "expires": now + ttl}
+        return True
+
+    def release_lease(self, shard: int, node_id: str):
+        with self._shard_file(shard) as doc:
+            if (doc.get("lease") or {}).get("owner") == node_id:
+                doc.pop("lease")
+
+    def get_lease(self, shard: int) -> Optional[Tuple[str, float]]:
+        with self._shard_file(shard) as doc:
+            lease = doc.get("lease")
+        return (lease["owner"], lease["expires"]) if lease else None
+
+    def load_shard(self, shard: int) -> dict:
+        with self._shard_file(shard) as doc:
+            return doc.get("data") or dict()
+
+    def save_shard(self, shard: int, node_id: str, data: dict) -> bool:
+        with self._shard_file(shard) as doc:
+            if not self._is_owner(doc, node_id):
+                return False
+            doc["data"] = data
+        return True
+
+    def enqueue(self, shard: int, operation: dict):
+        with self._shard_file(shard) as doc:
+            doc.setdefault("operations", list()).append(operation)
+
+    def dequeue(self, shard: int, node_id: str) -> List[dict]:
+        with self._shard_file(shard) as doc:
+            if not self._is_owner(doc, node_id):
+                return []
+            return doc.pop("operations", None) or list()
+
+
+class ShardedAlertManager:
+    """
+    Coordinates alerts partitioned by user across nodes. Each node runs an
+    AlertManager for every shard it holds a lease on; shards whose owner stops
+    renewing its lease are taken over by another node, which reloads and
+    reschedules their alerts from the ShardStore.
+    """
+
+    def __init__(self, store: ShardStore, node_id: str, work_dir: str,
+                 event_scheduler: EventSchedulerInterface,
+                 alert_callback: callable, num_shards: int = 16,
+                 lease_ttl: float = 30,
+                 preferred_shards: Optional[List[int]] = None,
+                 schedule_horizon: Optional[dt.timedelta] =
+                 _DEFAULT_SCHEDULE_HORIZON,
+                 change_callback: Optional[callable] = None,
+                 **kwargs):
+        """
+        :param store: ShardStore shared by all nodes
+        :param node_id: unique identifier for this node
+        :param work_dir: local directory for this node's shard caches
+        :param event_scheduler: EventSchedulerInterface to schedule alerts with
+        :param alert_callback: method to call with each expired Alert
+        :param num_shards: number of shards alerts are partitioned into
+        :param lease_ttl: seconds a shard lease is valid without renewal
+        :param preferred_shards: shards this node acquires as soon as they are
+            free; other shards are only acquired after this node has seen them
+            free for a full `lease_ttl` (None to prefer all shards)
+        :param schedule_horizon: schedule horizon for each AlertManager
+        :param change_callback: optional method to call with each change dict
+        :param kwargs: additional keyword arguments passed to each
+            AlertManager (i.e. `remote_callback`, `context_keys`, `metrics`,
+            `tracer`)
+        """
+        self._store = store
+        self._node_id = node_id
+        self._work_dir = expanduser(work_dir)
+        self._scheduler = event_scheduler
+        self._callback = alert_callback
+        self._num_shards = num_shards
+        self._lease_ttl = lease_ttl
+        self._preferred_shards = set(range(num_shards)) if \
+            preferred_shards is None else set(preferred_shards)
+        self._schedule_horizon = schedule_horizon
+        self._change_callback = change_callback
+        self._manager_kwargs = kwargs
+        self._managers: Dict[int, AlertManager] = dict()
+        self._free_since: Dict[int, float] = dict()
+        makedirs(self._work_dir, exist_ok=True)
+
+    @property
+    def node_id(self) -> str:
+        return self._node_id
+
+    @property
+    def owned_shards(self) -> List[int]:
+        """
+        Return a sorted list of shards managed by this node
+        """
+        return sorted(self._managers.keys())
+
+    def get_manager(self, user: str) -> Optional[AlertManager]:
+        """
+        Get the AlertManager for the specified user's shard.
+        :param user: username to get a manager for
+        :returns: AlertManager if this node owns the user's shard, else None
+        """
+        return self._managers.get(get_shard(user, self._num_shards))
+
+    def start(self):
+        """
+        Acquire shards and schedule periodic lease renewal and failover.
+        """
+        self.refresh()
+        self._scheduler.schedule_repeating_event(
+            self.refresh, None, self._lease_ttl / 3,
+            name=f"{_REFRESH_EVENT_NAME}.{self._node_id}")
+
+    def add_alert(self, alert: Alert) -> str:
+        """
+        Add an alert to the shard for its user. If another node owns the shard,
+        the alert is queued for that node.
+        :param alert: Alert to add
+        :returns: string identifier for the alert
+        """
+        manager = self.get_manager(get_alert_user(alert))
+        if manager:
+            return manager.add_alert(alert)
+        ident = alert.context.get("ident") or str(uuid())
+        alert.add_context({"ident": ident})
+        self._store.enqueue(get_shard(get_alert_user(alert), self._num_shards),
+                            {"op": "add", "alert": alert.data})
+        return ident
+
+    def rm_alert(self, alert_id: str, user: str):
+        """
+        Remove a pending alert. If another node owns the user's shard, the
+        removal is queued for that node.
+        :param alert_id: ident of pending alert to remove
+        :param user: user associated with the alert
+        """
+        manager = self.get_manager(user)
+        if manager:
+            manager.rm_alert(alert_id)
+        else:
+            self._store.enqueue(get_shard(user, self._num_shards),
+                                {"op": "remove", "ident": alert_id})
+
+    def refresh(self, _=None):
+        """
+        Renew leases on owned shards, release shards whose lease was lost,
+        acquire available shards, and apply operations queued by other nodes.
+        """
+        now = time()
+        for shard in range(self._num_shards):
+            if shard in self._managers:
+                if not self._store.acquire_lease(shard, self._node_id,
+                                                 self._lease_ttl):
+                    LOG.warning(f"Lost lease on shard {shard}")
+                    self._stop_shard(shard)
+                continue
+            if shard not in self._preferred_shards:
+                lease = self._store.get_lease(shard)
+                if lease and lease[1] > now:
+                    self._free_since.pop(shard, None)
+                    continue
+                free_since = self._free_since.setdefault(shard, now)
+                if now - free_since < self._lease_ttl:
+                    continue
+            if self._store.acquire_lease(shard, self._node_id,
+                                         self._lease_ttl):
+                self._free_since.pop(shard, None)
+                self._start_shard(shard)
+        for shard, manager in list(self._managers.items()):
+            for operation in self._store.dequeue(shard, self._node_id):
+                self._apply_operation(manager, operation)
+
+    def shutdown(self):
+        """
+        Shut down all shard managers, save their alerts, and release leases.
+        """
+        self._scheduler.cancel_scheduled_event(
+            f"{_REFRESH_EVENT_NAME}.{self._node_id}")
+        for shard in list(self._managers.keys()):
+            manager = self._managers.pop(shard)
+            manager.shutdown()
+            self._store.save_shard(shard, self._node_id,
+                                   manager.export_alerts())
+            self._store.release_lease(shard, self._node_id)
+
+    def _start_shard(self, shard: int):
+        """
+        Load a shard's alerts from the store and schedule them locally.
+        :param shard: shard index this node acquired
+        """
+        LOG.info(f"Loading shard {shard} on {self._node_id}")
+        cache_file = join(self._work_dir, f"shard_{shard}.json")
+        _write_json(cache_file, self._store.load_shard(shard))
+        self._managers[shard] = AlertManager(
+            cache_file, self._scheduler, self._callback,
+            self._schedule_horizon,
+            change_callback=lambda change: self._shard_changed(shard, change),
+            instance_name=f"shard_{shard}", **self._manager_kwargs)
+
+    def _stop_shard(self, shard: int):
+        """
+        Stop scheduling a shard's alerts after its lease was lost. Alerts are
+        not saved to the store since another node may own the shard.
+        :param shard: shard index
+        """
+        manager = self._managers.pop(shard, None)
+        if manager:
+            manager.shutdown()
+
+    def _shard_changed(self, shard: int, change: dict):
+        """
+        Save a shard to the store after any of its alerts change.
+        :param shard: shard index
+        :param change: dict change recorded by the shard's AlertManager
+        """
+        manager = self._managers.get(shard)
+        if manager and not self._store.save_shard(shard, self._node_id,
+                                                  manager.export_alerts()):
+            LOG.warning(f"Shard {shard} not saved; lease not held")
+        if self._change_callback:
+            self._change_callback(change)
+
+    @staticmethod
+    def _apply_operation(manager: AlertManager, operation: dict):
+        """
+        Apply an operation queued by another node.
+        :param manager: AlertManager for the operation's shard
+        :param operation: dict queued operation
+        """
+        if operation.get("op") == "add":
+            manager.add_alert(Alert.from_dict(operation["alert"]))
+        elif operation.get("op") == "remove":
+            manager.rm_alert(operation["ident"])
+        else:
+            LOG.error(f"Invalid shard operation: {operation}")
@@ -0,0 +1,204 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import OrderedDict
+from statistics import mean, median
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+from neon_utils.logger import LOG
+
+
+def _get_stats(values: List[float]) -> dict:
+    """
+    Summarize a list of durations
+    :param values: durations in seconds
+    :returns: dict count, mean, p50, p95, and max of `values`
+    """
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    return {"count": len(values),
+            "mean": mean(values),
+            "p50": median(values),
+            "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+            "max": values[-1]}
+
+
+class DeliveryTrace:
+    """
+    Times at which an expired alert passed each stage of delivery to the user.
+    """
+
+    def __init__(self, alert_id: str, due: float):
+        """
+        :param alert_id: ID of the expired alert
+        :param due: epoch time the alert was due to expire
+        """
+        self.alert_id = alert_id
+        self.due = due
+        self.spans: List[Tuple[str, float]] = list()
+        self.finished = False
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """
+        Record that the alert reached a stage of delivery
+        :param stage: name of the stage reached
+        :param timestamp: epoch time the stage was reached (default now)
+        """
+        self.spans.append((stage, timestamp or time()))
+
+    @property
+    def lag(self) -> float:
+        """
+        Seconds from the due time to the last recorded stage
+        """
+        return (self.spans[-1][1] if self.spans else self.due) - self.due
+
+    def to_dict(self) -> dict:
+        """
+        Get a dict representation of this trace. Each span includes the
+        `duration` since the previous span, or since the due time for the
+        first span.
+        """
+        spans = list()
+        last = self.due
+        for stage, timestamp in self.spans:
+            spans.append({"stage": stage, "time": timestamp,
+                          "duration": timestamp - last})
+            last = timestamp
+        return {"alert_id": self.alert_id, "due": self.due, "lag": self.lag,
+                "finished": self.finished, "spans": spans}
+
+
+class DeliveryTracer:
+    """
+    Tracks delivery traces for recently expired alerts and checks finished
+    deliveries against an optional lag budget.
+    """
+
+    def __init__(self, max_traces: int = 100,
+                 budget: Optional[float] = None):
+        """
+        :param max_traces: number of recent traces to keep
+        :param budget: maximum seconds from due time to notification
+            (None for no budget)
+        """
+        self.budget = budget
+        self._max_traces = max_traces
+        self._traces: Dict[str, DeliveryTrace] = OrderedDict()
+        self._over_budget = 0
+        self._lock = Lock()
+
+    def start(self, alert_id: str, due: float) -> DeliveryTrace:
+        """
+        Start a new trace for an alert, replacing any previous trace
+        :param alert_id: ID of the expired alert
+        :param due: epoch time the alert was due to expire
+        :returns: new DeliveryTrace
+        """
+        trace = DeliveryTrace(alert_id, due)
+        with self._lock:
+            self._traces.pop(alert_id, None)
+            self._traces[alert_id] = trace
+            while len(self._traces) > self._max_traces:
+                self._traces.popitem(last=False)
+        return trace
+
+    def mark(self, alert_id: str, stage: str):
+        """
+        Record that an alert reached a stage of delivery. Alerts without an
+        unfinished trace are ignored.
+        :param alert_id: ID of the expired alert
+        :param stage: name of the stage reached
+        """
+        with self._lock:
+            trace = self._traces.get(alert_id)
+            if trace and not trace.finished:
+                trace.mark(stage)
+
+    def finish(self, alert_id: str, stage: str) -> Optional[dict]:
+        """
+        Record the stage at which the user was notified and end the trace
+        :param alert_id: ID of the expired alert
+        :param stage: name of the notification stage
+        :returns: dict finished trace or None if the alert is not traced
+        """
+        with self._lock:
+            trace = self._traces.get(alert_id)
+            if not trace or trace.finished:
+                return None
+            trace.mark(stage)
+            trace.finished = True
+            over_budget = self.budget is not None and trace.lag > self.budget
+            if over_budget:
+                self._over_budget += 1
+            trace_dict = trace.to_dict()
+        if over_budget:
+            LOG.warning(f"Alert {alert_id} delivered {trace.lag:.2f}s late, "
+                        f"exceeding budget of {self.budget}s: "
+                        f"{trace_dict['spans']}")
+        return trace_dict
+
+    def get_trace(self, alert_id: str) -> Optional[dict]:
+        """
+        Get the trace for a recently expired alert
+        :param alert_id: ID of the expired alert
+        :returns: dict trace or None if the alert is not traced
+        """
+        with self._lock:
+            trace = self._traces.get(alert_id)
+            return trace.to_dict() if trace else None
+
+    def get_traces(self) -> List[dict]:
+        """
+        Get all retained traces, oldest first
+        """
+        with self._lock:
+            return [trace.to_dict() for trace in self._traces.values()]
+
+    def summary(self) -> dict:
+        """
+        Summarize retained finished traces
+        :returns: dict with the `budget`, count of deliveries `over_budget`
+            since startup, and `lag` and per-stage duration statistics
+        """
+        with self._lock:
+            traces = [trace.to_dict() for trace in self._traces.values()
+                      if trace.finished]
+            over_budget = self._over_budget
+        stages = dict()
+        for trace in traces:
+            for span in trace["spans"]:
+                stages.setdefault(span["stage"], list()).append(
+                    span["duration"])
+        return {"budget": self.budget, "over_budget": over_budget,
+                "lag": _get_stats([trace["lag"] for trace in traces]),
+                "stages": {stage: _get_stats(durations)
+                           for stage, durations in stages.items()}}
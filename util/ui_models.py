@@ -26,60 +26,110 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from datetime import datetime
-from lingua_franca.format import nice_duration, nice_time
-from ovos_bus_client import Message
-from neon_utils.user_utils import get_user_prefs
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
 
 from .alert import Alert, AlertType
 from .alert_manager import get_alert_id
 
 
-def build_timer_data(alert: Alert) -> dict:
+def get_timer_times(expirations: Sequence[float], starts: Sequence[float],
+                    now: float) -> Tuple[List[float], List[float], List[bool]]:
     """
-    Parse an alert object into a dict data structure for a timer UI
+    Compute remaining time for a batch of timers against a single clock read.
+    :param expirations: epoch expiration times
+    :param starts: epoch start times, parallel to `expirations`
+    :param now: epoch time to compute remaining time relative to
+    :returns: lists of remaining seconds, fraction of time remaining, and
+        expired flags, parallel to `expirations`
     """
-    if alert.alert_type != AlertType.TIMER:
-        raise ValueError(f"Expected a timer, got: {alert.alert_type.name}")
+    remaining = [expiration - now for expiration in expirations]
+    percent_remaining = [
+        delta / (expiration - start) if delta > 0 and expiration > start
+        else 0 for delta, expiration, start in
+        zip(remaining, expirations, starts)]
+    expired = [delta <= 0 for delta in remaining]
+    return remaining, percent_remaining, expired
 
-    start_timestamp = alert.context.get('start_time')
-    start_time = datetime.fromisoformat(start_timestamp) if start_timestamp \
-        else datetime.now(alert.timezone)
-    delta_seconds = alert.time_to_expiration
-    if delta_seconds.total_seconds() < 0:
-        percent_remaining = 0
-        human_delta = '-' + nice_duration(-1 * delta_seconds.total_seconds(),
-                                          speech=False)
-    else:
-        total_time = (datetime.now(alert.timezone).timestamp() -
-                      start_time.timestamp()) + \
-                     delta_seconds.total_seconds()
-        percent_remaining = delta_seconds.total_seconds() / total_time
-        human_delta = nice_duration(delta_seconds.total_seconds(), speech=False)
 
-    return {
-        'alertId': get_alert_id(alert),
-        'backgroundColor': '',  # TODO Color hex code
-        'expired': alert.is_expired,
-        'percentRemaining': percent_remaining,  # float percent remaining
-        'timerName': alert.alert_name,
-        'timeDelta': human_delta  # Human-readable time remaining
-    }
+def build_timers_data(alerts: List[Alert],
+                      now: Optional[datetime] = None,
+                      times: Optional[Sequence[Tuple[Optional[float],
+                                                     float]]] = None) -> \
+        List[dict]:
+    """
+    Parse a list of alert objects into dict data structures for a timer UI.
+    The clock is read once and each alert's timestamps are parsed once.
+    :param alerts: Timer Alert objects to parse
+    :param now: time to compute remaining time relative to (default now)
+    :param times: epoch start (None if unknown) and expiration of each timer,
+        as returned by `AlertManager.get_gui_timers_page`. If not specified,
+        times are parsed from `alerts`.
+    :returns: list of timer UI data, parallel to `alerts`
+    """
+    from lingua_franca.format import nice_duration
+    for alert in alerts:
+        if alert.alert_type != AlertType.TIMER:
+            raise ValueError(f"Expected a timer, got: {alert.alert_type.name}")
+    now = (now or datetime.now(timezone.utc)).timestamp()
+    if times is None:
+        times = [(datetime.fromisoformat(alert.context['start_time'])
+                  .timestamp() if alert.context.get('start_time') else None,
+                  datetime.fromisoformat(
+                      alert.data["next_expiration_time"]).timestamp())
+                 for alert in alerts]
+    starts = [now if start is None else start for start, _ in times]
+    expirations = [expiration for _, expiration in times]
+    remaining, percent_remaining, expired = \
+        get_timer_times(expirations, starts, now)
+
+    timers = list()
+    for alert, delta, percent, is_expired in zip(alerts, remaining,
+                                                 percent_remaining, expired):
+        if delta < 0:
+            human_delta = '-' + nice_duration(-1 * delta, speech=False)
+        else:
+            human_delta = nice_duration(delta, speech=False)
+        timers.append({
+            'alertId': get_alert_id(alert),
+            'backgroundColor': '',  # TODO Color hex code
+            'expired': is_expired,
+            'percentRemaining': percent,  # float percent remaining
+            'timerName': alert.alert_name,
+            'timeDelta': human_delta  # Human-readable time remaining
+        })
+    return timers
+
+
+def build_timer_data(alert: Alert, now: Optional[datetime] = None) -> dict:
+    """
+    Parse an alert object into a dict data structure for a timer UI
+    :param alert: Timer Alert object to parse
+    :param now: time to compute remaining time relative to (default now)
+    """
+    return build_timers_data([alert], now)[0]
 
 
-def build_alarm_data(alert: Alert):
+def build_alarm_data(alert: Alert, use_24hour: Optional[bool] = None):
     """
     Parse an alert object into a dict data structure for an alarm UI
+    :param alert: Alarm Alert object to parse
+    :param use_24hour: User preference to use 24-hour time scale (None to
+        look up the preference for the alert's user)
     """
+    from lingua_franca.format import nice_time
+    from ovos_bus_client import Message
+    from skill_alerts.util.user_prefs import user_prefs
     if alert.alert_type != AlertType.ALARM:
         raise ValueError(f"Expected a timer, got: {alert.alert_type.name}")
 
-    alert_message = Message("neon.alert", alert.data, alert.context)
-    use_ampm = get_user_prefs(alert_message)['units']['time'] == 12
-    use_24hr = not use_ampm
+    if use_24hour is None:
+        alert_message = Message("neon.alert", alert.data, alert.context)
+        use_24hour = user_prefs.use_24hour(alert_message)
+    use_ampm = not use_24hour
     alarm_time = datetime.fromisoformat(alert.data["next_expiration_time"])
     alarm_time = nice_time(alarm_time, speech=False, use_ampm=use_ampm,
-                           use_24hour=use_24hr)
+                           use_24hour=use_24hour)
     if use_ampm:
         alarm_time, alarm_am_pm = alarm_time.split()
     else:
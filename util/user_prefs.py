@@ -0,0 +1,150 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2025 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import json
+
+from copy import deepcopy
+from threading import RLock
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from .alert_manager import _DEFAULT_USER
+
+if TYPE_CHECKING:
+    from ovos_bus_client import Message
+
+
+def _get_context_profile(message: Optional[Message],
+                         username: str) -> Optional[dict]:
+    """
+    Get the profile for a user from message context, if included.
+    :param message: Message to read context from
+    :param username: username to get the profile for
+    :returns: dict user profile or None if not in context
+    """
+    if not message:
+        return None
+    profiles = message.context.get("user_profiles") or \
+        message.context.get("nick_profiles")
+    if not isinstance(profiles, list):
+        return None
+    for profile in profiles:
+        if isinstance(profile, dict) and \
+                (profile.get("user") or {}).get("username") == username:
+            return profile
+    return None
+
+
+def _hash_profile(profile: dict) -> int:
+    """
+    Get a hash identifying the contents of a user profile
+    :param profile: dict user profile
+    :returns: int hash of the profile
+    """
+    return hash(json.dumps(profile, sort_keys=True, default=str))
+
+
+class UserPrefsCache:
+    """
+    Cache of user preferences keyed by username and the profile they were
+    built from. Profiles included in message context are only resolved again
+    when they change; requests without a profile in context use the cached
+    preferences for the user. The default user configuration is loaded once
+    and reloaded when the default user is invalidated.
+    """
+
+    def __init__(self):
+        self._prefs: Dict[str, Tuple[Optional[int], dict]] = dict()
+        self._default_config: Optional[dict] = None
+        self._lock = RLock()
+
+    def _get_default_config(self) -> dict:
+        """
+        Get the default user configuration, loading it on first use.
+        :returns: dict default user preferences
+        """
+        with self._lock:
+            if self._default_config is None:
+                from neon_utils.configuration_utils import \
+                    get_user_config_from_mycroft_conf
+                self._default_config = get_user_config_from_mycroft_conf()
+            return self._default_config
+
+    def get_prefs(self, message: Optional[Message] = None) -> dict:
+        """
+        Get preferences for the user associated with a message.
+        :param message: Message associated with a request (None for the
+            default user)
+        :returns: dict user preferences following the structure of
+            `get_user_prefs`
+        """
+        from neon_utils.configuration_utils import dict_update_keys
+        from neon_utils.user_utils import get_message_user
+        username = (get_message_user(message) if message else None) or \
+            _DEFAULT_USER
+        profile = _get_context_profile(message, username)
+        profile_hash = None if profile is None else _hash_profile(profile)
+        with self._lock:
+            cached = self._prefs.get(username)
+        if cached and (profile_hash is None or cached[0] == profile_hash):
+            return cached[1]
+        prefs = deepcopy(self._get_default_config())
+        if profile is not None:
+            prefs = dict(dict_update_keys(deepcopy(profile), prefs))
+        elif username != _DEFAULT_USER:
+            prefs.setdefault("user", dict())["username"] = username
+        with self._lock:
+            self._prefs[username] = (profile_hash, prefs)
+        return prefs
+
+    def use_24hour(self, message: Optional[Message] = None) -> bool:
+        """
+        Check if the user associated with a message uses 24-hour time.
+        :param message: Message associated with a request
+        :returns: True if the user prefers a 24-hour time format
+        """
+        return self.get_prefs(message)["units"]["time"] == 24
+
+    def invalidate(self, username: Optional[str] = None):
+        """
+        Remove cached preferences. Invalidating all users or the default user
+        also reloads the default user configuration.
+        :param username: user to remove preferences for (None for all users)
+        """
+        with self._lock:
+            if username:
+                self._prefs.pop(username, None)
+            else:
+                self._prefs.clear()
+            if not username or username == _DEFAULT_USER:
+                self._default_config = None
+
+
+# Preferences cache shared by the skill and GUI model builders
+user_prefs = UserPrefsCache()